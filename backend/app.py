@@ -3,48 +3,128 @@ try:  # Starlette expects python_multipart import to register namespace; keep op
     import python_multipart  # noqa: F401
 except ImportError:
     python_multipart = None  # type: ignore[assignment]
-from decimal import Decimal
+import secrets
+from datetime import datetime, timedelta
+from uuid import uuid4
 
 from contextlib import asynccontextmanager
 
-from fastapi import Depends, FastAPI, HTTPException, Query, Security, status
+from fastapi import (
+    Depends,
+    FastAPI,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Security,
+    status,
+)
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from sqlalchemy import func, select
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from sqlalchemy import String, cast, delete, func, insert, select, union_all, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from fastapi.security import APIKeyHeader
 
 from .config import Settings, get_settings
-from .db import get_session
+from .db import ReadSessionLocal, SessionLocal, get_read_session, get_session
 from .db_init import init_db
 from .logging import configure_logging
-from .models import Challenge, Submission
-from .types import SubmissionStatus
+from .metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    REGISTRY as METRICS_REGISTRY,
+    RESULT_WRITER_QUEUE_DEPTH,
+    SCORING_QUEUE_DEPTH,
+)
+from .middleware import (
+    CompressionMiddleware,
+    MetricsMiddleware,
+    RateLimitHeadersMiddleware,
+)
+from .ratelimit import RateLimiter
+from .models import (
+    Challenge,
+    Finding,
+    FindingRollup,
+    Submission,
+    SubmissionRollup,
+    compute_code_hash,
+    idempotency_scope,
+    store_code_blobs,
+)
+from .responses import (
+    PydanticJSONResponse,
+    submission_list_response,
+    submission_adapter,
+    submission_response,
+    submission_stats_adapter,
+)
+from .types import ProfileTarget, SubmissionStatus
 from .schemas import (
+    ArchiveRunOut,
     ChallengeOut,
     ChallengeSummary,
+    FindingRuleCount,
+    FindingSeverityCount,
+    FingerprintChallengeStats,
+    FingerprintStats,
+    JobOut,
+    ProfileCreate,
+    ProfileOut,
+    ReadinessOut,
+    ReloadOut,
     StatusCount,
+    SubmissionBatchCreate,
+    SubmissionBatchOut,
     SubmissionCreate,
     SubmissionOut,
+    SubmissionPreviewOut,
     SubmissionStats,
 )
-from .services.analyzers import BanditAnalyzer, SemgrepAnalyzer
+from .services.archive import SubmissionArchive
+from .services.catalog import CatalogEntry, ChallengeCatalog, etag_matches
+from .services.export import SubmissionExportFilter, iter_submissions_ndjson
+from .services.fingerprint import FingerprintIndex, fingerprint_stats
+from .services.jobs import JobManager
+from .services.preview import PreviewService
+from .services.profiling import ProfilerBusyError, ProfilerManager, route_endpoints
+from .services.readiness import ReadinessProbe
 from .services.sandbox import create_sandbox_executor
+from .services.reload import HotReloader
+from .services.result_writer import ResultWriter
+from .services.rules import build_rule_bundle
 from .services.scoring import ChallengeScoringService
 from .services.worker import ScoringWorker
 
 logger = logging.getLogger(__name__)
 
 
-def create_app(settings: Settings) -> FastAPI:
+def create_app(settings: Settings | None = None) -> FastAPI:
+    """Build the application without touching the database or rule files.
+
+    Migrations, seeding and analyzer construction run in the lifespan startup,
+    so constructing (or importing) the app stays cheap.
+    """
+    settings = settings or get_settings()
     configure_logging(settings)
-    init_db(settings)
+
     @asynccontextmanager
     async def lifespan(_: FastAPI):
+        init_db(settings)
+        app.state.scoring_service.swap_rule_bundle(build_rule_bundle(settings))
         app.state.scoring_worker.start()
+        app.state.job_manager.start()
+        app.state.reloader.start()
+        app.state.readiness.start()
+        app.state.submission_archive.start()
         try:
             yield
         finally:
+            app.state.submission_archive.stop()
+            app.state.readiness.stop()
+            app.state.profiler.stop()
+            app.state.reloader.stop()
+            app.state.job_manager.stop()
             app.state.scoring_worker.stop()
 
     app = FastAPI(title=settings.app_name, debug=settings.debug, lifespan=lifespan)
@@ -56,26 +136,17 @@ def create_app(settings: Settings) -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.add_middleware(RateLimitHeadersMiddleware)
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
     api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
-
-    semgrep_rules = [
-        settings.semgrep_rules_root / "python" / "sqli_unsafe.yaml",
-        settings.semgrep_rules_root / "python" / "xss_unescaped.yaml",
-        settings.semgrep_rules_root / "python" / "command_injection.yaml",
-    ]
-    analyzers = [
-        SemgrepAnalyzer(
-            semgrep_rules,
-            binary=settings.semgrep_binary,
-            timeout_seconds=settings.semgrep_timeout_seconds,
-        ),
-        BanditAnalyzer(
-            binary=settings.bandit_binary,
-            timeout_seconds=settings.bandit_timeout_seconds,
-            severity=settings.bandit_severity,
-            confidence=settings.bandit_confidence,
-        ),
-    ]
+    admin_key_header = APIKeyHeader(name="X-Admin-Key", auto_error=False)
 
     sandbox_executor = create_sandbox_executor(
         driver=settings.sandbox_driver,
@@ -88,61 +159,331 @@ def create_app(settings: Settings) -> FastAPI:
     )
 
     app.state.scoring_service = ChallengeScoringService(
-        analyzers=analyzers, sandbox=sandbox_executor
+        sandbox=sandbox_executor,
+        fingerprints=(
+            FingerprintIndex(ReadSessionLocal) if settings.fingerprint_reuse_enabled else None
+        ),
+    )
+    app.state.preview_service = PreviewService(
+        app.state.scoring_service,
+        deadline_ms=settings.preview_deadline_ms,
+        cache_size=settings.preview_cache_size,
+    )
+    app.state.reloader = HotReloader(
+        settings,
+        app.state.scoring_service,
+        poll_interval_seconds=settings.reload_poll_interval_seconds,
+    )
+    app.state.result_writer = ResultWriter(
+        SessionLocal,
+        max_batch=settings.result_writer_max_batch,
+        max_delay_seconds=settings.result_writer_max_delay_ms / 1000,
+    )
+    app.state.scoring_worker = ScoringWorker(
+        app.state.scoring_service,
+        result_writer=app.state.result_writer,
+        concurrency=settings.worker_concurrency,
+        result_timeout_seconds=settings.result_writer_timeout_seconds,
+    )
+    SCORING_QUEUE_DEPTH.set_function(app.state.scoring_worker.queue_depth)
+    RESULT_WRITER_QUEUE_DEPTH.set_function(app.state.result_writer.queue_depth)
+    app.state.job_manager = JobManager(
+        app.state.scoring_worker,
+        rate_per_second=settings.rescore_rate_per_second,
+        max_backlog=settings.rescore_max_backlog,
+        stale_after_seconds=settings.rescore_job_stale_after_seconds,
+    )
+    app.state.readiness = ReadinessProbe(
+        app.state.scoring_worker,
+        app.state.scoring_service,
+        ReadSessionLocal,
+        interval_seconds=settings.ready_refresh_interval_seconds,
+        max_queue_depth=settings.ready_max_queue_depth,
+        required_analyzers=settings.ready_required_analyzers,
+    )
+    app.state.profiler = ProfilerManager(
+        app.state.scoring_worker,
+        settings.profile_output_dir,
+        interval_seconds=settings.profile_sample_interval_ms / 1000,
+        max_duration_seconds=settings.profile_max_duration_seconds,
+    )
+    app.state.challenge_catalog = ChallengeCatalog(
+        ReadSessionLocal, refresh_seconds=settings.challenge_catalog_refresh_seconds
+    )
+    app.state.submission_archive = SubmissionArchive(
+        settings.archive_root,
+        SessionLocal,
+        batch_size=settings.archive_batch_size,
+        retention_days=settings.submission_retention_days,
+        interval_seconds=settings.archive_interval_seconds,
+    )
+
+    def catalog_response(entry: CatalogEntry, if_none_match: str | None) -> Response:
+        headers = {
+            "ETag": entry.etag,
+            "Cache-Control": settings.challenge_cache_control,
+        }
+        if etag_matches(if_none_match, entry.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(
+            content=entry.body, media_type="application/json", headers=headers
+        )
+
+    app.state.rate_limiter = RateLimiter(
+        {
+            "api_key": settings.rate_limit_per_api_key,
+            "user": settings.rate_limit_per_user,
+        }
+        if settings.rate_limit_enabled
+        else {}
     )
-    app.state.scoring_worker = ScoringWorker(app.state.scoring_service)
 
-    def verify_api_key(provided_key: str | None = Security(api_key_header)) -> None:
+    def verify_api_key(provided_key: str | None = Security(api_key_header)) -> str | None:
         if not settings.api_key:
-            return
+            return None
         if not provided_key or provided_key != settings.api_key:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+        return provided_key
+
+    def verify_admin_key(provided_key: str | None = Security(admin_key_header)) -> None:
+        # The regular API key ships in the browser bundle, so admin routes need their own.
+        if not settings.admin_api_key:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+        if not provided_key or not secrets.compare_digest(provided_key, settings.admin_api_key):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin key")
+
+    def caller_identity(request: Request, api_key: str | None) -> str:
+        return api_key or (request.client.host if request.client else "unknown")
+
+    def enforce_rate_limit(
+        request: Request,
+        route: str,
+        api_key: str | None,
+        user_handle: str | None = None,
+        cost: int = 1,
+    ) -> None:
+        # The browser bundle shares one API key, so its bucket is per client address.
+        address = request.client.host if request.client else "unknown"
+        identities = [("api_key", f"{api_key}@{address}" if api_key else address)]
+        if user_handle:
+            identities.append(("user", user_handle))
+        capacity = app.state.rate_limiter.capacity(route, identities)
+        if capacity is not None and cost > capacity:
+            # No amount of waiting would let this through, so do not send a Retry-After.
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Request costs {cost} rate limit tokens; the limit allows {capacity}",
+            )
+        decision = app.state.rate_limiter.check(route, identities, cost)
+        if decision is None:
+            return
+        request.state.rate_limit = decision
+        if not decision.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded",
+                headers=decision.headers(),
+            )
+
+    def find_existing_submission(
+        session: Session,
+        payload: SubmissionCreate,
+        code_hash: str,
+        idempotency_key: str | None,
+        scope: str,
+    ) -> Submission | None:
+        """Return a prior submission that this request should attach to.
+
+        Idempotency keys are looked up within the caller's scope and backed by a
+        unique index, so concurrent retries resolve to one row. Deduplication
+        without a key is best-effort: it is a check before the insert, and two
+        identical requests racing each other may both be stored.
+        """
+        if idempotency_key:
+            keyed = session.scalar(
+                select(Submission).where(
+                    Submission.idempotency_scope == scope,
+                    Submission.idempotency_key == idempotency_key,
+                )
+            )
+            if keyed is not None:
+                if (keyed.challenge_slug, keyed.user_handle, keyed.code_hash) != (
+                    payload.challenge_slug,
+                    payload.user_handle,
+                    code_hash,
+                ):
+                    raise HTTPException(
+                        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                        detail="Idempotency-Key was already used with a different payload",
+                    )
+                return keyed
+
+        # Anonymous submissions are never merged with one another.
+        if not payload.user_handle or settings.submission_dedup_window_seconds <= 0:
+            return None
+        window_start = datetime.utcnow() - timedelta(
+            seconds=settings.submission_dedup_window_seconds
+        )
+        inflight = session.scalar(
+            select(Submission)
+            .where(
+                Submission.user_handle == payload.user_handle,
+                Submission.challenge_slug == payload.challenge_slug,
+                Submission.code_hash == code_hash,
+                Submission.status.in_(
+                    [SubmissionStatus.pending, SubmissionStatus.running]
+                ),
+                Submission.created_at >= window_start,
+            )
+            .order_by(Submission.created_at.desc())
+            .limit(1)
+        )
+        if inflight is not None:
+            logger.info(
+                "Attaching duplicate submission to in-flight id=%s", inflight.id
+            )
+        return inflight
 
     @app.get("/health", tags=["system"])
     async def health() -> JSONResponse:
         return JSONResponse({"status": "ok"})
 
+    @app.get(
+        "/ready",
+        response_model=ReadinessOut,
+        responses={503: {"model": ReadinessOut}},
+        tags=["system"],
+    )
+    async def ready() -> Response:
+        report = app.state.readiness.report()
+        body = ReadinessOut.model_validate(report, from_attributes=True)
+        return Response(
+            content=body.model_dump_json(),
+            media_type="application/json",
+            status_code=200 if report.ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    if settings.metrics_enabled:
+
+        @app.get("/metrics", tags=["system"])
+        def metrics() -> Response:
+            return Response(METRICS_REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+    # Sync: a catalog snapshot may have to ask the database whether it is stale.
     @app.get(
         "/challenges",
         response_model=list[ChallengeSummary],
         tags=["challenges"],
     )
-    async def list_challenges(
-        session: Session = Depends(get_session),
-    ) -> list[ChallengeSummary]:
-        result = session.execute(select(Challenge).order_by(Challenge.slug))
-        challenges = result.scalars().all()
-        return [ChallengeSummary.model_validate(challenge) for challenge in challenges]
+    def list_challenges(
+        if_none_match: str | None = Header(default=None),
+    ) -> Response:
+        snapshot = app.state.challenge_catalog.snapshot()
+        return catalog_response(snapshot.index, if_none_match)
 
     @app.get(
         "/challenges/{slug}",
         response_model=ChallengeOut,
         tags=["challenges"],
     )
-    async def get_challenge(
+    def get_challenge(
         slug: str,
+        if_none_match: str | None = Header(default=None),
+    ) -> Response:
+        entry = app.state.challenge_catalog.snapshot().challenges.get(slug)
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Challenge not found")
+        return catalog_response(entry, if_none_match)
+
+    @app.post(
+        "/challenges/{slug}/rescore",
+        response_model=JobOut,
+        status_code=status.HTTP_202_ACCEPTED,
+        tags=["challenges"],
+    )
+    def rescore_challenge(
+        slug: str,
+        request: Request,
         session: Session = Depends(get_session),
-    ) -> ChallengeOut:
-        challenge = session.get(Challenge, slug)
-        if not challenge:
+        api_key: str | None = Depends(verify_api_key),
+    ) -> JobOut:
+        enforce_rate_limit(request, "rescore_challenge", api_key)
+        if not session.get(Challenge, slug):
             raise HTTPException(status_code=404, detail="Challenge not found")
-        return ChallengeOut.model_validate(challenge)
 
+        # Running submissions are left alone: their result is about to land anyway.
+        reset = (
+            update(Submission)
+            .where(
+                Submission.challenge_slug == slug,
+                Submission.status != SubmissionStatus.running,
+            )
+            .values(
+                status=SubmissionStatus.pending,
+                score=None,
+                feedback=None,
+                rule_bundle_version=None,
+                stage_timings=None,
+            )
+            .returning(Submission.id)
+            .execution_options(synchronize_session=False)
+        )
+        submission_ids = list(session.scalars(reset))
+        session.execute(
+            delete(Finding).where(
+                Finding.challenge_slug == slug,
+                Finding.submission_id.in_(
+                    select(Submission.id).where(
+                        Submission.challenge_slug == slug,
+                        Submission.status == SubmissionStatus.pending,
+                    )
+                ),
+            )
+        )
+        session.commit()
+
+        job = app.state.job_manager.submit_rescore(slug, submission_ids)
+        return JobOut.model_validate(job)
+
+    @app.get(
+        "/jobs/{job_id}",
+        response_model=JobOut,
+        tags=["jobs"],
+    )
+    async def get_job(job_id: str) -> JobOut:
+        job = app.state.job_manager.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return JobOut.model_validate(job)
+
+    # Endpoints holding a write session are sync so they run in the threadpool:
+    # a writer waiting on SQLite's busy timeout must never block the event loop.
     @app.post(
         "/submissions",
         response_model=SubmissionOut,
         status_code=status.HTTP_201_CREATED,
         tags=["submissions"],
     )
-    async def create_submission(
+    def create_submission(
         payload: SubmissionCreate,
+        request: Request,
         session: Session = Depends(get_session),
-        _: None = Depends(verify_api_key),
-    ) -> SubmissionOut:
+        api_key: str | None = Depends(verify_api_key),
+        idempotency_key: str | None = Header(default=None, max_length=128),
+    ) -> Response:
+        enforce_rate_limit(request, "create_submission", api_key, payload.user_handle)
         challenge = session.get(Challenge, payload.challenge_slug)
         if not challenge:
             raise HTTPException(status_code=404, detail="Challenge not found")
 
+        code_hash = compute_code_hash(payload.code)
+        scope = idempotency_scope(caller_identity(request, api_key), payload.user_handle)
+        existing = find_existing_submission(
+            session, payload, code_hash, idempotency_key, scope
+        )
+        if existing is not None:
+            return submission_response(existing, headers={"Idempotent-Replayed": "true"})
+
         logger.info(
             "Received submission for challenge=%s user=%s",
             payload.challenge_slug,
@@ -153,66 +494,195 @@ def create_app(settings: Settings) -> FastAPI:
             challenge_slug=payload.challenge_slug,
             code=payload.code,
             user_handle=payload.user_handle,
+            idempotency_scope=scope if idempotency_key else None,
+            idempotency_key=idempotency_key,
         )
         session.add(submission)
-        session.commit()
+        try:
+            session.commit()
+        except IntegrityError:
+            # A concurrent request committed the same Idempotency-Key first.
+            session.rollback()
+            existing = find_existing_submission(
+                session, payload, code_hash, idempotency_key, scope
+            )
+            if existing is None:
+                raise
+            return submission_response(existing, headers={"Idempotent-Replayed": "true"})
         session.refresh(submission)
 
         app.state.scoring_worker.enqueue(submission.id)
         logger.info("Submission queued for scoring id=%s", submission.id)
 
-        return SubmissionOut.model_validate(submission)
+        return submission_response(submission, status_code=status.HTTP_201_CREATED)
 
+    @app.post(
+        "/submissions/preview",
+        response_model=SubmissionPreviewOut,
+        tags=["submissions"],
+    )
+    def preview_submission(
+        payload: SubmissionCreate,
+        request: Request,
+        api_key: str | None = Depends(verify_api_key),
+    ) -> SubmissionPreviewOut:
+        # No session: previews never touch the database or the worker queue.
+        enforce_rate_limit(request, "preview_submission", api_key, payload.user_handle)
+        if len(payload.code.encode("utf-8")) > settings.preview_max_code_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Preview is limited to {settings.preview_max_code_bytes} bytes of code",
+            )
+        if payload.challenge_slug not in app.state.challenge_catalog.snapshot().challenges:
+            raise HTTPException(status_code=404, detail="Challenge not found")
+        result = app.state.preview_service.preview(payload.challenge_slug, payload.code)
+        return SubmissionPreviewOut.model_validate(result)
+
+    @app.post(
+        "/submissions/batch",
+        response_model=SubmissionBatchOut,
+        status_code=status.HTTP_201_CREATED,
+        tags=["submissions"],
+    )
+    def create_submission_batch(
+        payload: SubmissionBatchCreate,
+        request: Request,
+        session: Session = Depends(get_session),
+        api_key: str | None = Depends(verify_api_key),
+    ) -> SubmissionBatchOut:
+        if len(payload.submissions) > settings.submission_batch_max_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Batch exceeds {settings.submission_batch_max_size} submissions",
+            )
+        enforce_rate_limit(
+            request, "create_submission_batch", api_key, cost=len(payload.submissions)
+        )
+
+        slugs = {item.challenge_slug for item in payload.submissions}
+        known = set(
+            session.scalars(select(Challenge.slug).where(Challenge.slug.in_(slugs)))
+        )
+        missing = sorted(slugs - known)
+        if missing:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Challenge not found: {', '.join(missing)}",
+            )
+
+        code_hashes = store_code_blobs(session, [item.code for item in payload.submissions])
+        rows = [
+            {
+                "id": str(uuid4()),
+                "challenge_slug": item.challenge_slug,
+                "code_hash": code_hash,
+                "user_handle": item.user_handle,
+            }
+            for item, code_hash in zip(payload.submissions, code_hashes)
+        ]
+        session.execute(insert(Submission), rows)
+        session.commit()
+
+        ids = [row["id"] for row in rows]
+        app.state.scoring_worker.enqueue_many(ids)
+        logger.info("Batch of %s submissions queued for scoring", len(ids))
+
+        return SubmissionBatchOut(ids=ids)
+
+    # Readers are sync for the same reason: a query waiting on the database or on
+    # a pool slot runs in the threadpool instead of stalling the event loop.
     @app.get(
         "/submissions",
         response_model=list[SubmissionOut],
         tags=["submissions"],
     )
-    async def list_submissions(
+    def list_submissions(
         challenge_slug: str | None = Query(default=None),
         limit: int = Query(default=50, ge=1, le=100),
         offset: int = Query(default=0, ge=0),
-        session: Session = Depends(get_session),
-    ) -> list[SubmissionOut]:
+        include_timings: bool = Query(default=False),
+        session: Session = Depends(get_read_session),
+    ) -> Response:
         stmt = select(Submission).order_by(Submission.created_at.desc())
         if challenge_slug:
             stmt = stmt.where(Submission.challenge_slug == challenge_slug)
         stmt = stmt.offset(offset).limit(limit)
         submissions = session.execute(stmt).scalars().all()
-        return [SubmissionOut.model_validate(item) for item in submissions]
+        return submission_list_response(submissions, include_timings=include_timings)
 
+    @app.get(
+        "/submissions/export",
+        response_class=StreamingResponse,
+        tags=["submissions"],
+    )
+    async def export_submissions(
+        challenge_slug: str | None = Query(default=None),
+        status_filter: SubmissionStatus | None = Query(default=None, alias="status"),
+        since: datetime | None = Query(default=None),
+        until: datetime | None = Query(default=None),
+        gzip: bool = Query(default=False),
+        include_timings: bool = Query(default=False),
+    ) -> StreamingResponse:
+        filters = SubmissionExportFilter(
+            challenge_slug=challenge_slug,
+            status=status_filter,
+            since=since,
+            until=until,
+        )
+        # The stream outlives the request-scoped session, so it opens its own.
+        body = iter_submissions_ndjson(
+            ReadSessionLocal, filters, compress=gzip, include_timings=include_timings
+        )
+        headers = {"Content-Disposition": 'attachment; filename="submissions.ndjson"'}
+        if gzip:
+            headers["Content-Encoding"] = "gzip"
+        return StreamingResponse(
+            body, media_type="application/x-ndjson", headers=headers
+        )
+
+    # Sync so the session lookup and the gzip read of archived rows run in the threadpool.
     @app.get(
         "/submissions/{submission_id}",
         response_model=SubmissionOut,
         tags=["submissions"],
     )
-    async def get_submission(
+    def get_submission(
         submission_id: str,
-        session: Session = Depends(get_session),
-    ) -> SubmissionOut:
+        include_timings: bool = Query(default=False),
+        session: Session = Depends(get_read_session),
+    ) -> Response:
         submission = session.get(Submission, submission_id)
-        if not submission:
+        if submission is not None:
+            return submission_response(submission, include_timings=include_timings)
+        archived = app.state.submission_archive.read(session, submission_id)
+        if archived is None:
             raise HTTPException(status_code=404, detail="Submission not found")
-        return SubmissionOut.model_validate(submission)
+        if not include_timings:
+            return submission_response(submission_adapter.validate_json(archived))
+        return Response(content=archived, media_type="application/json")
 
     @app.post(
         "/submissions/{submission_id}/rescore",
         response_model=SubmissionOut,
         tags=["submissions"],
     )
-    async def rescore_submission(
+    def rescore_submission(
         submission_id: str,
+        request: Request,
         session: Session = Depends(get_session),
-        _: None = Depends(verify_api_key),
-    ) -> SubmissionOut:
+        api_key: str | None = Depends(verify_api_key),
+    ) -> Response:
         submission = session.get(Submission, submission_id)
         if not submission:
             raise HTTPException(status_code=404, detail="Submission not found")
+        enforce_rate_limit(request, "rescore_submission", api_key, submission.user_handle)
 
         submission.status = SubmissionStatus.pending
         submission.score = None
         submission.feedback = None
-        submission.analysis_report = []
+        submission.rule_bundle_version = None
+        submission.stage_timings = None
+        submission.findings.clear()
         session.add(submission)
         session.commit()
         session.refresh(submission)
@@ -221,39 +691,279 @@ def create_app(settings: Settings) -> FastAPI:
 
         logger.info("Submission enqueued for rescoring id=%s", submission.id)
 
-        return SubmissionOut.model_validate(submission)
+        return submission_response(submission)
 
     @app.get(
         "/stats/submissions",
         response_model=SubmissionStats,
         tags=["stats"],
     )
-    async def submission_stats(
-        session: Session = Depends(get_session),
-    ) -> SubmissionStats:
-        total = session.scalar(select(func.count(Submission.id))) or 0
-
+    def submission_stats(
+        session: Session = Depends(get_read_session),
+    ) -> Response:
+        # Archived submissions only survive as rollups, so both are combined.
+        live = select(
+            cast(Submission.status, String(16)).label("status"),
+            func.count(Submission.id).label("submissions"),
+            func.coalesce(func.sum(Submission.score), 0).label("score_total"),
+            func.count(Submission.score).label("scored"),
+        ).group_by(Submission.status)
+        archived = select(
+            SubmissionRollup.status,
+            func.sum(SubmissionRollup.submissions),
+            func.sum(SubmissionRollup.score_total),
+            func.sum(SubmissionRollup.scored),
+        ).group_by(SubmissionRollup.status)
+        combined = union_all(live, archived).subquery()
         status_rows = session.execute(
-            select(Submission.status, func.count(Submission.id)).group_by(Submission.status)
+            select(
+                combined.c.status,
+                func.sum(combined.c.submissions),
+                func.sum(combined.c.score_total),
+                func.sum(combined.c.scored),
+            )
+            .group_by(combined.c.status)
+            .order_by(combined.c.status)
         ).all()
+
         status_counts = [
-            StatusCount(status=row[0], count=row[1]) for row in status_rows
+            StatusCount(status=row[0], count=int(row[1])) for row in status_rows
         ]
+        total = sum(entry.count for entry in status_counts)
+        score_total = sum(int(row[2] or 0) for row in status_rows)
+        scored = sum(int(row[3] or 0) for row in status_rows)
+        avg_score_value = score_total / scored if scored else None
 
-        avg_score_value = session.scalar(select(func.avg(Submission.score)))
-        if isinstance(avg_score_value, Decimal):
-            avg_score_value = float(avg_score_value)
-        elif avg_score_value is not None:
-            avg_score_value = float(avg_score_value)
-
-        return SubmissionStats(
+        stats = SubmissionStats(
             total=total,
             average_score=avg_score_value,
             status_counts=status_counts,
         )
+        return PydanticJSONResponse(stats, submission_stats_adapter)
+
+    @app.get(
+        "/stats/findings/rules",
+        response_model=list[FindingRuleCount],
+        tags=["stats"],
+    )
+    def finding_rule_stats(
+        challenge_slug: str | None = Query(default=None),
+        tool: str | None = Query(default=None),
+        limit: int = Query(default=20, ge=1, le=200),
+        session: Session = Depends(get_read_session),
+    ) -> list[FindingRuleCount]:
+        live = select(
+            Finding.tool,
+            Finding.rule_id,
+            func.count(Finding.id).label("findings"),
+            func.count(func.distinct(Finding.submission_id)).label("submissions"),
+        ).group_by(Finding.tool, Finding.rule_id)
+        archived = select(
+            FindingRollup.tool,
+            FindingRollup.rule_id,
+            func.sum(FindingRollup.findings),
+            func.sum(FindingRollup.submissions),
+        ).group_by(FindingRollup.tool, FindingRollup.rule_id)
+        if challenge_slug:
+            live = live.where(Finding.challenge_slug == challenge_slug)
+            archived = archived.where(FindingRollup.challenge_slug == challenge_slug)
+        if tool:
+            live = live.where(Finding.tool == tool)
+            archived = archived.where(FindingRollup.tool == tool)
+        combined = union_all(live, archived).subquery()
+        finding_count = func.sum(combined.c.findings)
+        stmt = (
+            select(
+                combined.c.tool,
+                combined.c.rule_id,
+                finding_count,
+                func.sum(combined.c.submissions),
+            )
+            .group_by(combined.c.tool, combined.c.rule_id)
+            .order_by(finding_count.desc(), combined.c.tool, combined.c.rule_id)
+            .limit(limit)
+        )
+        return [
+            FindingRuleCount(
+                tool=row[0], rule_id=row[1], findings=int(row[2]), submissions=int(row[3])
+            )
+            for row in session.execute(stmt)
+        ]
+
+    @app.get(
+        "/stats/findings/severity",
+        response_model=list[FindingSeverityCount],
+        tags=["stats"],
+    )
+    def finding_severity_stats(
+        challenge_slug: str | None = Query(default=None),
+        session: Session = Depends(get_read_session),
+    ) -> list[FindingSeverityCount]:
+        live = select(
+            Finding.challenge_slug, Finding.severity, func.count(Finding.id).label("findings")
+        ).group_by(Finding.challenge_slug, Finding.severity)
+        archived = select(
+            FindingRollup.challenge_slug,
+            FindingRollup.severity,
+            func.sum(FindingRollup.findings),
+        ).group_by(FindingRollup.challenge_slug, FindingRollup.severity)
+        if challenge_slug:
+            live = live.where(Finding.challenge_slug == challenge_slug)
+            archived = archived.where(FindingRollup.challenge_slug == challenge_slug)
+        combined = union_all(live, archived).subquery()
+        stmt = (
+            select(combined.c.challenge_slug, combined.c.severity, func.sum(combined.c.findings))
+            .group_by(combined.c.challenge_slug, combined.c.severity)
+            .order_by(combined.c.challenge_slug, combined.c.severity)
+        )
+        return [
+            FindingSeverityCount(challenge_slug=row[0], severity=row[1], findings=int(row[2]))
+            for row in session.execute(stmt)
+        ]
+
+    @app.get(
+        "/stats/fingerprints",
+        response_model=FingerprintStats,
+        tags=["stats"],
+    )
+    def fingerprint_index_stats(
+        challenge_slug: str | None = Query(default=None),
+        session: Session = Depends(get_read_session),
+    ) -> FingerprintStats:
+        challenges = [
+            FingerprintChallengeStats(
+                challenge_slug=row[0],
+                entries=int(row[1]),
+                hits=int(row[2]),
+                analyzer_runs_saved=int(row[3]),
+            )
+            for row in fingerprint_stats(session, challenge_slug)
+        ]
+        return FingerprintStats(
+            enabled=app.state.scoring_service.fingerprints is not None,
+            entries=sum(entry.entries for entry in challenges),
+            hits=sum(entry.hits for entry in challenges),
+            analyzer_runs_saved=sum(entry.analyzer_runs_saved for entry in challenges),
+            challenges=challenges,
+        )
+
+    @app.post(
+        "/admin/archive",
+        response_model=ArchiveRunOut,
+        tags=["admin"],
+    )
+    def archive_submissions(
+        older_than_days: int | None = Query(default=None, ge=0),
+        _: None = Depends(verify_admin_key),
+    ) -> ArchiveRunOut:
+        days = older_than_days
+        if days is None:
+            days = settings.submission_retention_days
+        if days is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No retention window configured; pass older_than_days",
+            )
+        result = app.state.submission_archive.compact(
+            datetime.utcnow() - timedelta(days=days)
+        )
+        return ArchiveRunOut(
+            cutoff=result.cutoff,
+            archived=result.archived,
+            segments=sorted(result.segments),
+        )
+
+    @app.post(
+        "/admin/reload",
+        response_model=ReloadOut,
+        tags=["admin"],
+    )
+    def reload_content(_: None = Depends(verify_admin_key)) -> ReloadOut:
+        result = app.state.reloader.reload()
+        return ReloadOut(
+            challenges=result.challenges,
+            rule_bundle_version=result.rule_bundle_version,
+            rules_changed=result.rules_changed,
+        )
+
+    @app.post(
+        "/admin/profiles",
+        response_model=ProfileOut,
+        status_code=status.HTTP_201_CREATED,
+        tags=["admin"],
+    )
+    def start_profile(
+        payload: ProfileCreate,
+        _: None = Depends(verify_admin_key),
+    ) -> ProfileOut:
+        endpoints = None
+        if payload.target is ProfileTarget.routes:
+            if not payload.routes:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Route profiles need at least one route template",
+                )
+            try:
+                endpoints = route_endpoints(app.routes, payload.routes)
+            except KeyError as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Unknown routes: {exc.args[0]}",
+                ) from exc
+        try:
+            run = app.state.profiler.start(
+                payload.target,
+                payload.duration_seconds,
+                fmt=payload.format,
+                max_jobs=payload.max_jobs,
+                route_endpoints=endpoints,
+            )
+        except ProfilerBusyError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Profile {exc.args[0]} is already running",
+            ) from exc
+        return ProfileOut.model_validate(run)
+
+    @app.get(
+        "/admin/profiles/{profile_id}",
+        response_model=ProfileOut,
+        tags=["admin"],
+    )
+    def get_profile(
+        profile_id: str,
+        _: None = Depends(verify_admin_key),
+    ) -> ProfileOut:
+        run = app.state.profiler.get(profile_id)
+        if run is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return ProfileOut.model_validate(run)
+
+    @app.post(
+        "/admin/profiles/{profile_id}/stop",
+        response_model=ProfileOut,
+        tags=["admin"],
+    )
+    def stop_profile(
+        profile_id: str,
+        _: None = Depends(verify_admin_key),
+    ) -> ProfileOut:
+        run = app.state.profiler.stop(profile_id)
+        if run is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return ProfileOut.model_validate(run)
 
     return app
 
 
-settings = get_settings()
-app = create_app(settings)
+_default_app: FastAPI | None = None
+
+
+def __getattr__(name: str) -> FastAPI:
+    # `uvicorn backend.app:app` keeps working; the app is built on first access.
+    global _default_app
+    if name == "app":
+        if _default_app is None:
+            _default_app = create_app()
+        return _default_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
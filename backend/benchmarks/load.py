@@ -0,0 +1,266 @@
+"""Ramp a realistic traffic mix against a locally started API.
+
+Run with ``python -m backend.benchmarks.load``. The app is served by uvicorn in
+a child process against a throwaway SQLite database, with rate limiting off,
+stub analyzers (optionally sleeping ``--analyzer-delay-ms``) and a no-op
+sandbox, so the numbers reflect the API rather than Semgrep or Python
+startup. Virtual users then pick requests by weight:
+
+* browsing: ``GET /challenges`` and ``GET /challenges/{slug}``
+* submitting: ``POST /submissions``
+* polling: ``GET /submissions/{submission_id}`` for ids they created
+* stats: ``GET /stats/submissions``
+
+Concurrency steps through ``--stages`` for ``--stage-seconds`` each. Every
+stage reports throughput, p50/p95/p99 latency and the error rate per route
+template. A separate prober hits ``/health`` throughout; its tail latency
+rising with load means something is blocking the event loop.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+# Route template -> relative weight in the traffic mix.
+DEFAULT_MIX = {
+    "GET /challenges": 25,
+    "GET /challenges/{slug}": 20,
+    "POST /submissions": 15,
+    "GET /submissions/{submission_id}": 30,
+    "GET /stats/submissions": 10,
+}
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summarize(samples: list[float], errors: int, elapsed: float) -> dict[str, float]:
+    total = len(samples) + errors
+    summary: dict[str, float] = {
+        "requests": total,
+        "requests_per_second": round(total / elapsed, 1) if elapsed else 0.0,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+    }
+    if samples:
+        summary.update(
+            p50_ms=round(statistics.median(samples), 2),
+            p95_ms=round(_percentile(samples, 95), 2),
+            p99_ms=round(_percentile(samples, 99), 2),
+        )
+    return summary
+
+
+def _serve(port: int, analyzer_delay_ms: float) -> None:
+    import uvicorn
+
+    from backend.app import create_app
+    from backend.benchmarks.scoring import StubAnalyzer, StubSandbox
+    from backend.services.scoring import RuleBundle
+
+    app = create_app()
+    startup = app.router.lifespan_context
+    delay = analyzer_delay_ms / 1000
+
+    @asynccontextmanager
+    async def lifespan(application):
+        async with startup(application):
+            # Replace the bundle the real startup installed.
+            application.state.scoring_service.swap_rule_bundle(
+                RuleBundle(
+                    version="stub",
+                    analyzers=(StubAnalyzer("semgrep", delay), StubAnalyzer("bandit", delay)),
+                )
+            )
+            application.state.scoring_service.sandbox = StubSandbox()
+            yield
+
+    app.router.lifespan_context = lifespan
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    def record(self, route: str, started: float, ok: bool) -> None:
+        if ok:
+            self.latencies[route].append((time.perf_counter() - started) * 1000)
+        else:
+            self.errors[route] += 1
+
+    def report(self, elapsed: float) -> dict[str, dict[str, float]]:
+        routes = sorted(set(self.latencies) | set(self.errors))
+        return {
+            route: _summarize(self.latencies[route], self.errors[route], elapsed)
+            for route in routes
+        }
+
+
+async def _user(client, slugs: list[str], mix: dict[str, int], deadline: float, recorder) -> None:
+    created: list[str] = []
+    routes, weights = list(mix), list(mix.values())
+    rng = random.Random()
+    while time.perf_counter() < deadline:
+        route = rng.choices(routes, weights)[0]
+        if route == "GET /submissions/{submission_id}" and not created:
+            route = "POST /submissions"
+        started = time.perf_counter()
+        try:
+            if route == "GET /challenges":
+                response = await client.get("/challenges")
+            elif route == "GET /challenges/{slug}":
+                response = await client.get(f"/challenges/{rng.choice(slugs)}")
+            elif route == "POST /submissions":
+                response = await client.post(
+                    "/submissions",
+                    json={
+                        "challenge_slug": rng.choice(slugs),
+                        "code": f"print({rng.random()!r})",
+                        "user_handle": f"load{id(created)}",
+                    },
+                )
+                if response.status_code == 201:
+                    created.append(response.json()["id"])
+            elif route == "GET /submissions/{submission_id}":
+                response = await client.get(f"/submissions/{rng.choice(created[-5:])}")
+            else:
+                response = await client.get("/stats/submissions")
+            ok = response.status_code < 400
+        except Exception:
+            ok = False
+        recorder.record(route, started, ok)
+
+
+async def _probe(client, deadline: float, recorder) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            ok = (await client.get("/health")).status_code == 200
+        except Exception:
+            ok = False
+        recorder.record("GET /health", started, ok)
+        await asyncio.sleep(0.05)
+
+
+async def _run_stage(base_url: str, slugs: list[str], users: int, seconds: float) -> dict:
+    import httpx
+
+    recorder, probe = _Recorder(), _Recorder()
+    limits = httpx.Limits(max_connections=users + 1, max_keepalive_connections=users + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        started = time.perf_counter()
+        deadline = started + seconds
+        await asyncio.gather(
+            _probe(client, deadline, probe),
+            *(_user(client, slugs, DEFAULT_MIX, deadline, recorder) for _ in range(users)),
+        )
+        elapsed = time.perf_counter() - started
+    routes = recorder.report(elapsed)
+    total = sum(route["requests"] for route in routes.values())
+    errors = sum(route["requests"] * route["error_rate"] for route in routes.values())
+    return {
+        "users": users,
+        "elapsed_seconds": round(elapsed, 2),
+        "requests_per_second": round(total / elapsed, 1),
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "routes": routes,
+        "health_probe": probe.report(elapsed).get("GET /health", {}),
+    }
+
+
+def _wait_until_ready(base_url: str, server: subprocess.Popen, timeout: float = 60) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise TimeoutError("API server did not become ready")
+
+
+def run(stages: list[int], stage_seconds: float, analyzer_delay_ms: float) -> list[dict]:
+    import httpx
+
+    workdir = Path(tempfile.mkdtemp(prefix="vulnlabs_load_"))
+    port = _free_port()
+    env = {
+        **os.environ,
+        "VULNLABS_DATABASE_URL": f"sqlite:///{workdir / 'load.db'}",
+        "VULNLABS_LOG_LEVEL": "WARNING",
+        "VULNLABS_RATE_LIMIT_ENABLED": "false",
+        "VULNLABS_ARCHIVE_ROOT": str(workdir / "archive"),
+    }
+    env.pop("VULNLABS_API_KEY", None)
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "backend.benchmarks.load",
+            "--serve",
+            str(port),
+            "--analyzer-delay-ms",
+            str(analyzer_delay_ms),
+        ],
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_until_ready(base_url, server)
+        slugs = [item["slug"] for item in httpx.get(f"{base_url}/challenges").json()]
+        return [asyncio.run(_run_stage(base_url, slugs, users, stage_seconds)) for users in stages]
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stages", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--stage-seconds", type=float, default=10.0)
+    parser.add_argument("--analyzer-delay-ms", type=float, default=0.0)
+    parser.add_argument("--output", type=Path, help="Also write the report to this file.")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        _serve(args.serve, args.analyzer_delay_ms)
+        return
+
+    report = run(args.stages, args.stage_seconds, args.analyzer_delay_ms)
+    rendered = json.dumps(report, indent=2)
+    print(rendered)
+    if args.output:
+        args.output.write_text(rendered + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
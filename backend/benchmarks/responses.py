@@ -0,0 +1,143 @@
+"""Measure serialization latency and bytes on the wire for 100-row pages.
+
+Run with ``python -m backend.benchmarks.responses``. The benchmark creates a
+throwaway SQLite database, inserts a page worth of submissions and compares the
+legacy FastAPI serialization path with the pydantic-core fast path, then issues
+HTTP requests with different ``Accept-Encoding`` values.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _timeit(fn: Callable[[], object], iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def _summarize(samples: list[float]) -> dict[str, float]:
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(_percentile(samples, 95), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+    }
+
+
+def run(rows: int, iterations: int) -> dict[str, object]:
+    workdir = Path(tempfile.mkdtemp(prefix="vulnlabs_bench_"))
+    os.environ["VULNLABS_DATABASE_URL"] = f"sqlite:///{workdir / 'bench.db'}"
+    os.environ["VULNLABS_LOG_LEVEL"] = "WARNING"
+    os.environ.pop("VULNLABS_API_KEY", None)
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.testclient import TestClient
+
+    from backend.app import create_app
+    from backend.config import get_settings
+    from backend.db import SessionLocal
+    from backend.models import Finding, Submission
+    from backend.responses import submission_list_response
+    from backend.schemas import SubmissionOut
+    from backend.types import SubmissionStatus
+
+    get_settings.cache_clear()
+    settings = get_settings()
+    app = create_app(settings)
+    # Entering the client runs the lifespan startup (migrations and seeding).
+    client = TestClient(app)
+    client.__enter__()
+
+    snippet = (
+        "from sqlalchemy import text\n\n"
+        "def login(session, username, password):\n"
+        '    query = text("SELECT id FROM users WHERE username = :u AND password = :p")\n'
+        '    return session.execute(query, {"u": username, "p": password}).first()\n'
+    )
+    with SessionLocal() as session:
+        session.add_all(
+            Submission(
+                challenge_slug="sqli_001",
+                code=snippet,
+                user_handle=f"bench{index}",
+                status=SubmissionStatus.passed,
+                score=100,
+                feedback="Detected parameterized query usage without direct string concatenation.",
+                findings=[
+                    Finding(
+                        challenge_slug="sqli_001",
+                        tool="sandbox",
+                        message="Sandbox compilation succeeded.",
+                        severity="info",
+                    )
+                ],
+            )
+            for index in range(rows)
+        )
+        session.commit()
+        orm_rows = session.query(Submission).limit(rows).all()
+
+    def legacy() -> bytes:
+        models = [SubmissionOut.model_validate(item) for item in orm_rows]
+        payload = jsonable_encoder(models, by_alias=True)
+        return json.dumps(payload).encode("utf-8")
+
+    def fast_path() -> bytes:
+        return submission_list_response(orm_rows).body
+
+    report: dict[str, object] = {
+        "rows": rows,
+        "iterations": iterations,
+        "serialization": {
+            "legacy": {**_summarize(_timeit(legacy, iterations)), "bytes": len(legacy())},
+            "pydantic_core": {
+                **_summarize(_timeit(fast_path, iterations)),
+                "bytes": len(fast_path()),
+            },
+        },
+        "http": {},
+    }
+
+    for encoding in ("identity", "gzip", "br"):
+        headers = {"Accept-Encoding": encoding}
+        response = client.get("/submissions", params={"limit": rows}, headers=headers)
+        samples = _timeit(
+            lambda: client.get("/submissions", params={"limit": rows}, headers=headers),
+            iterations,
+        )
+        report["http"][encoding] = {  # type: ignore[index]
+            **_summarize(samples),
+            "content_encoding": response.headers.get("content-encoding", "identity"),
+            "wire_bytes": int(response.headers["content-length"]),
+        }
+    client.__exit__(None, None, None)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.iterations), indent=2))
+
+
+if __name__ == "__main__":
+    main()
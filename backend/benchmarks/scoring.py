@@ -0,0 +1,318 @@
+"""Measure scoring throughput and latency over a synthetic submission corpus.
+
+Run with ``python -m backend.benchmarks.scoring``. For every challenge in the
+bank the corpus holds ``passing`` fixes, ``failing`` (the vulnerable snippet),
+``large`` (a fix buried in a few thousand lines) and ``pathological``
+submissions (deep nesting, a single huge line, a syntax error). Two harnesses
+run over it:
+
+* ``service`` calls ``ChallengeScoringService.score`` directly, one
+  submission at a time, and reports latency per corpus kind.
+* ``worker`` inserts the corpus into a throwaway SQLite database, queues it on
+  a ``ScoringWorker`` and reports jobs/sec plus enqueue-to-commit latency.
+
+Each harness runs with ``stub`` analyzers (no external tools, a no-op sandbox,
+so only the pipeline itself is measured) and ``real`` analyzers (the Semgrep
+rule bundle, Bandit and the configured sandbox; missing binaries are skipped
+and reported). Every mode runs in its own interpreter.
+
+``--write-baseline`` stores the report as JSON; ``--baseline`` compares a run
+with a stored one and exits non-zero when throughput drops or p95 latency grows
+by more than ``--tolerance``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+CORPUS_KINDS = ("passing", "failing", "large", "pathological")
+
+# Fixes the current heuristics accept; other challenges reuse the snippet.
+PASSING_FIXES = {
+    "sqli_001": (
+        "from sqlalchemy import text\n"
+        "query = text(\"SELECT id FROM users WHERE username = :username AND password = :password\")\n"
+        "params = {\"username\": request.json[\"username\"], \"password\": request.json[\"password\"]}\n"
+        "return db.execute(query, params).fetchone()"
+    ),
+    "xss_001": (
+        "import html\n"
+        "nickname = html.escape(request.args.get(\"nickname\", \"\"))\n"
+        "return HTMLResponse(f\"<h2>Welcome, {nickname}</h2>\")"
+    ),
+    "command_injection_001": (
+        "import subprocess\n"
+        "archive_name = request.json[\"archive\"]\n"
+        "return subprocess.run(\n"
+        "    [\"tar\", \"-czf\", f\"{archive_name}.tar.gz\", \"/data/customer\"], check=True\n"
+        ")"
+    ),
+}
+
+
+class StubAnalyzer:
+    """Analyzer stand-in that costs a fixed amount of time and finds nothing."""
+
+    def __init__(self, name: str, delay_seconds: float = 0.0) -> None:
+        self.name = name
+        self.delay_seconds = delay_seconds
+
+    def analyze(self, submission) -> list:
+        if self.delay_seconds:
+            time.sleep(self.delay_seconds)
+        return []
+
+
+class StubSandbox:
+    def run_tests(self, submission) -> tuple[bool, str]:
+        return True, ""
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summarize(samples: list[float]) -> dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(_percentile(samples, 95), 3),
+        "p99_ms": round(_percentile(samples, 99), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+    }
+
+
+def _load_bank(root: Path) -> dict[str, str]:
+    snippets = {}
+    for path in sorted(root.rglob("*.json")):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        snippets[data["id"]] = data.get("vulnerable_snippet", "")
+    return snippets
+
+
+def build_corpus(bank_root: Path, per_kind: int) -> list[tuple[str, str, str]]:
+    """Return `(challenge_slug, kind, code)` triples, `per_kind` of each kind per challenge."""
+    corpus = []
+    for slug, snippet in _load_bank(bank_root).items():
+        fix = PASSING_FIXES.get(slug, snippet)
+        for index in range(per_kind):
+            filler = "\n".join(
+                f"def helper_{index}_{n}(value):\n    return value * {n}\n" for n in range(1500)
+            )
+            variants = {
+                "passing": f"{fix}\n# variant {index}",
+                "failing": f"{snippet}\n# variant {index}",
+                "large": f"{filler}\n{fix}",
+                "pathological": [
+                    "x = " + "(" * 90 + "1" + ")" * 90,
+                    "data = [" + ", ".join(str(n) for n in range(20000)) + "]",
+                    "def broken(:\n    return" + " +" * 500,
+                ][index % 3],
+            }
+            corpus.extend((slug, kind, variants[kind]) for kind in CORPUS_KINDS)
+    return corpus
+
+
+def _scoring_service(analyzers: str, settings):
+    from backend.services.rules import build_rule_bundle
+    from backend.services.sandbox import create_sandbox_executor
+    from backend.services.scoring import ChallengeScoringService, RuleBundle
+
+    if analyzers == "stub":
+        bundle = RuleBundle(
+            version="stub", analyzers=(StubAnalyzer("semgrep"), StubAnalyzer("bandit"))
+        )
+        return ChallengeScoringService(sandbox=StubSandbox(), rule_bundle=bundle), {}
+
+    sandbox = create_sandbox_executor(
+        driver=settings.sandbox_driver,
+        python_executable=settings.python_executable,
+        timeout_seconds=settings.sandbox_timeout_seconds,
+        docker_binary=settings.docker_binary,
+        docker_image=settings.docker_image,
+        docker_memory_limit=settings.docker_memory_limit,
+        docker_cpu_shares=settings.docker_cpu_shares,
+    )
+    available = {
+        "semgrep": shutil.which(settings.semgrep_binary) is not None,
+        "bandit": shutil.which(settings.bandit_binary) is not None,
+    }
+    return (
+        ChallengeScoringService(sandbox=sandbox, rule_bundle=build_rule_bundle(settings)),
+        available,
+    )
+
+
+def _child(harness: str, analyzers: str, per_kind: int, concurrency: int) -> dict:
+    workdir = Path(tempfile.mkdtemp(prefix="vulnlabs_scoring_bench_"))
+    os.environ["VULNLABS_DATABASE_URL"] = f"sqlite:///{workdir / 'bench.db'}"
+    os.environ["VULNLABS_LOG_LEVEL"] = "WARNING"
+
+    from backend.config import get_settings
+    from backend.models import Submission
+
+    settings = get_settings()
+    service, available = _scoring_service(analyzers, settings)
+    corpus = build_corpus(settings.challenge_root, per_kind)
+    report: dict[str, object] = {
+        "harness": harness,
+        "analyzers": analyzers,
+        "submissions": len(corpus),
+    }
+    if available:
+        report["available"] = available
+
+    latencies: dict[str, list[float]] = {kind: [] for kind in CORPUS_KINDS}
+    started = time.perf_counter()
+    if harness == "service":
+        for slug, kind, code in corpus:
+            submission = Submission(challenge_slug=slug, code=code)
+            began = time.perf_counter()
+            service.score(submission)
+            latencies[kind].append((time.perf_counter() - began) * 1000)
+    else:
+        from sqlalchemy import insert
+
+        from backend.db import SessionLocal
+        from backend.db_init import init_db
+        from backend.models import store_code_blobs
+        from backend.services.result_writer import ResultWriter
+        from backend.services.worker import ScoringWorker
+
+        init_db(settings)
+        rows = []
+        kinds: dict[str, str] = {}
+        with SessionLocal() as session:
+            hashes = store_code_blobs(session, [code for _, _, code in corpus])
+            for index, ((slug, kind, _), code_hash) in enumerate(zip(corpus, hashes)):
+                submission_id = f"bench-{index:06d}"
+                kinds[submission_id] = kind
+                rows.append(
+                    {"id": submission_id, "challenge_slug": slug, "code_hash": code_hash}
+                )
+            session.execute(insert(Submission), rows)
+            session.commit()
+
+        worker = ScoringWorker(
+            service,
+            result_writer=ResultWriter(
+                SessionLocal,
+                max_batch=settings.result_writer_max_batch,
+                max_delay_seconds=settings.result_writer_max_delay_ms / 1000,
+            ),
+            concurrency=concurrency,
+        )
+        done_at: dict[str, float] = {}
+        lock = threading.Lock()
+
+        def on_processed(submission_id: str) -> None:
+            with lock:
+                done_at[submission_id] = time.perf_counter()
+
+        worker.add_listener(on_processed)
+        worker.start()
+        started = time.perf_counter()
+        worker.enqueue_many(kinds)
+        worker.flush()
+        worker.stop()
+        for submission_id, finished in done_at.items():
+            latencies[kinds[submission_id]].append((finished - started) * 1000)
+        report["concurrency"] = concurrency
+
+    elapsed = time.perf_counter() - started
+    everything = list(itertools.chain.from_iterable(latencies.values()))
+    report["elapsed_seconds"] = round(elapsed, 3)
+    report["jobs_per_second"] = round(len(everything) / elapsed, 1) if elapsed else None
+    report["latency"] = _summarize(everything)
+    report["latency_by_kind"] = {kind: _summarize(samples) for kind, samples in latencies.items()}
+    return report
+
+
+def compare(current: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """Describe every mode whose throughput or p95 regressed beyond `tolerance`."""
+    previous = {(entry["harness"], entry["analyzers"]): entry for entry in baseline}
+    problems = []
+    for entry in current:
+        key = (entry["harness"], entry["analyzers"])
+        old = previous.get(key)
+        if old is None:
+            continue
+        label = f"{key[0]}/{key[1]}"
+        if entry["jobs_per_second"] < old["jobs_per_second"] * (1 - tolerance):
+            problems.append(
+                f"{label}: {entry['jobs_per_second']} jobs/s vs baseline {old['jobs_per_second']}"
+            )
+        p95, old_p95 = entry["latency"].get("p95_ms"), old["latency"].get("p95_ms")
+        if p95 is not None and old_p95 and p95 > old_p95 * (1 + tolerance):
+            problems.append(f"{label}: p95 {p95} ms vs baseline {old_p95} ms")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--harnesses", nargs="+", default=["service", "worker"])
+    parser.add_argument("--analyzers", nargs="+", default=["stub", "real"])
+    parser.add_argument("--per-kind", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--baseline", type=Path, help="Compare against this JSON report.")
+    parser.add_argument("--write-baseline", type=Path, help="Store the report here.")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        harness, analyzers = args.child
+        print(json.dumps(_child(harness, analyzers, args.per_kind, args.concurrency)))
+        return
+
+    results = []
+    for harness, analyzers in itertools.product(args.harnesses, args.analyzers):
+        completed = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "backend.benchmarks.scoring",
+                "--child",
+                harness,
+                analyzers,
+                "--per-kind",
+                str(args.per_kind),
+                "--concurrency",
+                str(args.concurrency),
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    print(json.dumps(results, indent=2))
+
+    if args.write_baseline:
+        args.write_baseline.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    if args.baseline:
+        problems = compare(
+            results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance
+        )
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Measure cold and warm challenge seeding for a synthetic challenge bank.
+
+Run with ``python -m backend.benchmarks.seeding``. The benchmark writes
+``--challenges`` JSON files into a temporary bank, then times the first seed
+(every file parsed and upserted) and a restart against the unchanged bank
+(manifest check only).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+
+def run(challenges: int) -> dict[str, object]:
+    workdir = Path(tempfile.mkdtemp(prefix="vulnlabs_seed_bench_"))
+    os.environ["VULNLABS_DATABASE_URL"] = f"sqlite:///{workdir / 'bench.db'}"
+    os.environ["VULNLABS_LOG_LEVEL"] = "WARNING"
+
+    from backend.db_init import run_migrations, seed_challenges
+
+    bank = workdir / "bank"
+    for index in range(challenges):
+        category = ("sqli", "xss", "command_injection")[index % 3]
+        directory = bank / "python" / category
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"{category}_{index:05d}.json").write_text(
+            json.dumps(
+                {
+                    "id": f"{category}_{index:05d}",
+                    "title": f"Synthetic {category} #{index}",
+                    "category": category,
+                    "language": "python",
+                    "description": "Synthetic challenge for the seeding benchmark.",
+                    "vulnerable_snippet": "query = 'SELECT * FROM t WHERE id=' + user_id",
+                    "acceptance_criteria": ["Use parameterized queries."],
+                    "hints": ["Bind parameters."],
+                }
+            ),
+            encoding="utf-8",
+        )
+    run_migrations()
+
+    report: dict[str, object] = {"challenges": challenges}
+    for phase in ("cold", "warm"):
+        started = time.perf_counter()
+        upserted = seed_challenges(bank)
+        report[phase] = {
+            "ms": round((time.perf_counter() - started) * 1000, 2),
+            "upserted": upserted,
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--challenges", type=int, default=5000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.challenges), indent=2))
+
+
+if __name__ == "__main__":
+    main()
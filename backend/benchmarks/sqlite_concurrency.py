@@ -0,0 +1,202 @@
+"""Measure concurrent submit-and-score throughput on SQLite.
+
+Run with ``python -m backend.benchmarks.sqlite_concurrency``. Each SQLite
+profile (``tuned`` and ``default``) runs in its own interpreter because the
+engine is configured at import time. Submitter threads insert submissions
+and hand their ids to scorer threads, which mark them running and write a
+result, mirroring the API and ScoringWorker write pattern. Reader threads page
+through recent submissions at the same time.
+
+Scorers either commit each transition themselves (``direct``, two commits per
+submission) or go through the group-committing ``ResultWriter`` (``group``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+def _child(
+    profile: str,
+    writer_mode: str,
+    submitters: int,
+    scorers: int,
+    readers: int,
+    duration: float,
+) -> dict:
+    workdir = Path(tempfile.mkdtemp(prefix="vulnlabs_sqlite_bench_"))
+    os.environ["VULNLABS_DATABASE_URL"] = f"sqlite:///{workdir / 'bench.db'}"
+    os.environ["VULNLABS_SQLITE_PROFILE"] = profile
+    os.environ["VULNLABS_LOG_LEVEL"] = "WARNING"
+
+    from sqlalchemy import select
+    from sqlalchemy.exc import OperationalError
+
+    from backend.config import get_settings
+    from backend.db import ReadSessionLocal, SessionLocal
+    from backend.db_init import init_db
+    from backend.models import Submission
+    from backend.services.result_writer import ResultWriter
+    from backend.types import SubmissionStatus
+
+    init_db(get_settings())
+    writer = ResultWriter(SessionLocal)
+    if writer_mode == "group":
+        writer.start()
+
+    pending: queue.Queue[str] = queue.Queue()
+    stop = threading.Event()
+    lock = threading.Lock()
+    counters = {"submitted": 0, "scored": 0, "reads": 0, "locked_errors": 0}
+
+    def bump(key: str) -> None:
+        with lock:
+            counters[key] += 1
+
+    def submitter(index: int) -> None:
+        sequence = 0
+        while not stop.is_set():
+            sequence += 1
+            try:
+                with SessionLocal() as session:
+                    submission = Submission(
+                        challenge_slug="sqli_001",
+                        code=f"print('{index}-{sequence}')",
+                        user_handle=f"bench{index}",
+                    )
+                    session.add(submission)
+                    session.commit()
+                pending.put(submission.id)
+                bump("submitted")
+            except OperationalError:
+                bump("locked_errors")
+
+    def scorer() -> None:
+        while not stop.is_set():
+            try:
+                submission_id = pending.get(timeout=0.01)
+            except queue.Empty:
+                continue
+            try:
+                if writer_mode == "group":
+                    writer.mark_running(submission_id)
+                    writer.write_result(
+                        submission_id,
+                        "sqli_001",
+                        SubmissionStatus.passed,
+                        score=100,
+                        feedback="benchmark",
+                        issues=[],
+                    ).result()
+                else:
+                    with SessionLocal() as session:
+                        submission = session.get(Submission, submission_id)
+                        submission.status = SubmissionStatus.running
+                        session.commit()
+                        submission.status = SubmissionStatus.passed
+                        submission.score = 100
+                        submission.feedback = "benchmark"
+                        session.commit()
+                bump("scored")
+            except OperationalError:
+                bump("locked_errors")
+
+    def reader() -> None:
+        while not stop.is_set():
+            try:
+                with ReadSessionLocal() as session:
+                    session.scalars(
+                        select(Submission).order_by(Submission.created_at.desc()).limit(50)
+                    ).all()
+                bump("reads")
+            except OperationalError:
+                bump("locked_errors")
+
+    threads = [threading.Thread(target=submitter, args=(i,)) for i in range(submitters)]
+    threads += [threading.Thread(target=scorer) for _ in range(scorers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    writer.stop()
+
+    return {
+        "profile": profile,
+        "writer": writer_mode,
+        "elapsed_seconds": round(elapsed, 3),
+        **counters,
+        "submitted_per_second": round(counters["submitted"] / elapsed, 1),
+        "scored_per_second": round(counters["scored"] / elapsed, 1),
+        "reads_per_second": round(counters["reads"] / elapsed, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", nargs="+", default=["tuned", "default"])
+    parser.add_argument("--writers", nargs="+", default=["group", "direct"])
+    parser.add_argument("--submitters", type=int, default=4)
+    parser.add_argument("--scorers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--child-writer", default="direct", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = _child(
+            args.child,
+            args.child_writer,
+            args.submitters,
+            args.scorers,
+            args.readers,
+            args.duration,
+        )
+        print(json.dumps(result))
+        return
+
+    results = []
+    for profile, writer_mode in itertools.product(args.profiles, args.writers):
+        completed = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "backend.benchmarks.sqlite_concurrency",
+                "--child",
+                profile,
+                "--child-writer",
+                writer_mode,
+                "--submitters",
+                str(args.submitters),
+                "--scorers",
+                str(args.scorers),
+                "--readers",
+                str(args.readers),
+                "--duration",
+                str(args.duration),
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
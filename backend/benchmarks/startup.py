@@ -0,0 +1,105 @@
+"""Measure import and cold-start time and fail when they exceed the budget.
+
+Run with ``python -m backend.benchmarks.startup``. Every sample runs in a fresh
+interpreter: ``import`` times ``import backend.app``; ``cold`` builds the app
+against an empty database and runs the lifespan startup (migrations, seeding,
+analyzers, worker) until ``/health`` answers; ``warm`` does the same against
+the already-initialized database. The best sample of each phase is compared
+with ``VULNLABS_STARTUP_IMPORT_BUDGET_MS`` and ``VULNLABS_STARTUP_BUDGET_MS``
+and the command exits non-zero when either is exceeded.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def _child(phase: str) -> float:
+    started = time.perf_counter()
+    import backend.app as app_module
+
+    if phase == "import":
+        return (time.perf_counter() - started) * 1000
+
+    from fastapi.testclient import TestClient
+
+    with TestClient(app_module.create_app()) as client:
+        client.get("/health").raise_for_status()
+        elapsed = (time.perf_counter() - started) * 1000
+    return elapsed
+
+
+def _sample(phase: str, database_url: str) -> float:
+    env = {
+        **os.environ,
+        "VULNLABS_DATABASE_URL": database_url,
+        "VULNLABS_LOG_LEVEL": "WARNING",
+    }
+    completed = subprocess.run(
+        [sys.executable, "-m", "backend.benchmarks.startup", "--child", phase],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    return float(completed.stdout.strip().splitlines()[-1])
+
+
+def run(repeat: int) -> dict[str, dict[str, float]]:
+    phases: dict[str, list[float]] = {"import": [], "cold": [], "warm": []}
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory(prefix="vulnlabs_startup_bench_") as workdir:
+            database_url = f"sqlite:///{Path(workdir) / 'bench.db'}"
+            phases["import"].append(_sample("import", database_url))
+            phases["cold"].append(_sample("cold", database_url))
+            phases["warm"].append(_sample("warm", database_url))
+    return {
+        phase: {"best_ms": round(min(samples), 1), "max_ms": round(max(samples), 1)}
+        for phase, samples in phases.items()
+    }
+
+
+def main() -> None:
+    from backend.config import get_settings
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--import-budget-ms", type=float, default=settings.startup_import_budget_ms
+    )
+    parser.add_argument("--startup-budget-ms", type=float, default=settings.startup_budget_ms)
+    parser.add_argument("--child", choices=["import", "cold", "warm"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(_child(args.child))
+        return
+
+    report: dict[str, object] = {"phases": run(args.repeat)}
+    budgets = {
+        "import": args.import_budget_ms,
+        "cold": args.startup_budget_ms,
+        "warm": args.startup_budget_ms,
+    }
+    over = {
+        phase: {"best_ms": timings["best_ms"], "budget_ms": budgets[phase]}
+        for phase, timings in report["phases"].items()  # type: ignore[union-attr]
+        if timings["best_ms"] > budgets[phase]
+    }
+    report["budgets_ms"] = budgets
+    report["over_budget"] = over
+    print(json.dumps(report, indent=2))
+    if over:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
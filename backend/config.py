@@ -13,6 +13,30 @@ class Settings(BaseSettings):
     database_url: str = Field(
         default=f"sqlite:///{Path(__file__).resolve().parent / 'data' / 'vulnlabs.db'}"
     )
+    database_pool_size: int = Field(default=10)
+    database_max_overflow: int = Field(default=20)
+    database_pool_timeout_seconds: int = Field(default=30)
+    database_pool_recycle_seconds: int = Field(default=1800)
+    database_pool_pre_ping: bool = Field(default=True)
+    sqlite_profile: str = Field(default="tuned")
+    sqlite_journal_mode: str = Field(default="WAL")
+    sqlite_synchronous: str = Field(default="NORMAL")
+    sqlite_busy_timeout_ms: int = Field(default=5000)
+    sqlite_cache_size_kib: int = Field(default=20000)
+    sqlite_mmap_size_bytes: int = Field(default=268435456)
+    code_compression_min_bytes: int = Field(default=512)
+    submission_retention_days: int | None = Field(default=None)
+    archive_root: Path = Field(
+        default=Path(__file__).resolve().parent / "data" / "archive"
+    )
+    archive_batch_size: int = Field(default=500)
+    archive_interval_seconds: float = Field(default=0.0)
+    reload_poll_interval_seconds: float = Field(default=0.0)
+    profile_output_dir: Path = Field(
+        default=Path(__file__).resolve().parent / "data" / "profiles"
+    )
+    profile_sample_interval_ms: float = Field(default=10.0)
+    profile_max_duration_seconds: float = Field(default=300.0)
     challenge_root: Path = Field(
         default=Path(__file__).resolve().parent / "challenges"
     )
@@ -29,6 +53,7 @@ class Settings(BaseSettings):
     bandit_severity: str = Field(default="LOW")
     bandit_confidence: str = Field(default="LOW")
     api_key: str | None = Field(default=None)
+    admin_api_key: str | None = Field(default=None)
     sandbox_timeout_seconds: int = Field(default=5)
     python_executable: str = Field(default="python3")
     sandbox_driver: str = Field(default="local")
@@ -36,6 +61,48 @@ class Settings(BaseSettings):
     docker_image: str = Field(default="python:3.11-slim")
     docker_memory_limit: str = Field(default="128m")
     docker_cpu_shares: int = Field(default=256)
+    submission_dedup_window_seconds: int = Field(default=120)
+    submission_batch_max_size: int = Field(default=500)
+    worker_concurrency: int = Field(default=4)
+    result_writer_max_batch: int = Field(default=256)
+    result_writer_max_delay_ms: float = Field(default=5.0)
+    result_writer_timeout_seconds: float = Field(default=30.0)
+    rescore_rate_per_second: float = Field(default=20.0)
+    rescore_max_backlog: int = Field(default=10)
+    rescore_job_stale_after_seconds: float = Field(default=3600.0)
+    rate_limit_enabled: bool = Field(default=True)
+    rate_limit_per_api_key: dict[str, str] = Field(
+        default_factory=lambda: {
+            "create_submission": "600/minute",
+            "create_submission_batch": "5000/minute",
+            "preview_submission": "6000/minute",
+            "rescore_submission": "120/minute",
+            "rescore_challenge": "10/minute",
+        }
+    )
+    rate_limit_per_user: dict[str, str] = Field(
+        default_factory=lambda: {
+            "create_submission": "30/minute",
+            "create_submission_batch": "500/minute",
+            "preview_submission": "600/minute",
+            "rescore_submission": "10/minute",
+        }
+    )
+    compression_minimum_size: int = Field(default=1024)
+    compression_gzip_level: int = Field(default=6)
+    compression_brotli_quality: int = Field(default=4)
+    challenge_cache_control: str = Field(default="public, max-age=60")
+    challenge_catalog_refresh_seconds: float = Field(default=5.0)
+    metrics_enabled: bool = Field(default=True)
+    fingerprint_reuse_enabled: bool = Field(default=True)
+    preview_deadline_ms: float = Field(default=20.0)
+    preview_cache_size: int = Field(default=1024)
+    preview_max_code_bytes: int = Field(default=16384)
+    ready_refresh_interval_seconds: float = Field(default=2.0)
+    ready_max_queue_depth: int = Field(default=1000)
+    ready_required_analyzers: list[str] = Field(default_factory=list)
+    startup_import_budget_ms: float = Field(default=2500.0)
+    startup_budget_ms: float = Field(default=5000.0)
     cors_allow_origins: list[str] = Field(
         default_factory=lambda: [
             "http://127.0.0.1:5173",
@@ -1,34 +1,189 @@
 from __future__ import annotations
 
-from typing import Iterator
+import threading
+import time
+from typing import Any, Iterator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
-from .config import get_settings
+from .config import Settings, get_settings
+from .metrics import DB_COMMIT_DURATION
 
-settings = get_settings()
+Base = declarative_base()
 
-connect_args = {"check_same_thread": False} if settings.database_url.startswith(
-    "sqlite"
-) else {}
+# Engines are built on first use rather than at import, so importing the app,
+# forking workers and running CLI tools never opens the database up front.
+_engines: dict[str, Engine] = {}
+_engines_lock = threading.Lock()
+
+
+def is_sqlite_file(settings: Settings) -> bool:
+    url = settings.database_url
+    return (
+        url.startswith("sqlite")
+        and ":memory:" not in url
+        and url not in ("sqlite://", "sqlite:///")
+    )
+
+
+def uses_sqlite_profile(settings: Settings | None = None) -> bool:
+    settings = settings or get_settings()
+    return is_sqlite_file(settings) and settings.sqlite_profile == "tuned"
+
+
+def _apply_sqlite_profile(target: Engine, settings: Settings, read_only: bool) -> None:
+    """Install WAL, busy timeout, cache and mmap PRAGMAs on every new connection.
+
+    Writers open transactions with ``BEGIN IMMEDIATE`` so they queue on the
+    busy timeout up front instead of failing with "database is locked" when a
+    deferred read transaction later tries to upgrade to a write.
+    """
+
+    @event.listens_for(target, "connect")
+    def _on_connect(dbapi_connection, _record) -> None:
+        # Let SQLAlchemy, not pysqlite, decide when transactions begin.
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+            cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+            cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+            cursor.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kib)}")
+            cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size_bytes)}")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            if read_only:
+                cursor.execute("PRAGMA query_only=ON")
+        finally:
+            cursor.close()
+
+    @event.listens_for(target, "begin")
+    def _on_begin(connection) -> None:
+        connection.exec_driver_sql("BEGIN" if read_only else "BEGIN IMMEDIATE")
+
+
+def _create_engines(settings: Settings) -> tuple[Engine, Engine]:
+    is_sqlite = settings.database_url.startswith("sqlite")
+    connect_args = {"check_same_thread": False} if is_sqlite else {}
+
+    # SQLite connections are cheap local file handles; pooling knobs only matter
+    # for server databases such as PostgreSQL.
+    pool_options = (
+        {}
+        if is_sqlite
+        else {
+            "pool_size": settings.database_pool_size,
+            "max_overflow": settings.database_max_overflow,
+            "pool_timeout": settings.database_pool_timeout_seconds,
+            "pool_recycle": settings.database_pool_recycle_seconds,
+            "pool_pre_ping": settings.database_pool_pre_ping,
+        }
+    )
+
+    engine = create_engine(
+        settings.database_url,
+        echo=settings.debug,
+        future=True,
+        connect_args=connect_args,
+        **pool_options,
+    )
+    if not uses_sqlite_profile(settings):
+        return engine, engine
+
+    _apply_sqlite_profile(engine, settings, read_only=False)
+    # WAL lets readers proceed alongside the single writer, so reads get their
+    # own pool of query-only connections.
+    read_engine = create_engine(
+        settings.database_url,
+        echo=settings.debug,
+        future=True,
+        connect_args=connect_args,
+    )
+    _apply_sqlite_profile(read_engine, settings, read_only=True)
+    return engine, read_engine
+
+
+def _ensure_engines() -> dict[str, Engine]:
+    if not _engines:
+        with _engines_lock:
+            if not _engines:
+                writer, reader = _create_engines(get_settings())
+                _engines.update(write=writer, read=reader)
+    return _engines
+
+
+def get_engine() -> Engine:
+    """Return the read-write engine, creating it on first use."""
+    return _ensure_engines()["write"]
+
+
+def get_read_engine() -> Engine:
+    """Return the engine backing read-only sessions (the writer unless SQLite is tuned)."""
+    return _ensure_engines()["read"]
+
+
+def dispose_engines() -> None:
+    """Close pooled connections and forget the engines; the next use recreates them."""
+    with _engines_lock:
+        for engine in set(_engines.values()):
+            engine.dispose()
+        _engines.clear()
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from backend.db import engine` working without eager construction.
+    if name == "engine":
+        return get_engine()
+    if name == "read_engine":
+        return get_read_engine()
+    if name == "use_sqlite_profile":
+        return uses_sqlite_profile()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _WriteSession(Session):
+    def get_bind(self, mapper=None, **kwargs):
+        if self.bind is None:
+            self.bind = get_engine()
+        return super().get_bind(mapper, **kwargs)
+
+
+class _ReadSession(Session):
+    def get_bind(self, mapper=None, **kwargs):
+        if self.bind is None:
+            self.bind = get_read_engine()
+        return super().get_bind(mapper, **kwargs)
 
-engine = create_engine(
-    settings.database_url,
-    echo=settings.debug,
-    future=True,
-    connect_args=connect_args,
-)
 
 SessionLocal = sessionmaker(
-    bind=engine,
+    class_=_WriteSession,
     autoflush=False,
     autocommit=False,
     expire_on_commit=False,
     future=True,
 )
 
-Base = declarative_base()
+
+@event.listens_for(SessionLocal, "before_commit")
+def _commit_started(session: Session) -> None:
+    session.info["commit_started"] = time.perf_counter()
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _commit_finished(session: Session) -> None:
+    started = session.info.pop("commit_started", None)
+    if started is not None:
+        DB_COMMIT_DURATION.observe(time.perf_counter() - started)
+
+
+ReadSessionLocal = sessionmaker(
+    class_=_ReadSession,
+    autoflush=False,
+    autocommit=False,
+    expire_on_commit=False,
+    future=True,
+)
 
 
 def get_session() -> Iterator[Session]:
@@ -38,3 +193,12 @@ def get_session() -> Iterator[Session]:
         yield session
     finally:
         session.close()
+
+
+def get_read_session() -> Iterator[Session]:
+    """Provide a read-only session for endpoints that never write."""
+    session = ReadSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -1,47 +1,198 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+from datetime import datetime
 from pathlib import Path
-from typing import Iterable
 
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 
 from .config import Settings, get_settings
-from .db import Base, SessionLocal, engine
-from .models import Challenge
+from .db import SessionLocal, get_engine
+from .models import Challenge, ChallengeSource
+
+_seed_generation = 0
+
+_CHALLENGE_COLUMNS = (
+    "slug",
+    "title",
+    "category",
+    "language",
+    "description",
+    "vulnerable_snippet",
+    "acceptance_criteria",
+    "hints",
+    "test_cases",
+)
+
+
+MIGRATIONS_ROOT = Path(__file__).resolve().parent / "migrations"
 
 
 def init_db(settings: Settings) -> None:
-    """Create database tables if they do not exist."""
+    """Bring the schema up to date and seed challenges."""
     if settings.database_url.startswith("sqlite:///"):
         db_path = Path(settings.database_url.replace("sqlite:///", ""))
         db_path.parent.mkdir(parents=True, exist_ok=True)
 
-    Base.metadata.create_all(bind=engine)
-    _ensure_analysis_column()
+    run_migrations()
     seed_challenges(settings.challenge_root)
 
 
-def seed_challenges(challenge_root: Path) -> None:
-    """Seed challenge metadata from JSON definitions."""
-    json_files = sorted(challenge_root.rglob("*.json"))
-    if not json_files:
-        return
+def run_migrations(revision: str = "head", bind: Engine | None = None) -> None:
+    """Apply Alembic migrations, by default on the application engine."""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_ROOT))
+    with (bind or get_engine()).begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, revision)
 
+
+def seed_challenges(challenge_root: Path) -> int:
+    """Seed challenge metadata from JSON definitions that changed since the last run.
+
+    `challenge_sources` records the mtime, size and SHA-256 of every file
+    loaded. Files whose mtime and size still match are skipped without being
+    opened; touched files are hashed and only parsed when their content
+    differs. Changed challenges are written with one bulk upsert and the seed
+    generation only moves when something was written. Challenges whose file
+    disappears are kept, since submissions reference them. Returns the number
+    of challenges upserted.
+    """
+    root = challenge_root.resolve()
+    files = _scan_challenge_files(root)
+    if not files:
+        return 0
+
+    prefix = f"{root.as_posix().rstrip('/')}/"
     with SessionLocal() as session:
-        for challenge_data in _load_challenges(json_files):
-            _upsert_challenge(session, challenge_data)
+        # Plain tuples: building ORM objects would dominate an unchanged run.
+        manifest = {
+            row[0]: row[1:]
+            for row in session.execute(
+                select(
+                    ChallengeSource.path,
+                    ChallengeSource.mtime_ns,
+                    ChallengeSource.size,
+                    ChallengeSource.sha256,
+                )
+            )
+        }
+        payloads: dict[str, dict] = {}
+        sources: list[dict] = []
+        touched: list[dict] = []
+        for path, stat in sorted(files.items()):
+            known = manifest.get(path)
+            if known is not None and known[:2] == stat:
+                continue
+            raw = Path(path).read_bytes()
+            digest = hashlib.sha256(raw).hexdigest()
+            if known is not None and known[2] == digest:
+                touched.append({"_path": path, "_mtime_ns": stat[0], "_size": stat[1]})
+                continue
+            payload = _parse_challenge(raw)
+            payloads[payload["slug"]] = payload
+            sources.append(
+                {
+                    "path": path,
+                    "slug": payload["slug"],
+                    "sha256": digest,
+                    "mtime_ns": stat[0],
+                    "size": stat[1],
+                }
+            )
+
+        stale = [path for path in manifest if path.startswith(prefix) and path not in files]
+        stale.extend(source["path"] for source in sources if source["path"] in manifest)
+        if stale:
+            session.execute(
+                delete(ChallengeSource)
+                .where(ChallengeSource.path.in_(stale))
+                .execution_options(synchronize_session=False)
+            )
+        if touched:
+            sources_table = ChallengeSource.__table__
+            session.execute(
+                update(sources_table)
+                .where(sources_table.c.path == bindparam("_path"))
+                .values(mtime_ns=bindparam("_mtime_ns"), size=bindparam("_size")),
+                touched,
+            )
+        if payloads:
+            _upsert_challenges(session, list(payloads.values()))
+            session.execute(insert(ChallengeSource), sources)
         session.commit()
 
+    if payloads:
+        _bump_seed_generation()
+    return len(payloads)
+
+
+def seed_generation() -> int:
+    """Return a counter that changes every time the challenge bank is reseeded."""
+    return _seed_generation
+
+
+def _bump_seed_generation() -> None:
+    global _seed_generation
+    _seed_generation += 1
+
+
+def _scan_challenge_files(root: Path) -> dict[str, tuple[int, int]]:
+    """Map each JSON file under `root` to its (mtime_ns, size) using scandir."""
+    found: dict[str, tuple[int, int]] = {}
+    if not root.is_dir():
+        return found
+    pending = [str(root)]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    pending.append(entry.path)
+                elif entry.name.endswith(".json") and entry.is_file():
+                    stat = entry.stat()
+                    found[entry.path.replace(os.sep, "/")] = (stat.st_mtime_ns, stat.st_size)
+    return found
+
+
+def _parse_challenge(raw: bytes) -> dict:
+    payload = json.loads(raw)
+    payload.setdefault("hints", [])
+    payload.setdefault("acceptance_criteria", [])
+    payload["slug"] = payload.pop("id")
+    return payload
+
+
+def _upsert_challenges(session: Session, payloads: list[dict]) -> None:
+    now = datetime.utcnow()
+    rows = [
+        {
+            **{column: payload.get(column) for column in _CHALLENGE_COLUMNS},
+            "created_at": now,
+            "updated_at": now,
+        }
+        for payload in payloads
+    ]
+    dialect = session.get_bind().dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        for payload in payloads:
+            _upsert_challenge(session, payload)
+        return
 
-def _load_challenges(files: Iterable[Path]) -> Iterable[dict]:
-    for path in files:
-        with path.open("r", encoding="utf-8") as f:
-            payload = json.load(f)
-        payload.setdefault("hints", [])
-        payload.setdefault("acceptance_criteria", [])
-        payload["slug"] = payload.pop("id")
-        yield payload
+    dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+    stmt = dialect_insert(Challenge)
+    updates = {column: stmt.excluded[column] for column in _CHALLENGE_COLUMNS[1:]}
+    updates["updated_at"] = stmt.excluded.updated_at
+    session.execute(
+        stmt.on_conflict_do_update(index_elements=["slug"], set_=updates), rows
+    )
 
 
 def _upsert_challenge(session: Session, payload: dict) -> None:
@@ -53,20 +204,5 @@ def _upsert_challenge(session: Session, payload: dict) -> None:
         session.add(Challenge(**payload))
 
 
-def _ensure_analysis_column() -> None:
-    if engine.dialect.name != "sqlite":
-        return
-
-    with engine.begin() as connection:
-        columns = {
-            row[1]
-            for row in connection.exec_driver_sql("PRAGMA table_info(submissions);")
-        }
-        if "analysis_report" not in columns:
-            connection.exec_driver_sql(
-                "ALTER TABLE submissions ADD COLUMN analysis_report JSON"
-            )
-
-
 if __name__ == "__main__":
     init_db(get_settings())
@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import math
+import threading
+from bisect import bisect_left
+from typing import Callable, Generic, Iterable, Sequence, TypeVar
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_ShardT = TypeVar("_ShardT")
+
+
+class _ThreadShards(Generic[_ShardT]):
+    """Per-thread accumulators.
+
+    Each thread only ever writes its own shard, so the hot path is a
+    thread-local lookup and a plain in-place update with no lock. The lock is
+    taken once per thread (to register its shard) and when collecting.
+    """
+
+    def __init__(self, factory: Callable[[], _ShardT]) -> None:
+        self._factory = factory
+        self._local = threading.local()
+        self._shards: list[_ShardT] = []
+        self._lock = threading.Lock()
+
+    def local(self) -> _ShardT:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._factory()
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def snapshot(self) -> list[_ShardT]:
+        with self._lock:
+            return list(self._shards)
+
+
+class _CounterValue:
+    def __init__(self) -> None:
+        self._shards: _ThreadShards[list[float]] = _ThreadShards(lambda: [0.0])
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._shards.local()[0] += amount
+
+    def value(self) -> float:
+        return sum(shard[0] for shard in self._shards.snapshot())
+
+
+class _HistogramValue:
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        # Shard layout: one count per bucket, then +Inf, then the running sum.
+        size = len(bounds) + 2
+        self._shards: _ThreadShards[list[float]] = _ThreadShards(lambda: [0.0] * size)
+
+    def observe(self, value: float) -> None:
+        shard = self._shards.local()
+        shard[bisect_left(self.bounds, value)] += 1
+        shard[-1] += value
+
+    def totals(self) -> tuple[list[float], float]:
+        counts = [0.0] * (len(self.bounds) + 1)
+        total = 0.0
+        for shard in self._shards.snapshot():
+            for index in range(len(counts)):
+                counts[index] += shard[index]
+            total += shard[-1]
+        return counts, total
+
+
+_ValueT = TypeVar("_ValueT")
+
+
+class _Family(Generic[_ValueT]):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], _ValueT] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> _ValueT:
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self) -> _ValueT:
+        raise NotImplementedError
+
+    def _items(self) -> list[tuple[tuple[str, ...], _ValueT]]:
+        with self._lock:
+            return list(self._children.items())
+
+    def _label_text(self, values: tuple[str, ...], extra: dict[str, str] | None = None) -> str:
+        pairs = list(zip(self.labelnames, values))
+        if extra:
+            pairs.extend(extra.items())
+        if not pairs:
+            return ""
+        rendered = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+        return "{" + rendered + "}"
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._samples()
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class Counter(_Family[_CounterValue]):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterValue:
+        return _CounterValue()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self) -> Iterable[str]:
+        for values, child in self._items():
+            yield f"{self.name}{self._label_text(values)} {_number(child.value())}"
+
+
+class Histogram(_Family[_HistogramValue]):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.bounds = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.bounds)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self) -> Iterable[str]:
+        for values, child in self._items():
+            counts, total = child.totals()
+            cumulative = 0.0
+            for bound, count in zip((*self.bounds, math.inf), counts):
+                cumulative += count
+                labels = self._label_text(values, {"le": _number(bound)})
+                yield f"{self.name}_bucket{labels} {_number(cumulative)}"
+            yield f"{self.name}_sum{self._label_text(values)} {_number(total)}"
+            yield f"{self.name}_count{self._label_text(values)} {_number(cumulative)}"
+
+
+class GaugeFunction:
+    """Gauge whose value is read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._function: Callable[[], float] | None = None
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._function = function
+
+    def render(self) -> Iterable[str]:
+        if self._function is None:
+            return
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield f"{self.name} {_number(self._function())}"
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Histogram | GaugeFunction] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge_function(self, name: str, documentation: str) -> GaugeFunction:
+        return self._register(GaugeFunction(name, documentation))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+REGISTRY = MetricsRegistry()
+
+SCORING_ENQUEUED = REGISTRY.counter(
+    "vulnlabs_scoring_enqueued_total", "Submissions queued for scoring."
+)
+SCORING_QUEUE_DEPTH = REGISTRY.gauge_function(
+    "vulnlabs_scoring_queue_depth", "Submissions waiting in the scoring queue."
+)
+SCORING_QUEUE_WAIT = REGISTRY.histogram(
+    "vulnlabs_scoring_queue_wait_seconds",
+    "Time from enqueue until a worker thread picks the submission up.",
+)
+SCORING_DURATION = REGISTRY.histogram(
+    "vulnlabs_scoring_duration_seconds",
+    "Time from pickup until the submission's result is committed.",
+    ("status",),
+)
+ANALYZER_DURATION = REGISTRY.histogram(
+    "vulnlabs_analyzer_duration_seconds",
+    "Wall time of each analyzer and sandbox run.",
+    ("analyzer",),
+)
+ANALYZER_RUNS = REGISTRY.counter(
+    "vulnlabs_analyzer_runs_total",
+    "Analyzer and sandbox runs by outcome.",
+    ("analyzer", "outcome"),
+)
+FINGERPRINT_LOOKUPS = REGISTRY.counter(
+    "vulnlabs_fingerprint_lookups_total",
+    "Fingerprint index lookups by outcome (hit, miss, unparseable).",
+    ("outcome",),
+)
+ANALYZER_RUNS_SAVED = REGISTRY.counter(
+    "vulnlabs_analyzer_runs_saved_total",
+    "Analyzer and sandbox runs skipped by reusing a fingerprint match.",
+)
+PREVIEW_REQUESTS = REGISTRY.counter(
+    "vulnlabs_preview_requests_total",
+    "Submission previews by outcome (hit, complete, partial).",
+    ("outcome",),
+)
+RESULT_WRITER_QUEUE_DEPTH = REGISTRY.gauge_function(
+    "vulnlabs_result_writer_queue_depth", "Writes waiting for the result writer thread."
+)
+RESULT_WRITER_BATCH_SIZE = REGISTRY.histogram(
+    "vulnlabs_result_writer_batch_size",
+    "Writes applied per result-writer transaction.",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500),
+)
+DB_COMMIT_DURATION = REGISTRY.histogram(
+    "vulnlabs_db_commit_duration_seconds",
+    "Duration of read-write session commits, including the final flush.",
+)
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "vulnlabs_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route"),
+)
+HTTP_REQUESTS = REGISTRY.counter(
+    "vulnlabs_http_requests_total",
+    "HTTP responses by route template and status code.",
+    ("method", "route", "status"),
+)
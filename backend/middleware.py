@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import time
+import zlib
+from typing import Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS
+
+try:  # brotli is in requirements.txt; fall back to gzip where it is missing.
+    import brotli
+except ImportError:
+    brotli = None  # type: ignore[assignment]
+
+_UNCOMPRESSIBLE_TYPES = ("text/event-stream", "image/", "video/", "audio/")
+
+
+class _Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes:
+        ...
+
+    def flush(self) -> bytes:
+        ...
+
+    def finish(self) -> bytes:
+        ...
+
+
+class _GzipCompressor:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def negotiate_encoding(accept_encoding: str, brotli_enabled: bool = True) -> str | None:
+    """Pick `br` or `gzip` from an `Accept-Encoding` header, honouring q-values."""
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[token] = quality
+
+    candidates = ["br", "gzip"] if brotli_enabled and brotli is not None else ["gzip"]
+    best: str | None = None
+    best_weight = 0.0
+    for encoding in candidates:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class CompressionMiddleware:
+    """Negotiated gzip/brotli compression for responses above a size threshold.
+
+    Small bodies and responses that already carry a `Content-Encoding` pass
+    through uncompressed. Every response of a compressible type carries
+    `Vary: Accept-Encoding`, whatever its size or the request's header, so
+    caches never serve one encoding to a client that asked for another.
+    Streaming bodies are compressed chunk by chunk with a sync flush so
+    clients keep receiving data as it is produced.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        brotli_enabled: bool = True,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.brotli_enabled = brotli_enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        encoding = negotiate_encoding(accept_encoding, self.brotli_enabled)
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def make_compressor(self, encoding: str) -> _Compressor:
+        if encoding == "br":
+            return _BrotliCompressor(self.brotli_quality)
+        return _GzipCompressor(self.gzip_level)
+
+
+class _CompressionResponder:
+    def __init__(
+        self, middleware: CompressionMiddleware, encoding: str | None, send: Send
+    ) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self._start: Message | None = None
+        self._compressor: _Compressor | None = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self._start = message
+            return
+        if message_type != "http.response.body":
+            await self._send(message)
+            return
+
+        if self._start is not None:
+            await self._send_first_body(message)
+            return
+        if self._passthrough or self._compressor is None:
+            await self._send(message)
+            return
+
+        body = self._compressor.compress(message.get("body", b""))
+        more_body = message.get("more_body", False)
+        body += self._compressor.flush() if more_body else self._compressor.finish()
+        await self._send(
+            {"type": "http.response.body", "body": body, "more_body": more_body}
+        )
+
+    async def _send_first_body(self, message: Message) -> None:
+        start, self._start = self._start, None
+        assert start is not None
+        headers = MutableHeaders(raw=start["headers"])
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        content_type = headers.get("content-type", "")
+        compressible = "content-encoding" not in headers and not content_type.startswith(
+            _UNCOMPRESSIBLE_TYPES
+        )
+        if compressible:
+            headers.add_vary_header("Accept-Encoding")
+        if (
+            not compressible
+            or self.encoding is None
+            or (not more_body and len(body) < self.middleware.minimum_size)
+        ):
+            self._passthrough = True
+            await self._send(start)
+            await self._send(message)
+            return
+
+        self._compressor = self.middleware.make_compressor(self.encoding)
+        headers["Content-Encoding"] = self.encoding
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # The encoded bytes differ from the identity representation.
+            headers["ETag"] = f"W/{etag}"
+
+        compressed = self._compressor.compress(body)
+        if more_body:
+            compressed += self._compressor.flush()
+            del headers["Content-Length"]
+        else:
+            compressed += self._compressor.finish()
+            headers["Content-Length"] = str(len(compressed))
+
+        await self._send(start)
+        await self._send(
+            {"type": "http.response.body", "body": compressed, "more_body": more_body}
+        )
+
+
+class RateLimitHeadersMiddleware:
+    """Copy the rate-limit decision recorded on `request.state` into response headers."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                decision = scope.get("state", {}).get("rate_limit")
+                if decision is not None:
+                    headers = MutableHeaders(scope=message)
+                    for name, value in decision.headers().items():
+                        if name not in headers:
+                            headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+class MetricsMiddleware:
+    """Record request latency and status per route template.
+
+    The route is read from the scope after the app has handled the request,
+    so `/submissions/{submission_id}` is one series rather than one per id.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "<unmatched>"
+            method = scope["method"]
+            HTTP_REQUEST_DURATION.labels(method, template).observe(
+                time.perf_counter() - started
+            )
+            HTTP_REQUESTS.labels(method, template, str(status_code)).inc()
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+config = context.config
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run(connection)
+        return
+
+    from backend.config import get_settings
+
+    section = config.get_section(config.config_ini_section) or {}
+    section.setdefault("sqlalchemy.url", get_settings().database_url)
+    connectable = engine_from_config(section, prefix="sqlalchemy.", poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        _run(connection)
+
+
+def run_migrations_offline() -> None:
+    from backend.config import get_settings
+
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url") or get_settings().database_url,
+        literal_binds=True,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def _run(connection) -> None:
+    # Batch mode lets ALTER-style migrations work on SQLite as well as PostgreSQL.
+    context.configure(connection=connection, render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,77 @@
+"""Initial challenges and submissions schema.
+
+Databases created by the pre-migration `create_all` bootstrap already hold
+these tables; they are adopted as-is, adding `analysis_report` if missing.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+submission_status = sa.Enum(
+    "pending", "running", "passed", "failed", "error", name="submissionstatus"
+)
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    if "challenges" not in tables:
+        op.create_table(
+            "challenges",
+            sa.Column("slug", sa.String(64), primary_key=True),
+            sa.Column("title", sa.String(255), nullable=False),
+            sa.Column("category", sa.String(64), nullable=False),
+            sa.Column("language", sa.String(32), nullable=False),
+            sa.Column("description", sa.Text(), nullable=False),
+            sa.Column("vulnerable_snippet", sa.Text(), nullable=False),
+            sa.Column("acceptance_criteria", sa.JSON(), nullable=False),
+            sa.Column("hints", sa.JSON()),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_challenges_category", "challenges", ["category"])
+        op.create_index("ix_challenges_language", "challenges", ["language"])
+
+    if "submissions" not in tables:
+        op.create_table(
+            "submissions",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column(
+                "challenge_slug",
+                sa.String(64),
+                sa.ForeignKey("challenges.slug", ondelete="CASCADE"),
+                nullable=False,
+            ),
+            sa.Column("user_handle", sa.String(64)),
+            sa.Column("code", sa.Text(), nullable=False),
+            sa.Column("status", submission_status, nullable=False),
+            sa.Column("score", sa.Integer()),
+            sa.Column("feedback", sa.Text()),
+            sa.Column("analysis_report", sa.JSON()),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index(
+            "ix_submissions_challenge_slug", "submissions", ["challenge_slug"]
+        )
+    else:
+        columns = {column["name"] for column in inspector.get_columns("submissions")}
+        if "analysis_report" not in columns:
+            op.add_column("submissions", sa.Column("analysis_report", sa.JSON()))
+
+
+def downgrade() -> None:
+    op.drop_table("submissions")
+    op.drop_table("challenges")
+    submission_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,64 @@
+"""Add code_hash and idempotency_key to submissions.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+import hashlib
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    columns = {column["name"] for column in sa.inspect(bind).get_columns("submissions")}
+    # Databases bootstrapped by the old create_all path may already have these.
+    if "code_hash" not in columns:
+        op.add_column("submissions", sa.Column("code_hash", sa.String(64)))
+        op.create_index("ix_submissions_code_hash", "submissions", ["code_hash"])
+    if "idempotency_key" not in columns:
+        op.add_column("submissions", sa.Column("idempotency_key", sa.String(128)))
+        op.create_index(
+            "ix_submissions_idempotency_key",
+            "submissions",
+            ["idempotency_key"],
+            unique=True,
+        )
+
+    submissions = sa.table(
+        "submissions",
+        sa.column("id", sa.String),
+        sa.column("code", sa.Text),
+        sa.column("code_hash", sa.String),
+    )
+    rows = bind.execute(
+        sa.select(submissions.c.id, submissions.c.code).where(
+            submissions.c.code_hash.is_(None)
+        )
+    ).all()
+    if rows:
+        bind.execute(
+            submissions.update()
+            .where(submissions.c.id == sa.bindparam("_id"))
+            .values(code_hash=sa.bindparam("_code_hash")),
+            [
+                {"_id": row.id, "_code_hash": hashlib.sha256(row.code.encode("utf-8")).hexdigest()}
+                for row in rows
+            ],
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_submissions_idempotency_key", table_name="submissions")
+    op.drop_index("ix_submissions_code_hash", table_name="submissions")
+    with op.batch_alter_table("submissions") as batch:
+        batch.drop_column("idempotency_key")
+        batch.drop_column("code_hash")
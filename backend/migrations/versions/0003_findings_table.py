@@ -0,0 +1,84 @@
+"""Normalize submission findings into an indexed table.
+
+Findings previously lived in the `submissions.analysis_report` JSON blob.
+They are copied into `findings` and the blob column is dropped.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    findings = op.create_table(
+        "findings",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "submission_id",
+            sa.String(36),
+            sa.ForeignKey("submissions.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("challenge_slug", sa.String(64), nullable=False),
+        sa.Column("tool", sa.String(32), nullable=False),
+        sa.Column("rule_id", sa.String(255)),
+        sa.Column("severity", sa.String(32), nullable=False),
+        sa.Column("message", sa.Text(), nullable=False),
+    )
+    op.create_index("ix_findings_submission_id", "findings", ["submission_id"])
+    op.create_index(
+        "ix_findings_challenge_tool_rule",
+        "findings",
+        ["challenge_slug", "tool", "rule_id"],
+    )
+    op.create_index("ix_findings_tool_rule", "findings", ["tool", "rule_id"])
+
+    bind = op.get_bind()
+    submissions = sa.table(
+        "submissions",
+        sa.column("id", sa.String),
+        sa.column("challenge_slug", sa.String),
+        sa.column("analysis_report", sa.JSON),
+    )
+    rows = []
+    for submission in bind.execute(
+        sa.select(
+            submissions.c.id,
+            submissions.c.challenge_slug,
+            submissions.c.analysis_report,
+        )
+    ):
+        for issue in submission.analysis_report or []:
+            rows.append(
+                {
+                    "submission_id": submission.id,
+                    "challenge_slug": submission.challenge_slug,
+                    "tool": str(issue.get("tool", "unknown"))[:32],
+                    "rule_id": None,
+                    "severity": str(issue.get("severity", "info"))[:32],
+                    "message": str(issue.get("message", "")),
+                }
+            )
+    if rows:
+        op.bulk_insert(findings, rows)
+
+    with op.batch_alter_table("submissions") as batch:
+        batch.drop_column("analysis_report")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("submissions") as batch:
+        batch.add_column(sa.Column("analysis_report", sa.JSON()))
+    op.drop_index("ix_findings_tool_rule", table_name="findings")
+    op.drop_index("ix_findings_challenge_tool_rule", table_name="findings")
+    op.drop_index("ix_findings_submission_id", table_name="findings")
+    op.drop_table("findings")
@@ -0,0 +1,104 @@
+"""Move submission code into content-addressed blobs.
+
+Each distinct code body is stored once in `code_blobs`, keyed by its SHA-256
+hash and zlib-compressed when that saves space. `submissions.code` is dropped
+and `submissions.code_hash` becomes a required foreign key.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+import hashlib
+import zlib
+from datetime import datetime
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+COMPRESS_MIN_BYTES = 512
+
+
+def upgrade() -> None:
+    blobs = op.create_table(
+        "code_blobs",
+        sa.Column("hash", sa.String(64), primary_key=True),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("compression", sa.String(16)),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+
+    bind = op.get_bind()
+    submissions = sa.table(
+        "submissions",
+        sa.column("id", sa.String),
+        sa.column("code", sa.Text),
+        sa.column("code_hash", sa.String),
+    )
+    stored: set[str] = set()
+    blob_rows = []
+    hash_updates = []
+    now = datetime.utcnow()
+    for row in bind.execute(
+        sa.select(submissions.c.id, submissions.c.code, submissions.c.code_hash)
+    ):
+        raw = row.code.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        if row.code_hash != digest:
+            hash_updates.append({"_id": row.id, "_code_hash": digest})
+        if digest in stored:
+            continue
+        stored.add(digest)
+        data, compression = raw, None
+        if len(raw) >= COMPRESS_MIN_BYTES:
+            packed = zlib.compress(raw, 6)
+            if len(packed) < len(raw):
+                data, compression = packed, "zlib"
+        blob_rows.append(
+            {
+                "hash": digest,
+                "size": len(raw),
+                "compression": compression,
+                "data": data,
+                "created_at": now,
+            }
+        )
+    if blob_rows:
+        op.bulk_insert(blobs, blob_rows)
+    if hash_updates:
+        bind.execute(
+            submissions.update()
+            .where(submissions.c.id == sa.bindparam("_id"))
+            .values(code_hash=sa.bindparam("_code_hash")),
+            hash_updates,
+        )
+
+    with op.batch_alter_table("submissions") as batch:
+        batch.drop_column("code")
+        batch.alter_column("code_hash", existing_type=sa.String(64), nullable=False)
+        batch.create_foreign_key(
+            "fk_submissions_code_hash_code_blobs", "code_blobs", ["code_hash"], ["hash"]
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("submissions") as batch:
+        batch.drop_constraint("fk_submissions_code_hash_code_blobs", type_="foreignkey")
+        batch.alter_column("code_hash", existing_type=sa.String(64), nullable=True)
+        batch.add_column(sa.Column("code", sa.Text()))
+
+    bind = op.get_bind()
+    for row in bind.execute(sa.text("SELECT hash, compression, data FROM code_blobs")):
+        data = zlib.decompress(row.data) if row.compression == "zlib" else row.data
+        bind.execute(
+            sa.text("UPDATE submissions SET code = :code WHERE code_hash = :hash"),
+            {"code": data.decode("utf-8"), "hash": row.hash},
+        )
+    op.drop_table("code_blobs")
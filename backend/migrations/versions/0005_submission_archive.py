@@ -0,0 +1,77 @@
+"""Add the submission archive index and rollup tables.
+
+Compacted submissions leave the hot tables; `archived_submissions` records
+where each one lives in the on-disk segments, and the rollup tables keep the
+aggregates served by the stats endpoints.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "archived_submissions",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("challenge_slug", sa.String(64), nullable=False),
+        sa.Column("user_handle", sa.String(64)),
+        sa.Column("status", sa.String(16), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+        sa.Column("segment", sa.String(255), nullable=False),
+        sa.Column("offset", sa.BigInteger(), nullable=False),
+        sa.Column("length", sa.Integer(), nullable=False),
+        sa.Column("line", sa.Integer(), nullable=False),
+    )
+    op.create_index(
+        "ix_archived_submissions_challenge_slug",
+        "archived_submissions",
+        ["challenge_slug"],
+    )
+    op.create_table(
+        "submission_rollups",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("challenge_slug", sa.String(64), nullable=False),
+        sa.Column("status", sa.String(16), nullable=False),
+        sa.Column("submissions", sa.Integer(), nullable=False),
+        sa.Column("score_total", sa.BigInteger(), nullable=False),
+        sa.Column("scored", sa.Integer(), nullable=False),
+        sa.UniqueConstraint(
+            "challenge_slug", "status", name="uq_submission_rollups_slug_status"
+        ),
+    )
+    op.create_table(
+        "finding_rollups",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("challenge_slug", sa.String(64), nullable=False),
+        sa.Column("tool", sa.String(32), nullable=False),
+        sa.Column("rule_id", sa.String(255)),
+        sa.Column("severity", sa.String(32), nullable=False),
+        sa.Column("findings", sa.Integer(), nullable=False),
+        sa.Column("submissions", sa.Integer(), nullable=False),
+    )
+    op.create_index(
+        "ix_finding_rollups_challenge_tool_rule",
+        "finding_rollups",
+        ["challenge_slug", "tool", "rule_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_finding_rollups_challenge_tool_rule", table_name="finding_rollups")
+    op.drop_table("finding_rollups")
+    op.drop_table("submission_rollups")
+    op.drop_index(
+        "ix_archived_submissions_challenge_slug", table_name="archived_submissions"
+    )
+    op.drop_table("archived_submissions")
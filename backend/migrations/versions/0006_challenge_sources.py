@@ -0,0 +1,33 @@
+"""Add the challenge seeding manifest.
+
+`seed_challenges` records the hash, mtime and size of every challenge file it
+loads so later runs only parse files that changed.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "challenge_sources",
+        sa.Column("path", sa.String(1024), primary_key=True),
+        sa.Column("slug", sa.String(64), nullable=False),
+        sa.Column("sha256", sa.String(64), nullable=False),
+        sa.Column("mtime_ns", sa.BigInteger(), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("challenge_sources")
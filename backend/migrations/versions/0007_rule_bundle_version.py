@@ -0,0 +1,25 @@
+"""Tag submissions with the rule bundle version that scored them.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("submissions") as batch:
+        batch.add_column(sa.Column("rule_bundle_version", sa.String(32)))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("submissions") as batch:
+        batch.drop_column("rule_bundle_version")
@@ -0,0 +1,25 @@
+"""Ship functional test cases with each challenge.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("challenges") as batch:
+        batch.add_column(sa.Column("test_cases", sa.JSON()))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("challenges") as batch:
+        batch.drop_column("test_cases")
@@ -0,0 +1,39 @@
+"""Add the normalized-AST fingerprint index of scoring verdicts.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "result_fingerprints",
+        sa.Column("challenge_slug", sa.String(64), primary_key=True),
+        sa.Column("toolchain_version", sa.String(32), primary_key=True),
+        sa.Column("fingerprint", sa.String(64), primary_key=True),
+        sa.Column("heuristic", sa.String(32), nullable=False),
+        sa.Column("status", sa.String(16), nullable=False),
+        sa.Column("score", sa.Integer()),
+        sa.Column("feedback", sa.Text()),
+        sa.Column("issues", sa.JSON(), nullable=False),
+        sa.Column("source_submission_id", sa.String(36), nullable=False),
+        sa.Column("analyzer_runs", sa.Integer(), nullable=False),
+        sa.Column("hits", sa.Integer(), nullable=False),
+        sa.Column("analyzer_runs_saved", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("last_hit_at", sa.DateTime()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("result_fingerprints")
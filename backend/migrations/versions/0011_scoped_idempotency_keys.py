@@ -0,0 +1,40 @@
+"""Scope Idempotency-Key uniqueness to the caller.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_index("ix_submissions_idempotency_key", table_name="submissions")
+    with op.batch_alter_table("submissions") as batch:
+        batch.add_column(sa.Column("idempotency_scope", sa.String(32)))
+    # Keys stored before this revision have no scope and never match again.
+    op.create_index(
+        "ix_submissions_idempotency",
+        "submissions",
+        ["idempotency_scope", "idempotency_key"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_submissions_idempotency", table_name="submissions")
+    with op.batch_alter_table("submissions") as batch:
+        batch.drop_column("idempotency_scope")
+    op.create_index(
+        "ix_submissions_idempotency_key",
+        "submissions",
+        ["idempotency_key"],
+        unique=True,
+    )
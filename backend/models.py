@@ -1,18 +1,46 @@
 from __future__ import annotations
 
+import hashlib
+import zlib
 from datetime import datetime
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from uuid import uuid4
 
-from sqlalchemy import DateTime, Enum as SAEnum, ForeignKey, String
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Enum as SAEnum,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    UniqueConstraint,
+    event,
+    insert,
+    select,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
 from sqlalchemy.types import JSON, Text
 
+from .config import get_settings
 from .types import SubmissionStatus
 
 from .db import Base
 
 
+def compute_code_hash(code: str) -> str:
+    """Return the SHA-256 hex digest used to identify submission code."""
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+def idempotency_scope(caller: str, user_handle: str | None) -> str:
+    """Namespace for Idempotency-Key values: the calling API key (or address) and user."""
+    scope = f"{caller}\n{user_handle or ''}"
+    return hashlib.sha256(scope.encode("utf-8")).hexdigest()[:32]
+
+
 class Challenge(Base):
     """Persisted representation of a vulnerable coding challenge."""
 
@@ -26,6 +54,8 @@ class Challenge(Base):
     vulnerable_snippet: Mapped[str] = mapped_column(Text, nullable=False)
     acceptance_criteria: Mapped[List[str]] = mapped_column(JSON, nullable=False)
     hints: Mapped[Optional[List[str]]] = mapped_column(JSON)
+    # Functional cases the sandbox harness runs; not part of the public payload.
+    test_cases: Mapped[Optional[List[dict]]] = mapped_column(JSON)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, nullable=False
     )
@@ -39,10 +69,27 @@ class Challenge(Base):
     )
 
 
+class ChallengeSource(Base):
+    """Manifest entry for a seeded challenge file, used to skip unchanged files."""
+
+    __tablename__ = "challenge_sources"
+
+    path: Mapped[str] = mapped_column(String(1024), primary_key=True)
+    slug: Mapped[str] = mapped_column(String(64), nullable=False)
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False)
+    mtime_ns: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
 class Submission(Base):
     """Track user fixes awaiting scoring."""
 
     __tablename__ = "submissions"
+    __table_args__ = (
+        Index(
+            "ix_submissions_idempotency", "idempotency_scope", "idempotency_key", unique=True
+        ),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid4())
@@ -51,13 +98,20 @@ class Submission(Base):
         ForeignKey("challenges.slug", ondelete="CASCADE"), nullable=False, index=True
     )
     user_handle: Mapped[Optional[str]] = mapped_column(String(64))
-    code: Mapped[str] = mapped_column(Text, nullable=False)
+    code_hash: Mapped[str] = mapped_column(
+        ForeignKey("code_blobs.hash"), nullable=False, index=True
+    )
+    # Idempotency keys are unique per caller: see `idempotency_scope()`.
+    idempotency_scope: Mapped[Optional[str]] = mapped_column(String(32))
+    idempotency_key: Mapped[Optional[str]] = mapped_column(String(128))
     status: Mapped[SubmissionStatus] = mapped_column(
         SAEnum(SubmissionStatus), default=SubmissionStatus.pending, nullable=False
     )
     score: Mapped[Optional[int]] = mapped_column()
     feedback: Mapped[Optional[str]] = mapped_column(Text)
-    analysis_report: Mapped[Optional[List[dict]]] = mapped_column(JSON, default=list)
+    rule_bundle_version: Mapped[Optional[str]] = mapped_column(String(32))
+    # Compact JSON of stage name -> milliseconds, written with the result.
+    stage_timings: Mapped[Optional[str]] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, nullable=False
     )
@@ -66,3 +120,198 @@ class Submission(Base):
     )
 
     challenge: Mapped[Challenge] = relationship("Challenge", back_populates="submissions")
+    blob: Mapped["CodeBlob"] = relationship("CodeBlob", lazy="joined", innerjoin=True)
+    findings: Mapped[list["Finding"]] = relationship(
+        "Finding",
+        back_populates="submission",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="selectin",
+        order_by="Finding.id",
+    )
+
+    @property
+    def code(self) -> str:
+        cached = getattr(self, "_code_text", None)
+        if cached is not None:
+            return cached
+        return self.blob.text
+
+    @code.setter
+    def code(self, value: str) -> None:
+        # The blob row is written by the before_flush hook below.
+        self._code_text = value
+        self._code_unstored = True
+        self.code_hash = compute_code_hash(value)
+
+
+class Finding(Base):
+    """Single analyzer or sandbox finding attached to a submission."""
+
+    __tablename__ = "findings"
+    __table_args__ = (
+        Index("ix_findings_challenge_tool_rule", "challenge_slug", "tool", "rule_id"),
+        Index("ix_findings_tool_rule", "tool", "rule_id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    submission_id: Mapped[str] = mapped_column(
+        ForeignKey("submissions.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    challenge_slug: Mapped[str] = mapped_column(String(64), nullable=False)
+    tool: Mapped[str] = mapped_column(String(32), nullable=False)
+    rule_id: Mapped[Optional[str]] = mapped_column(String(255))
+    severity: Mapped[str] = mapped_column(String(32), nullable=False)
+    message: Mapped[str] = mapped_column(Text, nullable=False)
+
+    submission: Mapped[Submission] = relationship("Submission", back_populates="findings")
+
+
+class CodeBlob(Base):
+    """Submission source stored once per SHA-256 content hash."""
+
+    __tablename__ = "code_blobs"
+
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    compression: Mapped[Optional[str]] = mapped_column(String(16))
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+
+    @property
+    def text(self) -> str:
+        data = zlib.decompress(self.data) if self.compression == "zlib" else self.data
+        return data.decode("utf-8")
+
+
+class ArchivedSubmission(Base):
+    """Index entry locating a compacted submission inside an archive segment."""
+
+    __tablename__ = "archived_submissions"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    challenge_slug: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    user_handle: Mapped[Optional[str]] = mapped_column(String(64))
+    status: Mapped[str] = mapped_column(String(16), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    segment: Mapped[str] = mapped_column(String(255), nullable=False)
+    offset: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    length: Mapped[int] = mapped_column(Integer, nullable=False)
+    line: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class SubmissionRollup(Base):
+    """Per challenge/status totals for submissions that have been archived."""
+
+    __tablename__ = "submission_rollups"
+    __table_args__ = (
+        UniqueConstraint("challenge_slug", "status", name="uq_submission_rollups_slug_status"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    challenge_slug: Mapped[str] = mapped_column(String(64), nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False)
+    submissions: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    score_total: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    scored: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class FindingRollup(Base):
+    """Per challenge/tool/rule/severity finding totals for archived submissions."""
+
+    __tablename__ = "finding_rollups"
+    __table_args__ = (
+        Index("ix_finding_rollups_challenge_tool_rule", "challenge_slug", "tool", "rule_id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    challenge_slug: Mapped[str] = mapped_column(String(64), nullable=False)
+    tool: Mapped[str] = mapped_column(String(32), nullable=False)
+    rule_id: Mapped[Optional[str]] = mapped_column(String(255))
+    severity: Mapped[str] = mapped_column(String(32), nullable=False)
+    findings: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    submissions: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class ResultFingerprint(Base):
+    """Scoring verdict remembered for a normalized-AST fingerprint of a submission."""
+
+    __tablename__ = "result_fingerprints"
+
+    challenge_slug: Mapped[str] = mapped_column(String(64), primary_key=True)
+    toolchain_version: Mapped[str] = mapped_column(String(32), primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # Status and score of the challenge heuristic, which reads the raw text.
+    heuristic: Mapped[str] = mapped_column(String(32), nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False)
+    score: Mapped[Optional[int]] = mapped_column(Integer)
+    feedback: Mapped[Optional[str]] = mapped_column(Text)
+    issues: Mapped[List[dict]] = mapped_column(JSON, nullable=False)
+    source_submission_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    analyzer_runs: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    hits: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    analyzer_runs_saved: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_hit_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+
+def encode_code_blob(code: str, compress_min_bytes: int) -> dict:
+    """Build a `code_blobs` row, zlib-compressing when it saves space."""
+    raw = code.encode("utf-8")
+    data, compression = raw, None
+    if 0 < compress_min_bytes <= len(raw):
+        packed = zlib.compress(raw, 6)
+        if len(packed) < len(raw):
+            data, compression = packed, "zlib"
+    return {
+        "hash": hashlib.sha256(raw).hexdigest(),
+        "size": len(raw),
+        "compression": compression,
+        "data": data,
+        "created_at": datetime.utcnow(),
+    }
+
+
+def store_code_blobs(session: Session, codes: Iterable[str]) -> list[str]:
+    """Insert blobs for `codes` that are not stored yet and return their hashes."""
+    compress_min_bytes = get_settings().code_compression_min_bytes
+    rows: dict[str, dict] = {}
+    hashes: list[str] = []
+    for code in codes:
+        row = encode_code_blob(code, compress_min_bytes)
+        rows.setdefault(row["hash"], row)
+        hashes.append(row["hash"])
+    if not rows:
+        return hashes
+
+    dialect = session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = dialect_insert(CodeBlob).on_conflict_do_nothing(index_elements=["hash"])
+        session.execute(stmt, list(rows.values()))
+    else:
+        existing = set(
+            session.scalars(select(CodeBlob.hash).where(CodeBlob.hash.in_(rows)))
+        )
+        missing = [row for digest, row in rows.items() if digest not in existing]
+        if missing:
+            session.execute(insert(CodeBlob), missing)
+    return hashes
+
+
+# Registered on Session so every sessionmaker, not just SessionLocal, stores blobs.
+@event.listens_for(Session, "before_flush")
+def _store_submission_code(session: Session, _flush_context, _instances) -> None:
+    pending = [
+        obj
+        for obj in (*session.new, *session.dirty)
+        if isinstance(obj, Submission) and getattr(obj, "_code_unstored", False)
+    ]
+    if not pending:
+        return
+    store_code_blobs(session, [obj._code_text for obj in pending])
+    for obj in pending:
+        obj._code_unstored = False
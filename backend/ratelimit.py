@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Iterable, Mapping, Protocol, Sequence
+
+_PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0, "day": 86400.0}
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Token bucket holding `capacity` tokens refilled over `period_seconds`."""
+
+    capacity: int
+    period_seconds: float
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.capacity / self.period_seconds
+
+    @classmethod
+    def parse(cls, spec: str) -> "RateLimit":
+        """Parse specs such as ``"30/minute"`` or ``"5/second"``."""
+        amount, _, period = spec.partition("/")
+        period = period.strip().lower().rstrip("s") or "second"
+        if period not in _PERIODS:
+            raise ValueError(f"Unknown rate limit period in {spec!r}")
+        capacity = int(amount)
+        if capacity <= 0:
+            raise ValueError(f"Rate limit capacity must be positive in {spec!r}")
+        return cls(capacity=capacity, period_seconds=_PERIODS[period])
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float
+    retry_after: float = 0.0
+
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+class RateLimitStore(Protocol):
+    """Bucket state backend; swap in a shared implementation for multi-process use."""
+
+    def consume(
+        self, buckets: Sequence[tuple[str, RateLimit]], cost: int, now: float
+    ) -> RateLimitDecision:
+        """Take `cost` tokens from every bucket, or from none when any is short."""
+        ...
+
+
+class InMemoryRateLimitStore:
+    """Process-local token buckets guarded by a single short critical section.
+
+    At most `max_keys` buckets are kept; the least recently used one is dropped
+    to make room, so a flood of new identities only ever evicts idle callers.
+    """
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(
+        self, buckets: Sequence[tuple[str, RateLimit]], cost: int, now: float
+    ) -> RateLimitDecision:
+        with self._lock:
+            levels = [self._refill(key, limit, now) for key, limit in buckets]
+            allowed = all(tokens >= cost for tokens in levels)
+            if allowed:
+                levels = [tokens - cost for tokens in levels]
+            for (key, _), tokens in zip(buckets, levels):
+                self._buckets[key] = [tokens, now]
+
+        decisions = [
+            _decision(limit, tokens, cost, allowed) for (_, limit), tokens in zip(buckets, levels)
+        ]
+        if allowed:
+            return min(decisions, key=lambda decision: decision.remaining)
+        return max(decisions, key=lambda decision: decision.retry_after)
+
+    def _refill(self, key: str, limit: RateLimit, now: float) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            while len(self._buckets) >= self.max_keys:
+                self._buckets.popitem(last=False)
+            return float(limit.capacity)
+        self._buckets.move_to_end(key)
+        return min(limit.capacity, bucket[0] + (now - bucket[1]) * limit.refill_per_second)
+
+
+def _decision(limit: RateLimit, tokens: float, cost: int, allowed: bool) -> RateLimitDecision:
+    rate = limit.refill_per_second
+    return RateLimitDecision(
+        allowed=allowed,
+        limit=limit.capacity,
+        remaining=int(tokens),
+        reset_after=(limit.capacity - tokens) / rate,
+        retry_after=0.0 if allowed else max(cost - tokens, 0.0) / rate,
+    )
+
+
+class RateLimiter:
+    """Apply per-route limits to each caller identity (API key, user handle)."""
+
+    def __init__(
+        self,
+        limits: Mapping[str, Mapping[str, str]],
+        store: RateLimitStore | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.limits: dict[str, dict[str, RateLimit]] = {
+            kind: {route: RateLimit.parse(spec) for route, spec in routes.items()}
+            for kind, routes in limits.items()
+        }
+        self.store = store or InMemoryRateLimitStore()
+        self.clock = clock
+
+    def capacity(self, route: str, identities: Iterable[tuple[str, str]]) -> int | None:
+        """Largest cost a single request on `route` can ever be granted."""
+        capacities = [limit.capacity for limit in self._limits(route, identities).values()]
+        return min(capacities) if capacities else None
+
+    def check(
+        self,
+        route: str,
+        identities: Iterable[tuple[str, str]],
+        cost: int = 1,
+    ) -> RateLimitDecision | None:
+        """Consume `cost` tokens from every applicable bucket, or from none.
+
+        Returns the most restrictive decision, or ``None`` when no limit is
+        configured for the route. Tokens are only taken when every bucket can
+        afford the cost, so a rejection by one identity leaves the others intact.
+        """
+        limits = self._limits(route, identities)
+        if not limits:
+            return None
+        return self.store.consume(list(limits.items()), cost, self.clock())
+
+    def _limits(
+        self, route: str, identities: Iterable[tuple[str, str]]
+    ) -> dict[str, RateLimit]:
+        limits: dict[str, RateLimit] = {}
+        for kind, identity in identities:
+            limit = self.limits.get(kind, {}).get(route)
+            if limit is not None:
+                limits[f"{route}:{kind}:{identity}"] = limit
+        return limits
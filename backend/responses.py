@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from typing import Any, Mapping
+
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from starlette.background import BackgroundTask
+
+from .schemas import SubmissionOut, SubmissionStats
+
+submission_adapter = TypeAdapter(SubmissionOut)
+submission_list_adapter = TypeAdapter(list[SubmissionOut])
+submission_stats_adapter = TypeAdapter(SubmissionStats)
+
+
+class PydanticJSONResponse(Response):
+    """JSON response rendered directly by pydantic-core.
+
+    FastAPI's default path converts response models to plain dicts via
+    `jsonable_encoder` before `json.dumps` runs. Returning this response skips
+    that round trip: the adapter serializes models (or ORM rows validated with
+    `from_attributes`) straight to bytes.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any,
+        adapter: TypeAdapter[Any],
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        background: BackgroundTask | None = None,
+    ) -> None:
+        self.adapter = adapter
+        super().__init__(content, status_code, headers, background=background)
+
+    def render(self, content: Any) -> bytes:
+        return self.adapter.dump_json(content, by_alias=True)
+
+
+def submission_response(
+    submission: Any,
+    status_code: int = 200,
+    headers: Mapping[str, str] | None = None,
+    include_timings: bool = False,
+) -> PydanticJSONResponse:
+    model = submission_adapter.validate_python(submission, from_attributes=True)
+    if not include_timings:
+        model.timings = None
+    return PydanticJSONResponse(
+        model,
+        submission_adapter,
+        status_code=status_code,
+        headers=headers,
+    )
+
+
+def submission_list_response(
+    submissions: Any, include_timings: bool = False
+) -> PydanticJSONResponse:
+    models = submission_list_adapter.validate_python(submissions, from_attributes=True)
+    if not include_timings:
+        for model in models:
+            model.timings = None
+    return PydanticJSONResponse(models, submission_list_adapter)
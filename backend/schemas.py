@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import json
 from datetime import datetime
 from typing import Dict, List, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
-from .types import SubmissionStatus
+from .types import (
+    JobStatus,
+    ProfileFormat,
+    ProfileStatus,
+    ProfileTarget,
+    SubmissionStatus,
+)
 
 
 class ChallengeOut(BaseModel):
@@ -38,10 +45,43 @@ class SubmissionCreate(BaseModel):
     user_handle: Optional[str] = Field(default=None, max_length=64)
 
 
+class PreviewCheckOut(BaseModel):
+    name: str
+    outcome: str
+    detail: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SubmissionPreviewOut(BaseModel):
+    challenge_slug: str
+    code_hash: str
+    status: SubmissionStatus
+    score: Optional[int]
+    feedback: Optional[str]
+    checks: List[PreviewCheckOut]
+    complete: bool
+    cached: bool
+    elapsed_ms: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SubmissionBatchCreate(BaseModel):
+    submissions: List[SubmissionCreate] = Field(min_length=1)
+
+
+class SubmissionBatchOut(BaseModel):
+    ids: List[str]
+
+
 class AnalysisIssueOut(BaseModel):
     tool: str
     message: str
     severity: str
+    rule_id: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class SubmissionOut(BaseModel):
@@ -49,17 +89,37 @@ class SubmissionOut(BaseModel):
     challenge_slug: str
     user_handle: Optional[str]
     code: str
+    code_hash: str
     status: SubmissionStatus
     score: Optional[int]
     feedback: Optional[str]
+    rule_bundle_version: Optional[str] = None
     issues: Optional[List[AnalysisIssueOut]] = Field(
-        default=None, alias="analysis_report", serialization_alias="issues"
+        default=None, alias="findings", serialization_alias="issues"
+    )
+    timings: Optional[Dict[str, float]] = Field(
+        default=None, validation_alias="stage_timings", serialization_alias="timings"
     )
     created_at: datetime
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True, populate_by_name=True)
 
+    @field_validator("timings", mode="before")
+    @classmethod
+    def _decode_timings(cls, value: object) -> object:
+        # Stored as compact JSON on the submission row.
+        if isinstance(value, str):
+            return json.loads(value)
+        return value
+
+    @model_validator(mode="after")
+    def _unscored_has_no_issues(self) -> "SubmissionOut":
+        # `null` until scored, as before findings moved out of the submission row.
+        if self.status in (SubmissionStatus.pending, SubmissionStatus.running) and not self.issues:
+            self.issues = None
+        return self
+
 
 class StatusCount(BaseModel):
     status: SubmissionStatus
@@ -70,3 +130,102 @@ class SubmissionStats(BaseModel):
     total: int
     average_score: Optional[float]
     status_counts: List[StatusCount]
+
+
+class JobOut(BaseModel):
+    id: str
+    kind: str
+    challenge_slug: str
+    status: JobStatus
+    total: int
+    enqueued: int
+    completed: int
+    throughput_per_second: Optional[float]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class FindingRuleCount(BaseModel):
+    tool: str
+    rule_id: Optional[str]
+    findings: int
+    submissions: int
+
+
+class FindingSeverityCount(BaseModel):
+    challenge_slug: str
+    severity: str
+    findings: int
+
+
+class FingerprintChallengeStats(BaseModel):
+    challenge_slug: str
+    entries: int
+    hits: int
+    analyzer_runs_saved: int
+
+
+class FingerprintStats(BaseModel):
+    enabled: bool
+    entries: int
+    hits: int
+    analyzer_runs_saved: int
+    challenges: List[FingerprintChallengeStats]
+
+
+class ReloadOut(BaseModel):
+    challenges: int
+    rule_bundle_version: Optional[str]
+    rules_changed: bool
+
+
+class ArchiveRunOut(BaseModel):
+    cutoff: datetime
+    archived: int
+    segments: List[str]
+
+
+class ProfileCreate(BaseModel):
+    target: ProfileTarget = ProfileTarget.worker
+    routes: List[str] = Field(default_factory=list)
+    duration_seconds: float = Field(default=30.0, gt=0)
+    max_jobs: Optional[int] = Field(default=None, ge=1)
+    format: ProfileFormat = ProfileFormat.speedscope
+
+
+class ProfileOut(BaseModel):
+    id: str
+    target: ProfileTarget
+    format: ProfileFormat
+    status: ProfileStatus
+    routes: List[str]
+    duration_seconds: float
+    max_jobs: Optional[int]
+    samples: int
+    jobs: int
+    path: Optional[str]
+    error: Optional[str]
+    started_at: datetime
+    finished_at: Optional[datetime]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ReadinessCheckOut(BaseModel):
+    name: str
+    ok: bool
+    required: bool
+    detail: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ReadinessOut(BaseModel):
+    ready: bool
+    checked_at: datetime
+    checks: List[ReadinessCheckOut]
+
+    model_config = ConfigDict(from_attributes=True)
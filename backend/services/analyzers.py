@@ -8,15 +8,25 @@ import tempfile
 from pathlib import Path
 from typing import Iterable, Sequence
 
+from ..metrics import ANALYZER_RUNS
 from ..models import Submission
-from .scoring import AnalysisIssue, StaticAnalyzer
+from .fingerprint import binary_identity
+from .scoring import AnalysisIssue, StaticAnalyzer, mark_unreliable
 
 logger = logging.getLogger(__name__)
 
 
+def _record(analyzer: str, outcome: str) -> None:
+    ANALYZER_RUNS.labels(analyzer, outcome).inc()
+    if outcome in ("timeout", "error"):
+        mark_unreliable()
+
+
 class SemgrepAnalyzer(StaticAnalyzer):
     """Run Semgrep rules against a submission snippet."""
 
+    name = "semgrep"
+
     def __init__(
         self,
         rule_paths: Sequence[Path],
@@ -29,12 +39,20 @@ class SemgrepAnalyzer(StaticAnalyzer):
         self.timeout_seconds = timeout_seconds
         self.process_timeout_padding = max(process_timeout_padding, 0)
 
+    def toolchain(self) -> str:
+        """What this analyzer's findings depend on besides the rule bundle."""
+        if not self.rule_paths:
+            return f"{self.name}:skipped"
+        return f"{self.name}:{binary_identity(self.binary)}"
+
     def analyze(self, submission: Submission) -> Sequence[AnalysisIssue]:
         if not self.rule_paths:
+            _record(self.name, "skipped")
             return []
 
         if shutil.which(self.binary) is None:
             logger.debug("Semgrep binary not available; skipping analysis.")
+            _record(self.name, "unavailable")
             return []
 
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -73,9 +91,11 @@ class SemgrepAnalyzer(StaticAnalyzer):
                     self.binary,
                     exc,
                 )
+                _record(self.name, "timeout")
                 return []
             except (OSError, subprocess.SubprocessError) as exc:
                 logger.warning("Semgrep invocation failed: %s", exc)
+                _record(self.name, "error")
                 return []
 
             if completed.returncode not in (0, 1):
@@ -84,12 +104,14 @@ class SemgrepAnalyzer(StaticAnalyzer):
                     completed.returncode,
                     completed.stderr.strip(),
                 )
+                _record(self.name, "error")
                 return []
 
             try:
                 payload = json.loads(completed.stdout or "{}")
             except json.JSONDecodeError:
                 logger.debug("Failed to decode Semgrep output.")
+                _record(self.name, "error")
                 return []
 
             results = payload.get("results", [])
@@ -102,14 +124,18 @@ class SemgrepAnalyzer(StaticAnalyzer):
                             "message", "Semgrep rule triggered."
                         ),
                         severity=result.get("extra", {}).get("severity", "info"),
+                        rule_id=result.get("check_id"),
                     )
                 )
+            _record(self.name, "ok")
             return issues
 
 
 class BanditAnalyzer(StaticAnalyzer):
     """Run Bandit security checks against a submission snippet."""
 
+    name = "bandit"
+
     def __init__(
         self,
         binary: str = "bandit",
@@ -122,9 +148,15 @@ class BanditAnalyzer(StaticAnalyzer):
         self.severity = severity
         self.confidence = confidence
 
+    def toolchain(self) -> str:
+        """What this analyzer's findings depend on."""
+        identity = binary_identity(self.binary)
+        return f"{self.name}:{identity}:{self.severity}:{self.confidence}"
+
     def analyze(self, submission: Submission) -> Sequence[AnalysisIssue]:
         if shutil.which(self.binary) is None:
             logger.debug("Bandit binary not available; skipping analysis.")
+            _record(self.name, "unavailable")
             return []
 
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -152,8 +184,13 @@ class BanditAnalyzer(StaticAnalyzer):
                     timeout=self.timeout_seconds,
                     check=False,
                 )
+            except subprocess.TimeoutExpired as exc:
+                logger.warning("Bandit timed out after %s seconds: %s", self.timeout_seconds, exc)
+                _record(self.name, "timeout")
+                return []
             except (OSError, subprocess.SubprocessError) as exc:
                 logger.warning("Bandit invocation failed: %s", exc)
+                _record(self.name, "error")
                 return []
 
             if completed.returncode not in (0, 1):
@@ -162,12 +199,14 @@ class BanditAnalyzer(StaticAnalyzer):
                     completed.returncode,
                     completed.stderr.strip(),
                 )
+                _record(self.name, "error")
                 return []
 
             try:
                 payload = json.loads(completed.stdout or "{}")
             except json.JSONDecodeError:
                 logger.debug("Failed to decode Bandit output.")
+                _record(self.name, "error")
                 return []
 
             results = payload.get("results", [])
@@ -180,6 +219,8 @@ class BanditAnalyzer(StaticAnalyzer):
                             "issue_text", "Bandit security issue detected."
                         ),
                         severity=result.get("issue_severity", "MEDIUM"),
+                        rule_id=result.get("test_id"),
                     )
                 )
+            _record(self.name, "ok")
             return issues
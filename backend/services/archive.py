@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from ..models import (
+    ArchivedSubmission,
+    CodeBlob,
+    Finding,
+    FindingRollup,
+    Submission,
+    SubmissionRollup,
+)
+from ..responses import submission_adapter
+from ..types import SubmissionStatus
+
+logger = logging.getLogger(__name__)
+
+# Pending and running submissions still belong to the worker.
+ARCHIVABLE_STATUSES = (
+    SubmissionStatus.passed,
+    SubmissionStatus.failed,
+    SubmissionStatus.error,
+)
+
+
+@dataclass
+class CompactionResult:
+    cutoff: datetime
+    archived: int = 0
+    segments: set[str] = field(default_factory=set)
+
+
+class SubmissionArchive:
+    """Move old submissions out of the hot tables into compressed segments.
+
+    Segments are append-only gzip NDJSON files, one per creation month. Each
+    compaction batch appends one gzip member per month, so a single archived
+    submission can be read back by seeking to its member and decompressing
+    only that member. Segment bytes are fsynced before the database
+    transaction that deletes the rows commits; a crash in between leaves
+    unreferenced bytes in the segment but never loses a submission. With
+    `retention_days` and `interval_seconds` set, a thread compacts everything
+    older than the retention window on that schedule.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        session_factory: Callable[[], Session],
+        batch_size: int = 500,
+        compress_level: int = 6,
+        retention_days: int | None = None,
+        interval_seconds: float = 0.0,
+    ) -> None:
+        self.root = Path(root)
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.compress_level = compress_level
+        self.retention_days = retention_days
+        self.interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.retention_days is None or self.interval_seconds <= 0:
+            return
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._schedule, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _schedule(self) -> None:
+        while not self._stop_event.wait(self.interval_seconds):
+            cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+            try:
+                result = self.compact(cutoff)
+            except Exception:
+                logger.exception("Scheduled archive run failed")
+                continue
+            if result.archived:
+                logger.info("Archived %s submissions older than %s", result.archived, cutoff)
+
+    def compact(self, cutoff: datetime) -> CompactionResult:
+        """Archive every finished submission created before `cutoff`."""
+        result = CompactionResult(cutoff=cutoff)
+        with self._lock:
+            while True:
+                with self.session_factory() as session:
+                    batch = session.scalars(
+                        select(Submission)
+                        .where(
+                            Submission.created_at < cutoff,
+                            Submission.status.in_(ARCHIVABLE_STATUSES),
+                        )
+                        .order_by(Submission.created_at, Submission.id)
+                        .limit(self.batch_size)
+                        .with_for_update(skip_locked=True)
+                    ).all()
+                    if not batch:
+                        break
+                    self._archive_batch(session, batch, result)
+                    session.commit()
+                result.archived += len(batch)
+                if len(batch) < self.batch_size:
+                    break
+        if result.archived:
+            logger.info(
+                "Archived %s submissions older than %s", result.archived, cutoff.isoformat()
+            )
+        return result
+
+    def read(self, session: Session, submission_id: str) -> bytes | None:
+        """Return the archived `SubmissionOut` JSON for `submission_id`, if any."""
+        entry = session.get(ArchivedSubmission, submission_id)
+        if entry is None:
+            return None
+        with (self.root / entry.segment).open("rb") as handle:
+            handle.seek(entry.offset)
+            member = handle.read(entry.length)
+        return gzip.decompress(member).split(b"\n")[entry.line]
+
+    def _archive_batch(
+        self, session: Session, batch: list[Submission], result: CompactionResult
+    ) -> None:
+        by_month: dict[str, list[Submission]] = defaultdict(list)
+        for submission in batch:
+            by_month[submission.created_at.strftime("%Y-%m")].append(submission)
+
+        archived_at = datetime.utcnow()
+        index_rows = []
+        for month, submissions in sorted(by_month.items()):
+            segment = f"{month}.ndjson.gz"
+            lines = [
+                submission_adapter.dump_json(
+                    submission_adapter.validate_python(submission, from_attributes=True),
+                    by_alias=True,
+                )
+                for submission in submissions
+            ]
+            offset, length = self._append(segment, lines)
+            result.segments.add(segment)
+            index_rows.extend(
+                {
+                    "id": submission.id,
+                    "challenge_slug": submission.challenge_slug,
+                    "user_handle": submission.user_handle,
+                    "status": submission.status.value,
+                    "created_at": submission.created_at,
+                    "archived_at": archived_at,
+                    "segment": segment,
+                    "offset": offset,
+                    "length": length,
+                    "line": line,
+                }
+                for line, submission in enumerate(submissions)
+            )
+
+        self._merge_rollups(session, batch)
+        ids = [submission.id for submission in batch]
+        code_hashes = {submission.code_hash for submission in batch}
+        session.execute(insert(ArchivedSubmission), index_rows)
+        session.execute(
+            delete(Finding)
+            .where(Finding.submission_id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        session.execute(
+            delete(Submission)
+            .where(Submission.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        # Blobs are shared by hash; only drop the ones nothing else references.
+        session.execute(
+            delete(CodeBlob)
+            .where(
+                CodeBlob.hash.in_(code_hashes),
+                ~select(Submission.id).where(Submission.code_hash == CodeBlob.hash).exists(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    def _append(self, segment: str, lines: list[bytes]) -> tuple[int, int]:
+        path = self.root / segment
+        path.parent.mkdir(parents=True, exist_ok=True)
+        member = gzip.compress(
+            b"".join(line + b"\n" for line in lines),
+            compresslevel=self.compress_level,
+            mtime=0,
+        )
+        with path.open("ab") as handle:
+            offset = handle.tell()
+            handle.write(member)
+            handle.flush()
+            os.fsync(handle.fileno())
+        return offset, len(member)
+
+    def _merge_rollups(self, session: Session, batch: list[Submission]) -> None:
+        submission_totals: dict[tuple[str, str], list[int]] = defaultdict(lambda: [0, 0, 0])
+        finding_totals: dict[tuple, list] = defaultdict(lambda: [0, set()])
+        for submission in batch:
+            totals = submission_totals[(submission.challenge_slug, submission.status.value)]
+            totals[0] += 1
+            if submission.score is not None:
+                totals[1] += submission.score
+                totals[2] += 1
+            for finding in submission.findings:
+                key = (finding.challenge_slug, finding.tool, finding.rule_id, finding.severity)
+                finding_totals[key][0] += 1
+                finding_totals[key][1].add(submission.id)
+
+        slugs = {submission.challenge_slug for submission in batch}
+        existing_submissions = {
+            (row.challenge_slug, row.status): row
+            for row in session.scalars(
+                select(SubmissionRollup).where(SubmissionRollup.challenge_slug.in_(slugs))
+            )
+        }
+        for key, (count, score_total, scored) in submission_totals.items():
+            row = existing_submissions.get(key)
+            if row is None:
+                row = SubmissionRollup(
+                    challenge_slug=key[0], status=key[1], submissions=0, score_total=0, scored=0
+                )
+                session.add(row)
+            row.submissions += count
+            row.score_total += score_total
+            row.scored += scored
+
+        existing_findings = {
+            (row.challenge_slug, row.tool, row.rule_id, row.severity): row
+            for row in session.scalars(
+                select(FindingRollup).where(FindingRollup.challenge_slug.in_(slugs))
+            )
+        }
+        for key, (count, submission_ids) in finding_totals.items():
+            row = existing_findings.get(key)
+            if row is None:
+                row = FindingRollup(
+                    challenge_slug=key[0],
+                    tool=key[1],
+                    rule_id=key[2],
+                    severity=key[3],
+                    findings=0,
+                    submissions=0,
+                )
+                session.add(row)
+            row.findings += count
+            row.submissions += len(submission_ids)
+        session.flush()
+
+
+def main() -> None:
+    from ..config import get_settings
+    from ..db import SessionLocal
+    from ..db_init import run_migrations
+    from ..logging import configure_logging
+
+    parser = argparse.ArgumentParser(
+        description="Archive finished submissions older than the retention window."
+    )
+    parser.add_argument(
+        "--older-than-days",
+        type=int,
+        default=None,
+        help="Defaults to VULNLABS_SUBMISSION_RETENTION_DAYS.",
+    )
+    args = parser.parse_args()
+
+    settings = get_settings()
+    days = args.older_than_days
+    if days is None:
+        days = settings.submission_retention_days
+    if days is None:
+        parser.error("pass --older-than-days or set VULNLABS_SUBMISSION_RETENTION_DAYS")
+
+    configure_logging(settings)
+    run_migrations()
+    archive = SubmissionArchive(
+        settings.archive_root, SessionLocal, batch_size=settings.archive_batch_size
+    )
+    result = archive.compact(datetime.utcnow() - timedelta(days=days))
+    print(
+        json.dumps(
+            {
+                "cutoff": result.cutoff.isoformat(),
+                "archived": result.archived,
+                "segments": sorted(result.segments),
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Mapping
+
+from pydantic import TypeAdapter
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from .. import db_init
+from ..models import Challenge
+from ..schemas import ChallengeOut, ChallengeSummary
+
+_summary_list_adapter = TypeAdapter(list[ChallengeSummary])
+_detail_adapter = TypeAdapter(ChallengeOut)
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """Pre-serialized JSON body plus its strong validator."""
+
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_body(cls, body: bytes) -> "CatalogEntry":
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        return cls(body=body, etag=f'"{digest}"')
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    version: tuple
+    index: CatalogEntry
+    challenges: Mapping[str, CatalogEntry]
+
+
+class ChallengeCatalog:
+    """Immutable in-memory view of the challenge bank.
+
+    Challenges only change when `seed_challenges` runs, so the list and detail
+    payloads are serialized once and served as raw bytes. A snapshot is keyed
+    by this process's seed generation plus the row count and latest
+    `updated_at` of the challenges table, so a reseed from another process is
+    picked up too; the database is asked at most every `refresh_seconds`, so
+    `snapshot()` can block and must not be called on the event loop. A new
+    snapshot is swapped in with a single reference assignment, so readers never
+    observe a partially built catalog.
+    """
+
+    def __init__(
+        self, session_factory: Callable[[], Session], refresh_seconds: float = 5.0
+    ) -> None:
+        self._session_factory = session_factory
+        self.refresh_seconds = refresh_seconds
+        self._snapshot: CatalogSnapshot | None = None
+        self._generation = -1
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if (
+            snapshot is not None
+            and self._generation == db_init.seed_generation()
+            and time.monotonic() - self._checked_at < self.refresh_seconds
+        ):
+            return snapshot
+        with self._lock:
+            generation = db_init.seed_generation()
+            with self._session_factory() as session:
+                count, updated_at = session.execute(
+                    select(func.count(), func.max(Challenge.updated_at)).select_from(Challenge)
+                ).one()
+                version = (generation, count, updated_at)
+                snapshot = self._snapshot
+                if snapshot is None or snapshot.version != version:
+                    snapshot = self._build(session, version)
+                    self._snapshot = snapshot
+            self._generation = generation
+            self._checked_at = time.monotonic()
+            return snapshot
+
+    def _build(self, session: Session, version: tuple) -> CatalogSnapshot:
+        challenges = (
+            session.execute(select(Challenge).order_by(Challenge.slug)).scalars().all()
+        )
+        summaries = [ChallengeSummary.model_validate(item) for item in challenges]
+        details = {
+            item.slug: CatalogEntry.from_body(
+                _detail_adapter.dump_json(ChallengeOut.model_validate(item))
+            )
+            for item in challenges
+        }
+        index = CatalogEntry.from_body(_summary_list_adapter.dump_json(summaries))
+        return CatalogSnapshot(
+            version=version,
+            index=index,
+            challenges=details,
+        )
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Evaluate an `If-None-Match` header using weak comparison (RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        if candidate.strip().removeprefix("W/") == opaque:
+            return True
+    return False
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models import Submission
+from ..responses import submission_adapter
+from ..types import SubmissionStatus
+
+
+@dataclass
+class SubmissionExportFilter:
+    challenge_slug: str | None = None
+    status: SubmissionStatus | None = None
+    since: datetime | None = None
+    until: datetime | None = None
+
+    def apply(self, stmt):
+        if self.challenge_slug:
+            stmt = stmt.where(Submission.challenge_slug == self.challenge_slug)
+        if self.status is not None:
+            stmt = stmt.where(Submission.status == self.status)
+        if self.since is not None:
+            stmt = stmt.where(Submission.created_at >= self.since)
+        if self.until is not None:
+            stmt = stmt.where(Submission.created_at < self.until)
+        return stmt
+
+
+def iter_submissions_ndjson(
+    session_factory: Callable[[], Session],
+    filters: SubmissionExportFilter,
+    batch_size: int = 500,
+    chunk_bytes: int = 64 * 1024,
+    compress: bool = False,
+    include_timings: bool = False,
+) -> Iterator[bytes]:
+    """Yield submissions as NDJSON chunks using a server-side cursor.
+
+    Rows are fetched `batch_size` at a time with `yield_per` and released once
+    serialized, so memory stays bounded by one batch plus one output chunk
+    regardless of how many rows match. The first row is emitted as soon as it
+    is read so clients see bytes immediately. Stage timings are only written
+    when `include_timings` is set, as for the other submission endpoints.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    def encode(data: bytes, final: bool = False) -> bytes:
+        if compressor is None:
+            return data
+        compressed = compressor.compress(data)
+        return compressed + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+    stmt = filters.apply(select(Submission)).order_by(Submission.created_at, Submission.id)
+    stmt = stmt.execution_options(yield_per=batch_size)
+
+    with session_factory() as session:
+        buffer: list[bytes] = []
+        buffered = 0
+        first = True
+        for submission in session.scalars(stmt):
+            model = submission_adapter.validate_python(submission, from_attributes=True)
+            if not include_timings:
+                model.timings = None
+            line = submission_adapter.dump_json(model, by_alias=True)
+            buffer.append(line)
+            buffer.append(b"\n")
+            buffered += len(line) + 1
+            if first or buffered >= chunk_bytes:
+                yield encode(b"".join(buffer))
+                buffer.clear()
+                buffered = 0
+                first = False
+        if buffer or compressor is not None:
+            yield encode(b"".join(buffer), final=True)
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from ..models import ResultFingerprint
+
+# Bump when the normalization changes so old fingerprints stop matching.
+FINGERPRINT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class FingerprintKey:
+    """Where a verdict lives in the index, plus the heuristic outcome it was scored with."""
+
+    challenge_slug: str
+    toolchain_version: str
+    fingerprint: str
+    heuristic: str
+
+
+class _Canonicalizer(ast.NodeTransformer):
+    """Rename locally bound identifiers to `_v0`, `_v1`, ... in order of first use.
+
+    Names bound by imports and free names such as `request`, `db`, `os` or
+    builtins keep their spelling, since they decide what the code does and the
+    challenge heuristics look for them. Docstrings are dropped.
+    """
+
+    def __init__(self, bound: set[str]) -> None:
+        self.bound = bound
+        self.names: dict[str, str] = {}
+
+    def _rename(self, name: str) -> str:
+        if name not in self.bound:
+            return name
+        return self.names.setdefault(name, f"_v{len(self.names)}")
+
+    def visit_Name(self, node: ast.Name) -> ast.Name:
+        node.id = self._rename(node.id)
+        return node
+
+    def visit_arg(self, node: ast.arg) -> ast.arg:
+        node.arg = self._rename(node.arg)
+        node.annotation = None
+        return node
+
+    def visit_Global(self, node: ast.Global) -> ast.Global:
+        node.names = [self._rename(name) for name in node.names]
+        return node
+
+    visit_Nonlocal = visit_Global
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler) -> ast.ExceptHandler:
+        if node.name:
+            node.name = self._rename(node.name)
+        return self.generic_visit(node)
+
+    def _visit_scope(self, node):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            node.name = self._rename(node.name)
+        body = node.body
+        if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant):
+            if isinstance(body[0].value.value, str):
+                node.body = body[1:] or [ast.Pass()]
+        return self.generic_visit(node)
+
+    visit_Module = _visit_scope
+    visit_FunctionDef = _visit_scope
+    visit_AsyncFunctionDef = _visit_scope
+    visit_ClassDef = _visit_scope
+
+
+def _bound_names(tree: ast.AST) -> set[str]:
+    bound: set[str] = set()
+    imported: set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            bound.add(node.id)
+        elif isinstance(node, ast.arg):
+            bound.add(node.arg)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            bound.add(node.name)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            bound.add(node.name)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            bound.update(node.names)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            imported.update((alias.asname or alias.name).split(".")[0] for alias in node.names)
+    return bound - imported
+
+
+def code_fingerprint(code: str) -> str | None:
+    """SHA-256 of the normalized AST of `code`, or None when it does not parse.
+
+    Comments and formatting never reach the AST; docstrings and type
+    annotations are dropped and local identifiers canonicalized, so
+    resubmissions that only differ in those ways share a fingerprint.
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError, RecursionError):
+        return None
+    tree = _Canonicalizer(_bound_names(tree)).visit(tree)
+    dumped = ast.dump(tree, annotate_fields=False, include_attributes=False)
+    return hashlib.sha256(dumped.encode("utf-8")).hexdigest()
+
+
+def toolchain_version(
+    rule_bundle_version: str | None,
+    test_cases: Iterable[dict] | None,
+    tools: Iterable[str] = (),
+) -> str:
+    """Identify everything besides the code that a stored verdict depends on.
+
+    `tools` holds one identity per analyzer and sandbox (see `binary_identity`),
+    so a verdict scored while a tool was missing is not reused once it is
+    installed, upgraded or swapped for another driver.
+    """
+    payload = json.dumps(
+        [FINGERPRINT_VERSION, rule_bundle_version, list(test_cases or []), list(tools)],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def binary_identity(binary: str) -> str:
+    """Resolved path and mtime of `binary`, or "unavailable" when it is not on PATH."""
+    path = shutil.which(binary)
+    if path is None:
+        return "unavailable"
+    try:
+        return f"{path}@{os.stat(path).st_mtime_ns}"
+    except OSError:
+        return "unavailable"
+
+
+class FingerprintIndex:
+    """Read side of the `result_fingerprints` table.
+
+    Entries are written (and hit counters bumped) by the `ResultWriter` in the
+    same transaction as the submission result they came from.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session]) -> None:
+        self.session_factory = session_factory
+
+    def lookup(self, key: FingerprintKey) -> Optional[Row]:
+        """Return the stored verdict for `key`, if it was scored with the same heuristic outcome."""
+        table = ResultFingerprint.__table__
+        with self.session_factory() as session:
+            row = session.execute(
+                select(table).where(
+                    table.c.challenge_slug == key.challenge_slug,
+                    table.c.toolchain_version == key.toolchain_version,
+                    table.c.fingerprint == key.fingerprint,
+                )
+            ).first()
+        if row is None or row.heuristic != key.heuristic:
+            return None
+        return row
+
+
+def fingerprint_stats(session: Session, challenge_slug: str | None = None) -> list[Row]:
+    """Per-challenge entry count, hits and analyzer runs saved."""
+    stmt = (
+        select(
+            ResultFingerprint.challenge_slug,
+            func.count(),
+            func.coalesce(func.sum(ResultFingerprint.hits), 0),
+            func.coalesce(func.sum(ResultFingerprint.analyzer_runs_saved), 0),
+        )
+        .group_by(ResultFingerprint.challenge_slug)
+        .order_by(ResultFingerprint.challenge_slug)
+    )
+    if challenge_slug:
+        stmt = stmt.where(ResultFingerprint.challenge_slug == challenge_slug)
+    return list(session.execute(stmt))
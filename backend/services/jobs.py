@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Optional
+from uuid import uuid4
+
+from ..types import JobStatus
+from .worker import ScoringWorker
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RescoreJob:
+    """Progress record for a bulk rescore of one challenge's submissions."""
+
+    challenge_slug: str
+    submission_ids: list[str]
+    id: str = field(default_factory=lambda: str(uuid4()))
+    kind: str = "rescore"
+    status: JobStatus = JobStatus.queued
+    enqueued: int = 0
+    completed: int = 0
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    @property
+    def total(self) -> int:
+        return len(self.submission_ids)
+
+    @property
+    def throughput_per_second(self) -> float | None:
+        if self.started_at is None or not self.completed:
+            return None
+        end = self.finished_at or datetime.utcnow()
+        elapsed = (end - self.started_at).total_seconds()
+        return self.completed / elapsed if elapsed > 0 else None
+
+
+class JobManager:
+    """Feed bulk rescore jobs to the scoring worker at a controlled rate.
+
+    A single feeder thread hands ids to the worker no faster than
+    `rate_per_second` and pauses while the worker queue already holds
+    `max_backlog` items, so interactive submissions never wait behind a whole
+    challenge's worth of rescoring. A job only counts the queue entries it
+    enqueued itself, so other rescores of the same submissions do not advance
+    it. Jobs still queued or running after `stale_after_seconds` are cancelled
+    when the history is pruned.
+    """
+
+    def __init__(
+        self,
+        worker: ScoringWorker,
+        rate_per_second: float = 20.0,
+        max_backlog: int = 10,
+        history_size: int = 100,
+        stale_after_seconds: float = 3600.0,
+    ) -> None:
+        self.worker = worker
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self.max_backlog = max(max_backlog, 1)
+        self.history_size = history_size
+        self.stale_after = timedelta(seconds=stale_after_seconds)
+        self._jobs: OrderedDict[str, RescoreJob] = OrderedDict()
+        # (job id, submission id) for every entry a job has enqueued but not seen processed.
+        self._inflight: set[tuple[str, str]] = set()
+        self._lock = threading.Lock()
+        self._queue: queue.Queue[RescoreJob | None] = queue.Queue()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._queue.put(None)
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def submit_rescore(self, challenge_slug: str, submission_ids: list[str]) -> RescoreJob:
+        job = RescoreJob(challenge_slug=challenge_slug, submission_ids=submission_ids)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        if not submission_ids:
+            job.status = JobStatus.completed
+            job.started_at = job.finished_at = datetime.utcnow()
+            return job
+        self._queue.put(job)
+        logger.info(
+            "Rescore job %s queued for challenge=%s submissions=%s",
+            job.id,
+            challenge_slug,
+            job.total,
+        )
+        return job
+
+    def get(self, job_id: str) -> RescoreJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _prune(self) -> None:
+        stale_before = datetime.utcnow() - self.stale_after
+        while len(self._jobs) > self.history_size:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest.status in (JobStatus.queued, JobStatus.running):
+                if oldest.created_at > stale_before:
+                    break
+                logger.warning("Rescore job %s cancelled after going stale", oldest_id)
+                oldest.status = JobStatus.cancelled
+                oldest.finished_at = datetime.utcnow()
+                self._inflight = {entry for entry in self._inflight if entry[0] != oldest_id}
+            del self._jobs[oldest_id]
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            job = self._queue.get()
+            if job is None:
+                break
+            self._feed(job)
+
+    def _feed(self, job: RescoreJob) -> None:
+        job.status = JobStatus.running
+        job.started_at = datetime.utcnow()
+        for submission_id in job.submission_ids:
+            while self.worker.queue_depth() >= self.max_backlog:
+                if self._stop_event.wait(self.interval or 0.01):
+                    job.status = JobStatus.cancelled
+                    return
+            with self._lock:
+                if job.status is not JobStatus.running:
+                    return
+                self._inflight.add((job.id, submission_id))
+                job.enqueued += 1
+            self.worker.enqueue(submission_id, partial(self._on_processed, job, submission_id))
+            if self.interval and self._stop_event.wait(self.interval):
+                job.status = JobStatus.cancelled
+                return
+
+    def _on_processed(self, job: RescoreJob, submission_id: str) -> None:
+        with self._lock:
+            if (job.id, submission_id) not in self._inflight:
+                return
+            self._inflight.discard((job.id, submission_id))
+            job.completed += 1
+            if job.completed >= job.total:
+                job.status = JobStatus.completed
+                job.finished_at = datetime.utcnow()
+                logger.info(
+                    "Rescore job %s finished: %s submissions", job.id, job.completed
+                )
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+
+from ..metrics import PREVIEW_REQUESTS
+from ..models import Submission, compute_code_hash
+from ..types import SubmissionStatus
+from .sandbox import syntax_error
+from .scoring import ChallengeScoringService, ScoringResult
+
+
+@dataclass(frozen=True)
+class PreviewCheck:
+    name: str
+    # "passed", "failed", "skipped" when the deadline ran out first, or
+    # "not_applicable" when the challenge has no such check.
+    outcome: str
+    detail: str | None = None
+
+
+@dataclass(frozen=True)
+class PreviewResult:
+    challenge_slug: str
+    code_hash: str
+    status: SubmissionStatus
+    score: int | None
+    feedback: str | None
+    checks: tuple[PreviewCheck, ...]
+    # False when the deadline cut the checks short.
+    complete: bool
+    cached: bool = False
+    elapsed_ms: float = field(default=0.0, compare=False)
+
+
+class PreviewService:
+    """Instant editor feedback from the cheap, in-process checks only.
+
+    The sandbox's prohibited-pattern check, an in-process parse of the wrapped
+    snippet and the challenge heuristic run in that order, each only while
+    `deadline_ms` has not passed. A check cannot be interrupted once started,
+    so callers cap the code size to keep a single check inside the budget.
+    Nothing is persisted or queued. Complete results are kept in an LRU keyed
+    by `(challenge_slug, code_hash)`, so an editor re-sending an unchanged
+    buffer costs one hash and a dict lookup.
+    """
+
+    def __init__(
+        self,
+        scoring_service: ChallengeScoringService,
+        deadline_ms: float = 20.0,
+        cache_size: int = 1024,
+    ) -> None:
+        self.scoring_service = scoring_service
+        self.deadline_ms = deadline_ms
+        self.cache_size = cache_size
+        self._cache: OrderedDict[tuple[str, str], PreviewResult] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def preview(self, challenge_slug: str, code: str) -> PreviewResult:
+        started = time.perf_counter()
+        code_hash = compute_code_hash(code)
+        key = (challenge_slug, code_hash)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+        if cached is not None:
+            PREVIEW_REQUESTS.labels("hit").inc()
+            return replace(cached, cached=True, elapsed_ms=_since(started))
+
+        result = self._run(challenge_slug, code, code_hash, started)
+        PREVIEW_REQUESTS.labels("complete" if result.complete else "partial").inc()
+        if result.complete and self.cache_size > 0:
+            with self._lock:
+                self._cache[key] = result
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result
+
+    def _run(
+        self, challenge_slug: str, code: str, code_hash: str, started: float
+    ) -> PreviewResult:
+        deadline = started + self.deadline_ms / 1000
+        checks: list[PreviewCheck] = []
+        heuristic: ScoringResult | None = None
+
+        sandbox = self.scoring_service.sandbox
+        prohibited = getattr(sandbox, "prohibited_reason", None)
+        if prohibited is not None:
+            if time.perf_counter() < deadline:
+                reason = prohibited(code)
+                checks.append(PreviewCheck("prohibited_patterns", _outcome(reason), reason))
+            else:
+                checks.append(PreviewCheck("prohibited_patterns", "skipped"))
+
+        if time.perf_counter() < deadline:
+            error = syntax_error(code)
+            checks.append(PreviewCheck("syntax", _outcome(error), error))
+        else:
+            checks.append(PreviewCheck("syntax", "skipped"))
+
+        if time.perf_counter() < deadline:
+            heuristic = self.scoring_service.heuristic(
+                Submission(challenge_slug=challenge_slug, code=code)
+            )
+            checks.append(
+                PreviewCheck("heuristic", _heuristic_outcome(heuristic), heuristic.feedback)
+            )
+        else:
+            checks.append(PreviewCheck("heuristic", "skipped"))
+
+        status = heuristic.status if heuristic else SubmissionStatus.pending
+        score = heuristic.score if heuristic else None
+        failed = [check for check in checks if check.outcome == "failed"]
+        if any(check.name != "heuristic" for check in failed):
+            # Mirrors the sandbox penalty the full pipeline would apply.
+            status = SubmissionStatus.failed
+            score = min(score if score is not None else 100, 40)
+        feedback = "\n".join(check.detail for check in failed if check.detail) or (
+            heuristic.feedback if heuristic else None
+        )
+        return PreviewResult(
+            challenge_slug=challenge_slug,
+            code_hash=code_hash,
+            status=status,
+            score=score,
+            feedback=feedback,
+            checks=tuple(checks),
+            complete=all(check.outcome != "skipped" for check in checks),
+            elapsed_ms=_since(started),
+        )
+
+
+def _outcome(problem: str | None) -> str:
+    return "failed" if problem else "passed"
+
+
+def _heuristic_outcome(heuristic: ScoringResult) -> str:
+    if heuristic.status is SubmissionStatus.pending:
+        return "not_applicable"
+    return "passed" if heuristic.status is SubmissionStatus.passed else "failed"
+
+
+def _since(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 3)
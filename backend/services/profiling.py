@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import json
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Callable, Iterable, Optional
+from uuid import uuid4
+
+from ..types import ProfileFormat, ProfileStatus, ProfileTarget
+from .worker import ScoringWorker
+
+logger = logging.getLogger(__name__)
+
+WORKER_THREAD_PREFIX = "scoring-worker-"
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is still running."""
+
+
+@dataclass
+class ProfileRun:
+    """One bounded sampling session and, once finished, the file it wrote."""
+
+    target: ProfileTarget
+    format: ProfileFormat
+    duration_seconds: float
+    max_jobs: int | None = None
+    routes: list[str] = field(default_factory=list)
+    id: str = field(default_factory=lambda: uuid4().hex[:12])
+    status: ProfileStatus = ProfileStatus.running
+    samples: int = 0
+    jobs: int = 0
+    path: str | None = None
+    error: str | None = None
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: datetime | None = None
+
+
+class StackSampler:
+    """Sample the Python stacks of selected threads via `sys._current_frames`.
+
+    Nothing is installed in the profiled code: a separate thread wakes every
+    `interval_seconds`, reads the current frame of every thread and keeps the
+    stacks `keep(thread_name, frame)` accepts. Stacks are aggregated as tuples of
+    `(module.qualname, filename, first line)`, root first.
+    """
+
+    def __init__(
+        self,
+        keep: Callable[[str, FrameType], bool],
+        interval_seconds: float = 0.01,
+    ) -> None:
+        self.keep = keep
+        self.interval_seconds = interval_seconds
+        self.stacks: Counter[tuple[tuple[str, str, int], ...]] = Counter()
+
+    def sample(self) -> None:
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id != own and self.keep(names.get(thread_id, ""), frame):
+                self.stacks[_stack(frame)] += 1
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+
+def _stack(frame: FrameType | None) -> tuple[tuple[str, str, int], ...]:
+    entries = []
+    while frame is not None:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", "?")
+        entries.append((f"{module}.{code.co_qualname}", code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    entries.reverse()
+    return tuple(entries)
+
+
+def _is_worker_thread(name: str, _frame: FrameType) -> bool:
+    return name.startswith(WORKER_THREAD_PREFIX)
+
+
+def _on_stack(frame: FrameType | None, codes: frozenset[CodeType]) -> bool:
+    while frame is not None:
+        if frame.f_code in codes:
+            return True
+        frame = frame.f_back
+    return False
+
+
+def render_collapsed(stacks: Counter) -> str:
+    """Brendan Gregg's collapsed format: `root;caller;leaf count` per line."""
+    lines = [
+        ";".join(name for name, _, _ in stack) + f" {count}"
+        for stack, count in stacks.most_common()
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def render_speedscope(stacks: Counter, name: str, interval_seconds: float) -> str:
+    """A speedscope "sampled" profile; weights are sample counts times the interval."""
+    frames: list[dict[str, object]] = []
+    index: dict[tuple[str, str, int], int] = {}
+    samples: list[list[int]] = []
+    weights: list[float] = []
+    for stack, count in stacks.items():
+        sample = []
+        for entry in stack:
+            if entry not in index:
+                index[entry] = len(frames)
+                frames.append({"name": entry[0], "file": entry[1], "line": entry[2]})
+            sample.append(index[entry])
+        samples.append(sample)
+        weights.append(count * interval_seconds)
+    document = {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "vulnlabs",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }
+        ],
+    }
+    return json.dumps(document)
+
+
+class ProfilerManager:
+    """Admin-triggered sampling profiles of the scoring worker or API routes.
+
+    At most one profile runs at a time. A run samples either the
+    `scoring-worker-*` threads or any thread currently executing one of the
+    selected route endpoints, and stops after `duration_seconds` or, for the
+    worker, after `max_jobs` submissions. When no profile is running nothing
+    is hooked into the worker or the routes, so there is no overhead.
+    """
+
+    def __init__(
+        self,
+        worker: ScoringWorker,
+        output_dir: Path,
+        interval_seconds: float = 0.01,
+        max_duration_seconds: float = 300.0,
+        history_size: int = 20,
+    ) -> None:
+        self.worker = worker
+        self.output_dir = output_dir
+        self.interval_seconds = interval_seconds
+        self.max_duration_seconds = max_duration_seconds
+        self.history_size = history_size
+        self._runs: dict[str, ProfileRun] = {}
+        self._lock = threading.Lock()
+        self._active: Optional[ProfileRun] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(
+        self,
+        target: ProfileTarget,
+        duration_seconds: float,
+        fmt: ProfileFormat = ProfileFormat.speedscope,
+        max_jobs: int | None = None,
+        route_endpoints: dict[str, list[Callable]] | None = None,
+    ) -> ProfileRun:
+        run = ProfileRun(
+            target=target,
+            format=fmt,
+            duration_seconds=min(duration_seconds, self.max_duration_seconds),
+            max_jobs=max_jobs if target is ProfileTarget.worker else None,
+            routes=sorted(route_endpoints or {}),
+        )
+        if target is ProfileTarget.worker:
+            keep = _is_worker_thread
+        else:
+            codes = frozenset(
+                endpoint.__code__
+                for endpoints in (route_endpoints or {}).values()
+                for endpoint in endpoints
+            )
+            keep = lambda _name, frame: _on_stack(frame, codes)  # noqa: E731
+
+        with self._lock:
+            if self._active is not None:
+                raise ProfilerBusyError(self._active.id)
+            self._active = run
+            self._runs[run.id] = run
+            while len(self._runs) > self.history_size:
+                self._runs.pop(next(iter(self._runs)))
+            self._stop_event.clear()
+            if run.max_jobs:
+                self.worker.add_listener(self._on_job)
+            self._thread = threading.Thread(
+                target=self._sample,
+                args=(run, StackSampler(keep, self.interval_seconds)),
+                daemon=True,
+                name="profiler",
+            )
+            self._thread.start()
+        logger.info("Profiling %s for up to %.1fs (id=%s)", target.value, run.duration_seconds, run.id)
+        return run
+
+    def get(self, run_id: str) -> ProfileRun | None:
+        return self._runs.get(run_id)
+
+    def stop(self, run_id: str | None = None) -> ProfileRun | None:
+        """Stop the active run (if it matches `run_id`) and wait for its file."""
+        with self._lock:
+            run, thread = self._active, self._thread
+            if run is None or (run_id is not None and run.id != run_id):
+                return self._runs.get(run_id) if run_id else None
+            self._stop_event.set()
+        if thread is not None:
+            thread.join(timeout=10)
+        return run
+
+    def _on_job(self, _submission_id: str) -> None:
+        with self._lock:
+            run = self._active
+            if run is None:
+                return
+            run.jobs += 1
+            if run.max_jobs and run.jobs >= run.max_jobs:
+                self._stop_event.set()
+
+    def _sample(self, run: ProfileRun, sampler: StackSampler) -> None:
+        deadline = time.monotonic() + run.duration_seconds
+        try:
+            while not self._stop_event.wait(self.interval_seconds):
+                sampler.sample()
+                run.samples = sampler.samples
+                if time.monotonic() >= deadline:
+                    break
+            run.path = str(self._write(run, sampler))
+            run.status = ProfileStatus.completed
+        except Exception as exc:
+            logger.exception("Profile %s failed", run.id)
+            run.error = str(exc)
+            run.status = ProfileStatus.failed
+        finally:
+            run.finished_at = datetime.utcnow()
+            self.worker.remove_listener(self._on_job)
+            with self._lock:
+                self._active = None
+                self._thread = None
+
+    def _write(self, run: ProfileRun, sampler: StackSampler) -> Path:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = run.started_at.strftime("%Y%m%dT%H%M%S")
+        name = f"{stamp}-{run.target.value}-{run.id}"
+        if run.format is ProfileFormat.collapsed:
+            path = self.output_dir / f"{name}.collapsed.txt"
+            path.write_text(render_collapsed(sampler.stacks), encoding="utf-8")
+        else:
+            path = self.output_dir / f"{name}.speedscope.json"
+            path.write_text(
+                render_speedscope(sampler.stacks, name, self.interval_seconds),
+                encoding="utf-8",
+            )
+        return path
+
+
+def route_endpoints(routes: Iterable, paths: Iterable[str]) -> dict[str, list[Callable]]:
+    """Map route templates to the endpoint functions behind every method on them.
+
+    Raises `KeyError` naming any template that no route serves.
+    """
+    available: dict[str, list[Callable]] = {}
+    for route in routes:
+        endpoint = getattr(route, "endpoint", None)
+        if endpoint is not None:
+            available.setdefault(route.path, []).append(endpoint)
+    requested = set(paths)
+    missing = sorted(requested - set(available))
+    if missing:
+        raise KeyError(", ".join(missing))
+    return {path: available[path] for path in sorted(requested)}
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import logging
+import shutil
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .scoring import ChallengeScoringService
+from .worker import ScoringWorker
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReadinessCheck:
+    name: str
+    ok: bool
+    detail: str
+    # Failing optional checks are reported without making the node unready.
+    required: bool = True
+
+
+@dataclass
+class ReadinessReport:
+    checks: list[ReadinessCheck]
+    checked_at: datetime = field(default_factory=datetime.utcnow)
+    checked_monotonic: float = field(default_factory=time.monotonic)
+
+    @property
+    def ready(self) -> bool:
+        return all(check.ok for check in self.checks if check.required)
+
+
+class ReadinessProbe:
+    """Periodically evaluate whether this node should receive traffic.
+
+    Checks run on a background thread every `interval_seconds` and the
+    endpoint only reads the cached `ReadinessReport`, so probes from a load
+    balancer cost a dictionary lookup. A report older than three intervals is
+    treated as not ready, which also covers the refresher itself dying.
+    """
+
+    def __init__(
+        self,
+        worker: ScoringWorker,
+        scoring_service: ChallengeScoringService,
+        session_factory: Callable[[], Session],
+        interval_seconds: float = 2.0,
+        max_queue_depth: int = 1000,
+        required_analyzers: Iterable[str] = (),
+    ) -> None:
+        self.worker = worker
+        self.scoring_service = scoring_service
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.max_queue_depth = max_queue_depth
+        self.required_analyzers = frozenset(required_analyzers)
+        self._report: Optional[ReadinessReport] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self.refresh()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="readiness")
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def report(self) -> ReadinessReport:
+        report = self._report
+        if report is None:
+            return ReadinessReport(
+                checks=[ReadinessCheck("probe", False, "no readiness check has run yet")]
+            )
+        age = time.monotonic() - report.checked_monotonic
+        if age > 3 * self.interval_seconds:
+            return ReadinessReport(
+                checks=[
+                    *report.checks,
+                    ReadinessCheck("probe", False, f"last check is {age:.1f}s old"),
+                ],
+                checked_at=report.checked_at,
+                checked_monotonic=report.checked_monotonic,
+            )
+        return report
+
+    def refresh(self) -> ReadinessReport:
+        checks = [self._check_worker(), self._check_queue(), self._check_database()]
+        checks.extend(self._check_analyzers())
+        self._report = ReadinessReport(checks=checks)
+        return self._report
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval_seconds):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Readiness refresh failed")
+
+    def _check_worker(self) -> ReadinessCheck:
+        alive = self.worker.alive_threads()
+        writer_alive = self.worker.result_writer.is_alive()
+        ok = alive == self.worker.concurrency and writer_alive
+        detail = f"{alive}/{self.worker.concurrency} scoring threads alive"
+        if not writer_alive:
+            detail += "; result writer stopped"
+        return ReadinessCheck("worker", ok, detail)
+
+    def _check_queue(self) -> ReadinessCheck:
+        depth = self.worker.queue_depth()
+        return ReadinessCheck(
+            "queue",
+            depth < self.max_queue_depth,
+            f"{depth}/{self.max_queue_depth} submissions queued",
+        )
+
+    def _check_database(self) -> ReadinessCheck:
+        started = time.perf_counter()
+        try:
+            with self.session_factory() as session:
+                session.execute(text("SELECT 1"))
+        except Exception as exc:
+            return ReadinessCheck("database", False, f"unreachable: {exc}")
+        return ReadinessCheck(
+            "database", True, f"reachable in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+
+    def _check_analyzers(self) -> list[ReadinessCheck]:
+        checks = []
+        components = [
+            (getattr(analyzer, "name", type(analyzer).__name__), analyzer)
+            for analyzer in self.scoring_service.analyzers
+        ]
+        if self.scoring_service.sandbox is not None:
+            components.append(("sandbox", self.scoring_service.sandbox))
+        for name, component in components:
+            binary = _binary_for(component)
+            if binary is None:
+                ok, detail = True, "in-process"
+            elif shutil.which(binary) is None:
+                ok, detail = False, f"{binary} not found on PATH"
+            elif getattr(component, "rule_paths", True) == []:
+                ok, detail = False, "no rule files loaded"
+            else:
+                ok, detail = True, f"{binary} available"
+            checks.append(
+                ReadinessCheck(
+                    f"analyzer:{name}", ok, detail, required=name in self.required_analyzers
+                )
+            )
+        return checks
+
+
+def _binary_for(component: object) -> str | None:
+    for attribute in ("binary", "docker_binary", "python_executable"):
+        value = getattr(component, attribute, None)
+        if value:
+            return value
+    return None
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from .. import db_init
+from ..config import Settings
+from .rules import RULE_SUFFIXES, build_rule_bundle
+from .scoring import ChallengeScoringService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReloadResult:
+    challenges: int
+    rule_bundle_version: str | None
+    rules_changed: bool
+
+
+class HotReloader:
+    """Reload the challenge bank and Semgrep rules while the app keeps serving.
+
+    Challenges go through the incremental seeder, whose generation bump makes
+    the catalog rebuild and swap on the next request. Rules are loaded into a
+    new `RuleBundle` that replaces the scoring service's bundle in a single
+    assignment. With `poll_interval_seconds` set, a thread polls both trees
+    with `os.scandir` and reloads when any file's mtime or size changes.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        scoring_service: ChallengeScoringService,
+        poll_interval_seconds: float = 0.0,
+    ) -> None:
+        self.settings = settings
+        self.scoring_service = scoring_service
+        self.poll_interval_seconds = poll_interval_seconds
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.poll_interval_seconds <= 0:
+            return
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        # Baseline taken before returning so changes made right after start() count.
+        self._thread = threading.Thread(
+            target=self._watch, args=(self._fingerprint(),), daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def reload(self) -> ReloadResult:
+        with self._lock:
+            challenges = db_init.seed_challenges(self.settings.challenge_root)
+            bundle = build_rule_bundle(self.settings)
+            current = self.scoring_service.rule_bundle
+            rules_changed = bundle.version != current.version
+            if rules_changed:
+                self.scoring_service.swap_rule_bundle(bundle)
+                logger.info(
+                    "Swapped rule bundle %s -> %s", current.version, bundle.version
+                )
+            if challenges:
+                logger.info("Reloaded %s challenges", challenges)
+            return ReloadResult(
+                challenges=challenges,
+                rule_bundle_version=self.scoring_service.rule_bundle.version,
+                rules_changed=rules_changed,
+            )
+
+    def _fingerprint(self) -> frozenset:
+        entries: set[tuple[str, int, int]] = set()
+        for root, suffixes in (
+            (self.settings.challenge_root, (".json",)),
+            (self.settings.semgrep_rules_root, RULE_SUFFIXES),
+        ):
+            entries.update(_stat_tree(root, suffixes))
+        return frozenset(entries)
+
+    def _watch(self, last: frozenset) -> None:
+        while not self._stop_event.wait(self.poll_interval_seconds):
+            current = self._fingerprint()
+            if current == last:
+                continue
+            try:
+                self.reload()
+            except Exception:
+                logger.exception("Hot reload failed; keeping the previous bank and rules")
+                continue
+            last = current
+
+
+def _stat_tree(root: Path, suffixes: tuple[str, ...]) -> list[tuple[str, int, int]]:
+    found: list[tuple[str, int, int]] = []
+    if not root.is_dir():
+        return found
+    pending = [str(root)]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    pending.append(entry.path)
+                elif entry.name.endswith(suffixes) and entry.is_file():
+                    stat = entry.stat()
+                    found.append((entry.path, stat.st_mtime_ns, stat.st_size))
+    return found
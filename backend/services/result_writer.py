@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Optional, Sequence
+
+from sqlalchemy import bindparam, delete, insert, update
+from sqlalchemy.orm import Session
+
+from ..metrics import RESULT_WRITER_BATCH_SIZE
+from ..models import Finding, ResultFingerprint, Submission
+from ..types import SubmissionStatus
+from .fingerprint import FingerprintKey
+from .scoring import AnalysisIssue
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StatusWrite:
+    """A status transition (and, for final results, findings) for one submission."""
+
+    submission_id: str
+    status: SubmissionStatus
+    challenge_slug: str | None = None
+    score: int | None = None
+    feedback: str | None = None
+    issues: Sequence[AnalysisIssue] | None = None
+    rule_bundle_version: str | None = None
+    timings: dict[str, float] | None = None
+    # Remember the verdict under this key, or count a hit on it when reused.
+    fingerprint: FingerprintKey | None = None
+    fingerprint_hit: bool = False
+    analyzer_runs: int = 0
+    submitted_at: float = field(default_factory=time.perf_counter)
+    future: Future = field(default_factory=Future)
+
+    @property
+    def is_result(self) -> bool:
+        return self.issues is not None
+
+
+class ResultWriter:
+    """Write-behind group committer for scoring status transitions and results.
+
+    Scoring threads hand writes to a single writer thread, which gathers
+    everything that arrives within `max_delay_seconds` (up to `max_batch`
+    writes) and applies it in one transaction, so many submissions share one
+    commit instead of paying two each. Writes for a submission are applied in
+    the order they were queued; when several land in the same batch the last
+    one wins. Each write returns a future that resolves once its transaction
+    has committed, which is the durability point callers wait on.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_batch: int = 256,
+        max_delay_seconds: float = 0.005,
+    ) -> None:
+        self.session_factory = session_factory
+        self.max_batch = max(max_batch, 1)
+        self.max_delay_seconds = max_delay_seconds
+        self._queue: queue.Queue[StatusWrite | None] = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Commit everything already queued, then stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            # Under the lock, so no write can be queued behind the sentinel.
+            self._queue.put(None)
+        thread.join(timeout=5)
+
+    def is_alive(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def mark_running(self, submission_id: str) -> Future:
+        return self._submit(StatusWrite(submission_id, SubmissionStatus.running))
+
+    def write_result(
+        self,
+        submission_id: str,
+        challenge_slug: str,
+        status: SubmissionStatus,
+        score: int | None,
+        feedback: str | None,
+        issues: Sequence[AnalysisIssue],
+        rule_bundle_version: str | None = None,
+        timings: dict[str, float] | None = None,
+        fingerprint: FingerprintKey | None = None,
+        fingerprint_hit: bool = False,
+        analyzer_runs: int = 0,
+    ) -> Future:
+        return self._submit(
+            StatusWrite(
+                submission_id,
+                status,
+                challenge_slug=challenge_slug,
+                score=score,
+                feedback=feedback,
+                issues=list(issues),
+                rule_bundle_version=rule_bundle_version,
+                timings=timings,
+                fingerprint=fingerprint,
+                fingerprint_hit=fingerprint_hit,
+                analyzer_runs=analyzer_runs,
+            )
+        )
+
+    def _submit(self, write: StatusWrite) -> Future:
+        with self._lock:
+            queued = self._thread is not None
+            if queued:
+                self._queue.put(write)
+        if not queued:
+            # Not started or stopped (e.g. scripts and tests driving the worker inline).
+            self._commit([write])
+        return write.future
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            write = self._queue.get()
+            if write is None:
+                break
+            batch = [write]
+            deadline = time.monotonic() + self.max_delay_seconds
+            while len(batch) < self.max_batch:
+                try:
+                    remaining = deadline - time.monotonic()
+                    write = (
+                        self._queue.get(timeout=remaining)
+                        if remaining > 0
+                        else self._queue.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+                if write is None:
+                    stopping = True
+                    break
+                batch.append(write)
+            self._commit(batch)
+        self._drain()
+
+    def _drain(self) -> None:
+        # Nothing should follow the sentinel, but never leave a caller waiting.
+        leftovers = []
+        while True:
+            try:
+                write = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if write is not None:
+                leftovers.append(write)
+        if leftovers:
+            self._commit(leftovers)
+
+    def _commit(self, batch: list[StatusWrite]) -> None:
+        RESULT_WRITER_BATCH_SIZE.observe(len(batch))
+        try:
+            with self.session_factory() as session:
+                _apply(session, batch)
+                session.commit()
+        except Exception as exc:
+            if len(batch) == 1:
+                logger.exception("Failed to write result for %s", batch[0].submission_id)
+                batch[0].future.set_exception(exc)
+                return
+            # Retry one by one so a single bad row cannot fail its neighbours.
+            logger.warning("Group commit of %s writes failed; retrying individually", len(batch))
+            for write in batch:
+                self._commit([write])
+            return
+        for write in batch:
+            write.future.set_result(None)
+
+
+def _apply(session: Session, batch: list[StatusWrite]) -> None:
+    latest: dict[str, StatusWrite] = {}
+    for write in batch:
+        latest.pop(write.submission_id, None)
+        latest[write.submission_id] = write
+
+    now = datetime.utcnow()
+    submissions = Submission.__table__
+    transitions = [write for write in latest.values() if not write.is_result]
+    results = [write for write in latest.values() if write.is_result]
+
+    if transitions:
+        session.execute(
+            update(submissions)
+            .where(submissions.c.id == bindparam("_id"))
+            .values(status=bindparam("_status"), updated_at=bindparam("_updated_at")),
+            [
+                {"_id": write.submission_id, "_status": write.status, "_updated_at": now}
+                for write in transitions
+            ],
+        )
+    if not results:
+        return
+
+    session.execute(
+        update(submissions)
+        .where(submissions.c.id == bindparam("_id"))
+        .values(
+            status=bindparam("_status"),
+            score=bindparam("_score"),
+            feedback=bindparam("_feedback"),
+            rule_bundle_version=bindparam("_rule_bundle_version"),
+            stage_timings=bindparam("_stage_timings"),
+            updated_at=bindparam("_updated_at"),
+        ),
+        [
+            {
+                "_id": write.submission_id,
+                "_status": write.status,
+                "_score": write.score,
+                "_feedback": write.feedback,
+                "_rule_bundle_version": write.rule_bundle_version,
+                "_stage_timings": _encode_timings(write),
+                "_updated_at": now,
+            }
+            for write in results
+        ],
+    )
+    session.execute(
+        delete(Finding).where(
+            Finding.submission_id.in_([write.submission_id for write in results])
+        )
+    )
+    rows = [
+        {
+            "submission_id": write.submission_id,
+            "challenge_slug": write.challenge_slug,
+            "tool": issue.tool,
+            "rule_id": issue.rule_id,
+            "severity": issue.severity,
+            "message": issue.message,
+        }
+        for write in results
+        for issue in write.issues or []
+    ]
+    if rows:
+        session.execute(insert(Finding), rows)
+    _apply_fingerprints(session, results, now)
+
+
+def _apply_fingerprints(session: Session, results: list[StatusWrite], now: datetime) -> None:
+    fingerprints = ResultFingerprint.__table__
+    hits = [write for write in results if write.fingerprint and write.fingerprint_hit]
+    if hits:
+        session.execute(
+            update(fingerprints)
+            .where(
+                fingerprints.c.challenge_slug == bindparam("_slug"),
+                fingerprints.c.toolchain_version == bindparam("_toolchain"),
+                fingerprints.c.fingerprint == bindparam("_fingerprint"),
+            )
+            .values(
+                hits=fingerprints.c.hits + 1,
+                analyzer_runs_saved=fingerprints.c.analyzer_runs_saved + bindparam("_runs"),
+                last_hit_at=now,
+            ),
+            [
+                {
+                    "_slug": write.fingerprint.challenge_slug,
+                    "_toolchain": write.fingerprint.toolchain_version,
+                    "_fingerprint": write.fingerprint.fingerprint,
+                    "_runs": write.analyzer_runs,
+                }
+                for write in hits
+            ],
+        )
+
+    # A stored entry is replaced when the same code now scores a different
+    # heuristic outcome, or when two workers raced on equivalent submissions.
+    entries: dict[tuple[str, str, str], StatusWrite] = {}
+    for write in results:
+        key = write.fingerprint
+        if key and not write.fingerprint_hit:
+            entries[(key.challenge_slug, key.toolchain_version, key.fingerprint)] = write
+    if not entries:
+        return
+    for slug, toolchain, fingerprint in entries:
+        session.execute(
+            delete(fingerprints).where(
+                fingerprints.c.challenge_slug == slug,
+                fingerprints.c.toolchain_version == toolchain,
+                fingerprints.c.fingerprint == fingerprint,
+            )
+        )
+    session.execute(
+        insert(fingerprints),
+        [
+            {
+                "challenge_slug": slug,
+                "toolchain_version": toolchain,
+                "fingerprint": fingerprint,
+                "heuristic": write.fingerprint.heuristic,
+                "status": write.status.value,
+                "score": write.score,
+                "feedback": write.feedback,
+                "issues": [
+                    {
+                        "tool": issue.tool,
+                        "message": issue.message,
+                        "severity": issue.severity,
+                        "rule_id": issue.rule_id,
+                    }
+                    for issue in write.issues or []
+                ],
+                "source_submission_id": write.submission_id,
+                "analyzer_runs": write.analyzer_runs,
+                "hits": 0,
+                "analyzer_runs_saved": 0,
+                "created_at": now,
+            }
+            for (slug, toolchain, fingerprint), write in entries.items()
+        ],
+    )
+
+
+def _encode_timings(write: StatusWrite) -> str | None:
+    if write.timings is None:
+        return None
+    # `persisted` covers the wait for the group commit up to applying the row;
+    # the commit itself is reported by vulnlabs_db_commit_duration_seconds.
+    timings = {
+        **write.timings,
+        "persisted": round((time.perf_counter() - write.submitted_at) * 1000, 1),
+    }
+    return json.dumps(timings, separators=(",", ":"))
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+from ..config import Settings
+from .analyzers import BanditAnalyzer, SemgrepAnalyzer
+from .scoring import RuleBundle
+
+RULE_SUFFIXES = (".yaml", ".yml")
+
+
+def discover_rule_files(root: Path) -> list[Path]:
+    """Return every Semgrep rule file under `root`, in a stable order."""
+    if not root.is_dir():
+        return []
+    return sorted(path for path in root.rglob("*") if path.suffix in RULE_SUFFIXES)
+
+
+def rule_bundle_version(root: Path, rule_files: list[Path]) -> str:
+    """Hash rule paths and contents into a short, stable version string."""
+    digest = hashlib.sha256()
+    for path in rule_files:
+        digest.update(path.relative_to(root).as_posix().encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def build_rule_bundle(settings: Settings) -> RuleBundle:
+    """Load the Semgrep rule pack and build a fresh set of analyzers for it."""
+    root = settings.semgrep_rules_root
+    rule_files = discover_rule_files(root)
+    analyzers = (
+        SemgrepAnalyzer(
+            rule_files,
+            binary=settings.semgrep_binary,
+            timeout_seconds=settings.semgrep_timeout_seconds,
+        ),
+        BanditAnalyzer(
+            binary=settings.bandit_binary,
+            timeout_seconds=settings.bandit_timeout_seconds,
+            severity=settings.bandit_severity,
+            confidence=settings.bandit_confidence,
+        ),
+    )
+    return RuleBundle(version=rule_bundle_version(root, rule_files), analyzers=analyzers)
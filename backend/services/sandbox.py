@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import ast
+import json
 import re
+import secrets
+import shutil
 import subprocess
 import tempfile
 import textwrap
 from pathlib import Path
-from typing import Tuple
+from typing import Any, Tuple
 
 from ..models import Submission
-from .scoring import SandboxExecutor
+from .fingerprint import binary_identity
+from .scoring import SandboxExecutor, mark_unreliable
 
 
 def create_sandbox_executor(
@@ -35,12 +40,12 @@ def create_sandbox_executor(
 
 
 class LocalSandboxExecutor(SandboxExecutor):
-    """Execute submission code in an isolated subprocess.
+    """Compile submission code in a subprocess on the API host.
 
-    This implementation writes the submission into a temporary directory and
-    runs `python -I -m py_compile` followed by `python -I` to catch basic
-    runtime errors. It is not a replacement for a full container sandbox, but
-    provides a safer execution flow than the previous stub.
+    The wrapped submission is written to a temporary directory and compiled by
+    one `python -I` invocation of the harness; it is never executed. The host
+    process has no resource, filesystem or network isolation, so challenge
+    test cases only run under `DockerSandboxExecutor`.
     """
 
     def __init__(
@@ -56,39 +61,54 @@ class LocalSandboxExecutor(SandboxExecutor):
             r"exec\(",
         ]
 
-    def run_tests(self, submission: Submission) -> Tuple[bool, str]:
-        code = submission.code
+    def toolchain(self) -> str:
+        """What this sandbox's verdicts depend on: compile-only, with this interpreter."""
+        return f"local:{binary_identity(self.python_executable)}"
+
+    def prohibited_reason(self, code: str) -> str | None:
+        """Why the sandbox refuses to run `code`, or None when it is allowed."""
         for pattern in self._prohibited_patterns:
             if re.search(pattern, code):
-                return (
-                    False,
-                    "Sandbox rejected code containing potentially dangerous system calls.",
-                )
+                return "Sandbox rejected code containing potentially dangerous system calls."
+        return None
+
+    def run_tests(self, submission: Submission) -> Tuple[bool, str]:
+        code = submission.code
+        reason = self.prohibited_reason(code)
+        if reason:
+            return False, reason
 
         wrapped_code = _wrap_submission_for_sandbox(code)
 
         with tempfile.TemporaryDirectory(prefix="vulnlabs_sandbox_") as tmpdir:
             tmp_path = Path(tmpdir)
-            code_path = tmp_path / "submission.py"
-            code_path.write_text(wrapped_code, encoding="utf-8")
-
-            compile_cmd = [
+            # No cases: the harness compiles the code and returns before running it.
+            _write_workspace(tmp_path, wrapped_code, [])
+            harness_cmd = [
                 self.python_executable,
                 "-I",
-                "-m",
-                "py_compile",
-                str(code_path),
+                str(tmp_path / "harness.py"),
+                str(tmp_path / "submission.py"),
+                str(tmp_path / "cases.json"),
             ]
-            compile_proc = subprocess.run(
-                compile_cmd,
-                capture_output=True,
-                text=True,
-                timeout=self.timeout_seconds,
-            )
-            if compile_proc.returncode != 0:
-                stderr = compile_proc.stderr.strip() or "Syntax error during compilation."
-                return False, f"Sandbox compilation failed: {stderr}"
-            return True, "Sandbox compilation succeeded."
+            nonce = secrets.token_hex(16)
+            try:
+                harness_proc = subprocess.run(
+                    harness_cmd,
+                    input=nonce + "\n",
+                    capture_output=True,
+                    text=True,
+                    timeout=self.timeout_seconds,
+                    cwd=tmp_path,
+                )
+            except subprocess.TimeoutExpired:
+                mark_unreliable()
+                return False, "Sandbox execution timed out."
+        ok, message = _interpret_harness(harness_proc, "Sandbox", nonce, 0)
+        if ok and _test_cases(submission):
+            message += " Challenge test cases only run with the docker sandbox driver."
+        return ok, message
+
 
 class DockerSandboxExecutor(SandboxExecutor):
     """Sandbox executor that runs code inside a Docker container."""
@@ -111,26 +131,35 @@ class DockerSandboxExecutor(SandboxExecutor):
             r"exec\(",
         ]
 
-    def run_tests(self, submission: Submission) -> Tuple[bool, str]:
-        code = submission.code
+    def toolchain(self) -> str:
+        """What this sandbox's verdicts depend on: the image that runs the test cases."""
+        return f"docker:{self.image}:{self.memory_limit}"
+
+    def prohibited_reason(self, code: str) -> str | None:
+        """Why the sandbox refuses to run `code`, or None when it is allowed."""
         for pattern in self._prohibited_patterns:
             if re.search(pattern, code):
-                return (
-                    False,
-                    "Sandbox rejected code containing disallowed patterns.",
-                )
+                return "Sandbox rejected code containing disallowed patterns."
+        return None
+
+    def run_tests(self, submission: Submission) -> Tuple[bool, str]:
+        code = submission.code
+        reason = self.prohibited_reason(code)
+        if reason:
+            return False, reason
 
         wrapped_code = _wrap_submission_for_sandbox(code)
 
         with tempfile.TemporaryDirectory(prefix="vulnlabs_sandbox_") as tmpdir:
             tmp_path = Path(tmpdir)
-            code_path = tmp_path / "submission.py"
-            code_path.write_text(wrapped_code, encoding="utf-8")
+            cases = _test_cases(submission)
+            _write_workspace(tmp_path, wrapped_code, cases)
 
             docker_cmd = [
                 self.docker_binary,
                 "run",
                 "--rm",
+                "-i",
                 "--network",
                 "none",
                 "--memory",
@@ -142,28 +171,29 @@ class DockerSandboxExecutor(SandboxExecutor):
                 self.image,
                 "python",
                 "-I",
-                "-m",
-                "py_compile",
+                "/workspace/harness.py",
                 "/workspace/submission.py",
+                "/workspace/cases.json",
             ]
 
+            nonce = secrets.token_hex(16)
             try:
                 run_proc = subprocess.run(
                     docker_cmd,
+                    input=nonce + "\n",
                     capture_output=True,
                     text=True,
                     timeout=self.timeout_seconds,
                 )
             except FileNotFoundError:
+                mark_unreliable()
                 return False, "Docker binary not found for sandbox execution."
             except subprocess.TimeoutExpired:
+                mark_unreliable()
                 return False, "Docker sandbox execution timed out."
 
-            if run_proc.returncode != 0:
-                message = run_proc.stderr.strip() or run_proc.stdout.strip()
-                return False, message or "Docker sandbox execution failed."
+            return _interpret_harness(run_proc, "Docker sandbox", nonce, len(cases))
 
-            return True, "Docker sandbox compilation succeeded."
 
 def _wrap_submission_for_sandbox(code: str) -> str:
     """Wrap user-provided snippet in a function for compilation tests."""
@@ -177,3 +207,79 @@ def _wrap_submission_for_sandbox(code: str) -> str:
         "def __vulnlabs_submission__(db, request):\n"
         f"{body}"
     )
+
+
+def syntax_error(code: str) -> str | None:
+    """Parse the wrapped snippet in-process; None when it is valid syntax.
+
+    Only the parser runs, which is several times cheaper than compiling to
+    bytecode; the few errors only the compiler reports surface in the sandbox.
+    """
+    try:
+        ast.parse(_wrap_submission_for_sandbox(code), "submission.py")
+    except SyntaxError as exc:
+        # Report the line in the student's snippet, not in the wrapper.
+        line = exc.lineno - 2 if exc.lineno and exc.lineno > 2 else exc.lineno
+        return f"{exc.msg} (line {line})"
+    except (ValueError, RecursionError, MemoryError) as exc:
+        return str(exc) or type(exc).__name__
+    return None
+
+
+_HARNESS_SOURCE = Path(__file__).with_name("sandbox_harness.py")
+
+
+def _test_cases(submission: Any) -> list[dict]:
+    # Stand-in submissions (tests, benchmarks) may carry no challenge at all.
+    challenge = getattr(submission, "challenge", None)
+    return list(getattr(challenge, "test_cases", None) or [])
+
+
+def _write_workspace(tmp_path: Path, wrapped_code: str, cases: list[dict]) -> None:
+    """Lay out everything one harness invocation needs in `tmp_path`."""
+    (tmp_path / "submission.py").write_text(wrapped_code, encoding="utf-8")
+    (tmp_path / "cases.json").write_text(json.dumps(cases), encoding="utf-8")
+    shutil.copyfile(_HARNESS_SOURCE, tmp_path / "harness.py")
+
+
+def _interpret_harness(
+    proc: subprocess.CompletedProcess, label: str, nonce: str, expected_cases: int
+) -> Tuple[bool, str]:
+    """Turn one harness run into a verdict.
+
+    Only stdout lines starting with this run's `nonce` count as the result; the
+    harness reads it from stdin before the submission starts and never hands it
+    to the submission's interpreter, so nothing the submission writes can pose
+    as one. A missing or repeated result line, or a result for the wrong
+    number of cases, fails the submission.
+    """
+    if proc.returncode != 0:
+        # The harness itself died (killed, out of memory, docker failure).
+        mark_unreliable()
+        message = proc.stderr.strip() or proc.stdout.strip()
+        return False, message or f"{label} execution failed."
+    results = [line[len(nonce) :] for line in proc.stdout.splitlines() if line.startswith(nonce)]
+    if len(results) != 1:
+        problem = "no result" if not results else "more than one result"
+        return False, f"{label} returned {problem}."
+    try:
+        result = json.loads(results[0])
+    except json.JSONDecodeError:
+        result = None
+    if not isinstance(result, dict):
+        return False, f"{label} returned an unreadable result."
+    if "compile_error" in result:
+        return False, f"{label} compilation failed: {result['compile_error']}"
+    if "error" in result:
+        return False, f"{label} harness failed: {result['error']}"
+
+    cases = result.get("cases", [])
+    if len(cases) != expected_cases:
+        return False, f"{label} reported {len(cases)} of {expected_cases} challenge test cases."
+    if not cases:
+        return True, f"{label} compilation succeeded."
+    failed = [case for case in cases if not case["passed"]]
+    if not failed:
+        return True, f"{len(cases)}/{len(cases)} challenge test cases passed."
+    details = "; ".join(f"{case['name']} ({case['kind']}): {case['detail']}" for case in failed)
+    return False, f"{len(failed)}/{len(cases)} challenge test cases failed: {details}"
@@ -0,0 +1,365 @@
+"""Run a wrapped submission against a challenge's test cases in one harness invocation.
+
+The sandbox copies this file next to ``submission.py`` and ``cases.json`` and
+runs ``python -I harness.py submission.py cases.json``, so it must only use the
+standard library. The submission is compiled once, then every case calls
+``__vulnlabs_submission__(db, request)`` with fresh stub objects:
+
+* ``request`` exposes ``args``, ``form``, ``json``, ``headers`` and ``cookies``
+  built from the case's ``request`` mapping.
+* ``db`` reports every ``execute`` call and returns the case's ``rows``.
+* ``os.system``, ``os.popen`` and the ``subprocess`` helpers report commands
+  instead of running them.
+
+The submission only ever runs in a separately exec'd interpreter
+(``harness.py --child submission.py``) that inherits nothing but a pipe in each
+direction. This process hands it one case at a time with a fresh token, and
+the stubs stream each query, command and the case's return value back as they
+happen. Everything that interpreter sends is treated as the submission's
+behaviour, never as a verdict: a line without the current token, a case left
+unfinished or any trailing output fails the run, and ``expect`` is checked
+here.
+
+This process reads the per-run nonce the sandbox sends on stdin before the
+child exists and marks itself non-dumpable, so the child can neither read the
+nonce nor reach this process's stdout through ``/proc``. The result is one
+stdout line: the nonce followed by a JSON document.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import secrets
+import subprocess
+import sys
+import traceback
+import types
+
+
+class _Mapping(dict):
+    def getlist(self, key):
+        value = self.get(key)
+        if value is None:
+            return []
+        return value if isinstance(value, list) else [value]
+
+
+class StubRequest:
+    def __init__(self, spec):
+        self.args = _Mapping(spec.get("args", {}))
+        self.query_params = self.args
+        self.form = _Mapping(spec.get("form", {}))
+        self.json = spec.get("json", {})
+        self.headers = _Mapping(spec.get("headers", {}))
+        self.cookies = _Mapping(spec.get("cookies", {}))
+        self.path_params = _Mapping(spec.get("path_params", {}))
+
+    def get_json(self, *args, **kwargs):
+        return self.json
+
+
+class StubResult:
+    def __init__(self, rows):
+        self._rows = [tuple(row) if isinstance(row, list) else row for row in rows]
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def scalar(self):
+        row = self.fetchone()
+        return row[0] if isinstance(row, tuple) and row else row
+
+    first = fetchone
+    all = fetchall
+
+    def __iter__(self):
+        return iter(self._rows)
+
+
+class StubDB:
+    """Stands in for a DB-API connection, a cursor and a SQLAlchemy session."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self._last = StubResult([])
+
+    def execute(self, statement, params=None, *args, **kwargs):
+        _emit({"event": "query", "sql": str(statement)})
+        self._last = StubResult(self.rows)
+        return self._last
+
+    def cursor(self):
+        return self
+
+    def fetchone(self):
+        return self._last.fetchone()
+
+    def fetchall(self):
+        return self._last.fetchall()
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class HTMLResponse:
+    def __init__(self, content="", status_code=200, **kwargs):
+        self.body = content
+        self.status_code = status_code
+
+    def __str__(self):
+        return str(self.body)
+
+
+def _record_command(command, shell):
+    rendered = command if isinstance(command, str) else " ".join(map(str, command))
+    _emit({"event": "command", "command": rendered, "shell": shell})
+
+
+class _StubPopen:
+    def __init__(self, args, *unused, **kwargs):
+        self.args = args
+        self.returncode = 0
+        self.stdout = io.BytesIO()
+        self.stderr = io.BytesIO()
+        _record_command(args, kwargs.get("shell", False))
+
+    def communicate(self, *args, **kwargs):
+        return b"", b""
+
+    def wait(self, *args, **kwargs):
+        return 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+
+def _install_command_stubs():
+    def run(args, *unused, **kwargs):
+        _record_command(args, kwargs.get("shell", False))
+        empty = "" if kwargs.get("text") or kwargs.get("universal_newlines") else b""
+        return subprocess.CompletedProcess(args, 0, stdout=empty, stderr=empty)
+
+    def call(args, *unused, **kwargs):
+        _record_command(args, kwargs.get("shell", False))
+        return 0
+
+    def check_output(args, *unused, **kwargs):
+        _record_command(args, kwargs.get("shell", False))
+        return "" if kwargs.get("text") or kwargs.get("universal_newlines") else b""
+
+    def system(command):
+        _record_command(command, True)
+        return 0
+
+    def popen(command, *args, **kwargs):
+        _record_command(command, True)
+        return io.StringIO("")
+
+    subprocess.run = run
+    subprocess.call = call
+    subprocess.check_call = call
+    subprocess.check_output = check_output
+    subprocess.Popen = _StubPopen
+    os.system = system
+    os.popen = popen
+
+
+def _install_sqlalchemy_shim():
+    try:
+        import sqlalchemy  # noqa: F401
+    except ImportError:
+        shim = types.ModuleType("sqlalchemy")
+        shim.text = str
+        sys.modules["sqlalchemy"] = shim
+
+
+def _check(expect, observed):
+    """Return a failure description, or None when every expectation holds."""
+    output = observed["output"]
+    if observed["raised"] is not None:
+        if expect.get("allow_rejection"):
+            return None
+        return f"raised {observed['raised']}"
+    if "output_contains" in expect and expect["output_contains"] not in output:
+        return f"output does not contain {expect['output_contains']!r}"
+    if "output_excludes" in expect and expect["output_excludes"] in output:
+        return f"output contains {expect['output_excludes']!r}"
+    if expect.get("db_executed") and not observed["queries"]:
+        return "no query was executed"
+    if "sql_excludes" in expect:
+        for statement in observed["queries"]:
+            if expect["sql_excludes"] in statement:
+                return "input was interpolated into the SQL text"
+    if expect.get("command_executed") and not observed["commands"]:
+        return "no command was executed"
+    if "no_shell_with" in expect:
+        for call in observed["commands"]:
+            if call["shell"] and expect["no_shell_with"] in call["command"]:
+                return "input reached a shell command"
+    return None
+
+
+class _Channel:
+    """The child's side of the pipe to the harness; `token` names the running case."""
+
+    stream = None
+    token = None
+
+
+def _emit(event):
+    _Channel.stream.write(json.dumps({"token": _Channel.token, **event}) + "\n")
+    _Channel.stream.flush()
+
+
+def child_main(submission_path):
+    """Serve cases from stdin until it closes; runs in the submission's interpreter."""
+    inbox = os.fdopen(os.dup(0), encoding="utf-8")
+    _Channel.stream = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    # Stray prints and fd-level writes go nowhere rather than into the channel.
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    sys.stdin = io.StringIO()
+    sys.stdout = io.StringIO()
+    _install_command_stubs()
+    _install_sqlalchemy_shim()
+
+    with open(submission_path, encoding="utf-8") as handle:
+        code = compile(handle.read(), "submission.py", "exec")
+    namespace = {"__name__": "__vulnlabs__", "HTMLResponse": HTMLResponse}
+    exec(code, namespace)
+    submission = namespace["__vulnlabs_submission__"]
+
+    for line in inbox:
+        message = json.loads(line)
+        _Channel.token = message["token"]
+        case = message["case"]
+        raised = None
+        output = ""
+        db = StubDB(case.get("rows", []))
+        try:
+            output = str(submission(db, StubRequest(case.get("request", {}))))
+        except Exception as exc:
+            raised = f"{type(exc).__name__}: {exc}"
+        _emit({"event": "done", "output": output, "raised": raised})
+
+
+def _run_case(child, case):
+    """Send one case to the child and collect what it reports until it finishes."""
+    token = secrets.token_hex(16)
+    child.stdin.write(json.dumps({"token": token, "case": case}) + "\n")
+    child.stdin.flush()
+    observed = {"queries": [], "commands": []}
+    for line in child.stdout:
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            event = None
+        if not isinstance(event, dict) or event.get("token") != token:
+            raise RuntimeError("unexpected output from the submission process")
+        kind = event.get("event")
+        if kind == "query":
+            observed["queries"].append(str(event.get("sql")))
+        elif kind == "command":
+            observed["commands"].append(
+                {"command": str(event.get("command")), "shell": bool(event.get("shell"))}
+            )
+        elif kind == "done":
+            raised = event.get("raised")
+            observed["output"] = str(event.get("output"))
+            observed["raised"] = None if raised is None else str(raised)
+            return observed
+        else:
+            raise RuntimeError("unexpected output from the submission process")
+    raise RuntimeError("the submission process exited before finishing a test case")
+
+
+def _run_child(submission_path, cases):
+    """Run every case in a fresh interpreter and return what it was observed doing."""
+    child = subprocess.Popen(
+        [sys.executable, "-I", os.path.abspath(__file__), "--child", submission_path],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        close_fds=True,
+        encoding="utf-8",
+    )
+    try:
+        observations = [_run_case(child, case) for case in cases]
+        child.stdin.close()
+        if child.stdout.read():
+            raise RuntimeError("unexpected output from the submission process")
+        if child.wait() != 0:
+            raise RuntimeError("the submission process exited abnormally")
+    finally:
+        if child.poll() is None:
+            child.kill()
+            child.wait()
+    return observations
+
+
+def _protect_from_child():
+    """Keep same-user processes out of this one's memory and fds under ``/proc``."""
+    try:
+        import ctypes
+
+        ctypes.CDLL(None, use_errno=True).prctl(4, 0, 0, 0, 0)  # PR_SET_DUMPABLE
+    except (OSError, AttributeError):
+        pass
+
+
+def run(submission_path, cases_path):
+    with open(cases_path, encoding="utf-8") as handle:
+        cases = json.load(handle)
+    with open(submission_path, encoding="utf-8") as handle:
+        source = handle.read()
+    try:
+        compile(source, "submission.py", "exec")
+    except SyntaxError as exc:
+        return {"compile_error": f"{exc.msg} (line {exc.lineno})"}
+    if not cases:
+        return {"cases": []}
+
+    results = []
+    observations = _run_child(submission_path, cases)
+    for index, (case, observed) in enumerate(zip(cases, observations), start=1):
+        failure = _check(case.get("expect", {}), observed)
+        results.append(
+            {
+                "name": case.get("name", f"case {index}"),
+                "kind": case.get("kind", "benign"),
+                "passed": failure is None,
+                "detail": failure,
+            }
+        )
+    return {"cases": results}
+
+
+def main():
+    if sys.argv[1] == "--child":
+        child_main(sys.argv[2])
+        return
+    # Read before any submission code runs; nothing the child can reach holds it.
+    nonce = sys.stdin.readline().strip()
+    _protect_from_child()
+    try:
+        result = run(sys.argv[1], sys.argv[2])
+    except Exception:
+        result = {"error": traceback.format_exc(limit=3)}
+    sys.stdout.write(nonce + json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
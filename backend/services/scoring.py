@@ -1,11 +1,20 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass
+import threading
+import time
+from dataclasses import dataclass, field
 from typing import Callable, Protocol, Sequence
 
+from ..metrics import (
+    ANALYZER_DURATION,
+    ANALYZER_RUNS,
+    ANALYZER_RUNS_SAVED,
+    FINGERPRINT_LOOKUPS,
+)
 from ..models import Submission
 from ..types import SubmissionStatus
+from .fingerprint import FingerprintIndex, FingerprintKey, code_fingerprint, toolchain_version
 
 
 @dataclass
@@ -13,6 +22,7 @@ class AnalysisIssue:
     tool: str
     message: str
     severity: str = "info"
+    rule_id: str | None = None
 
 
 @dataclass
@@ -21,6 +31,48 @@ class ScoringResult:
     score: int | None = None
     feedback: str | None = None
     issues: list[AnalysisIssue] | None = None
+    rule_bundle_version: str | None = None
+    # Stage name -> milliseconds, in the order the stages ran.
+    timings: dict[str, float] = field(default_factory=dict)
+    # Set when the verdict may be remembered under, or was reused from, this key.
+    fingerprint: FingerprintKey | None = None
+    reused_from: str | None = None
+    # Analyzer and sandbox runs this verdict cost (or, when reused, saved).
+    analyzer_runs: int = 0
+
+
+def elapsed_ms(started: float) -> float:
+    """Milliseconds since a `time.perf_counter()` reading, rounded for storage."""
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def _toolchain(tool: object) -> str:
+    # Analyzers and sandboxes may describe what their output depends on.
+    describe = getattr(tool, "toolchain", None)
+    if describe is not None:
+        return describe()
+    return type(tool).__name__ if tool is not None else "none"
+
+
+# Location suffixes such as the sandbox's "(line 3)"; see `_without_locations`.
+_LOCATION = re.compile(r"\s*\(line \d+\)")
+
+
+def _without_locations(text: str | None) -> str | None:
+    # A reused verdict came from code whose lines may sit elsewhere.
+    return _LOCATION.sub("", text) if text else text
+
+
+_run_state = threading.local()
+
+
+def mark_unreliable() -> None:
+    """Flag the scoring run on this thread as hit by a timeout or tool failure.
+
+    Analyzers and sandboxes call this when they fall back to an empty or
+    failed answer, so the verdict is not stored in the fingerprint index.
+    """
+    _run_state.unreliable = True
 
 
 class StaticAnalyzer(Protocol):
@@ -33,6 +85,14 @@ class SandboxExecutor(Protocol):
         ...
 
 
+@dataclass(frozen=True)
+class RuleBundle:
+    """Immutable analyzer set plus a version identifying the rules it loads."""
+
+    version: str | None
+    analyzers: tuple[StaticAnalyzer, ...] = ()
+
+
 class ChallengeScoringService:
     """Orchestrates scoring for a submission using lightweight heuristics."""
 
@@ -40,39 +100,124 @@ class ChallengeScoringService:
         self,
         analyzers: Sequence[StaticAnalyzer] | None = None,
         sandbox: SandboxExecutor | None = None,
+        rule_bundle: RuleBundle | None = None,
+        fingerprints: FingerprintIndex | None = None,
     ) -> None:
-        self.analyzers = analyzers or []
+        self.rule_bundle = rule_bundle or RuleBundle(
+            version=None, analyzers=tuple(analyzers or ())
+        )
         self.sandbox = sandbox
+        self.fingerprints = fingerprints
+        # (bundle, sandbox, identities): tool lookups run once per bundle swap.
+        self._tools_cache: tuple[RuleBundle, object, tuple[str, ...]] | None = None
         self._heuristics: dict[str, Callable[[Submission], ScoringResult]] = {
             "sqli_001": self._score_sqli_001,
             "xss_001": self._score_xss_001,
             "command_injection_001": self._score_command_injection_001,
         }
 
+    @property
+    def analyzers(self) -> tuple[StaticAnalyzer, ...]:
+        return self.rule_bundle.analyzers
+
+    def swap_rule_bundle(self, bundle: RuleBundle) -> RuleBundle:
+        """Install `bundle` for subsequent scoring runs and return the previous one.
+
+        Runs already in progress keep the bundle they started with, so the
+        worker never has to drain.
+        """
+        previous, self.rule_bundle = self.rule_bundle, bundle
+        return previous
+
     def score(self, submission: Submission) -> ScoringResult:
-        issues: list[AnalysisIssue] = []
-        for analyzer in self.analyzers:
-            issues.extend(analyzer.analyze(submission))
+        bundle = self.rule_bundle
+        timings: dict[str, float] = {}
+        result = self._score(submission, bundle, timings)
+        result.rule_bundle_version = bundle.version
+        result.timings = timings
+        return result
 
+    def heuristic(self, submission: Submission) -> ScoringResult:
+        """Run only the challenge's in-process heuristic; `pending` when there is none."""
         heuristic = self._heuristics.get(submission.challenge_slug)
         if heuristic:
-            result = heuristic(submission)
-        else:
-            result = ScoringResult(
-                status=SubmissionStatus.pending,
-                feedback="No heuristic available for this challenge yet.",
-            )
+            return heuristic(submission)
+        return ScoringResult(
+            status=SubmissionStatus.pending,
+            feedback="No heuristic available for this challenge yet.",
+        )
+
+    def _score(
+        self,
+        submission: Submission,
+        bundle: RuleBundle,
+        timings: dict[str, float],
+    ) -> ScoringResult:
+        analyzers = bundle.analyzers
+        analyzer_runs = len(analyzers) + (1 if self.sandbox else 0)
+
+        # Heuristics read the raw text, so they run even when the rest is reused.
+        started = time.perf_counter()
+        result = self.heuristic(submission)
+        timings["heuristic"] = elapsed_ms(started)
+
+        key: FingerprintKey | None = None
+        if self.fingerprints is not None and result.status is not SubmissionStatus.pending:
+            started = time.perf_counter()
+            key = self._fingerprint_key(submission, bundle, result)
+            cached = self.fingerprints.lookup(key) if key else None
+            timings["fingerprint"] = elapsed_ms(started)
+            if key is None:
+                FINGERPRINT_LOOKUPS.labels("unparseable").inc()
+            elif cached is not None:
+                FINGERPRINT_LOOKUPS.labels("hit").inc()
+                ANALYZER_RUNS_SAVED.inc(analyzer_runs)
+                reused_issues = [
+                    AnalysisIssue(**{**issue, "message": _without_locations(issue["message"])})
+                    for issue in cached.issues
+                ]
+                return ScoringResult(
+                    status=SubmissionStatus(cached.status),
+                    score=cached.score,
+                    feedback=_without_locations(cached.feedback),
+                    issues=reused_issues or None,
+                    fingerprint=key,
+                    reused_from=cached.source_submission_id,
+                    analyzer_runs=analyzer_runs,
+                )
+            else:
+                FINGERPRINT_LOOKUPS.labels("miss").inc()
+
+        _run_state.unreliable = False
+        issues: list[AnalysisIssue] = []
+        for analyzer in analyzers:
+            name = getattr(analyzer, "name", type(analyzer).__name__)
+            started = time.perf_counter()
+            try:
+                issues.extend(analyzer.analyze(submission))
+            except Exception:
+                ANALYZER_RUNS.labels(name, "error").inc()
+                raise
+            finally:
+                ANALYZER_DURATION.labels(name).observe(time.perf_counter() - started)
+                timings[name] = elapsed_ms(started)
 
         sandbox_issue: AnalysisIssue | None = None
         if self.sandbox:
+            started = time.perf_counter()
             try:
                 sandbox_ok, sandbox_message = self.sandbox.run_tests(submission)
             except Exception as exc:
+                ANALYZER_RUNS.labels("sandbox", "error").inc()
                 return ScoringResult(
                     status=SubmissionStatus.error,
                     feedback=f"Sandbox execution failed: {exc}",
                     issues=[*issues, AnalysisIssue("sandbox", str(exc), "error")],
                 )
+            finally:
+                ANALYZER_DURATION.labels("sandbox").observe(time.perf_counter() - started)
+                timings["sandbox"] = elapsed_ms(started)
+            ANALYZER_RUNS.labels("sandbox", "passed" if sandbox_ok else "failed").inc()
 
             if not sandbox_ok:
                 sandbox_issue = AnalysisIssue(
@@ -110,8 +255,37 @@ class ChallengeScoringService:
                     else f"{prefix}{rendered}"
                 )
 
+        result.analyzer_runs = analyzer_runs
+        if key is not None and not getattr(_run_state, "unreliable", False):
+            result.fingerprint = key
         return result
 
+    def _fingerprint_key(
+        self, submission: Submission, bundle: RuleBundle, heuristic: ScoringResult
+    ) -> FingerprintKey | None:
+        digest = code_fingerprint(submission.code)
+        if digest is None:
+            return None
+        challenge = getattr(submission, "challenge", None)
+        return FingerprintKey(
+            challenge_slug=submission.challenge_slug,
+            toolchain_version=toolchain_version(
+                bundle.version,
+                getattr(challenge, "test_cases", None),
+                self._tools(bundle),
+            ),
+            fingerprint=digest,
+            heuristic=f"{heuristic.status.value}:{heuristic.score}",
+        )
+
+    def _tools(self, bundle: RuleBundle) -> tuple[str, ...]:
+        """Toolchain identities of `bundle` and the sandbox, cached until either changes."""
+        cached = self._tools_cache
+        if cached is None or cached[0] is not bundle or cached[1] is not self.sandbox:
+            tools = tuple(_toolchain(tool) for tool in (*bundle.analyzers, self.sandbox))
+            cached = self._tools_cache = (bundle, self.sandbox, tools)
+        return cached[2]
+
     # --- Heuristic scoring helpers -------------------------------------------------
 
     def _score_sqli_001(self, submission: Submission) -> ScoringResult:
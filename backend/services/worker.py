@@ -3,89 +3,194 @@ from __future__ import annotations
 import logging
 import queue
 import threading
-from typing import Optional
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Iterable, Optional
 
-from ..db import SessionLocal
+from sqlalchemy.orm import joinedload
+
+from ..db import ReadSessionLocal, SessionLocal
+from ..metrics import SCORING_DURATION, SCORING_ENQUEUED, SCORING_QUEUE_WAIT
 from ..models import Submission
 from ..types import SubmissionStatus
-from .scoring import AnalysisIssue, ChallengeScoringService
+from .result_writer import ResultWriter
+from .scoring import AnalysisIssue, ChallengeScoringService, elapsed_ms
 
 logger = logging.getLogger(__name__)
 
+_Entry = tuple[str, float, Optional[Callable[[], None]]]
+
 
 class ScoringWorker:
-    """Background worker that processes submission scoring asynchronously."""
+    """Background worker that processes submission scoring asynchronously.
+
+    `concurrency` threads score submissions in parallel. Status transitions and
+    results go through a `ResultWriter`, which group-commits them; a
+    submission only counts as processed once its result is durable, or once
+    `result_timeout_seconds` pass without the commit landing.
+    """
 
-    def __init__(self, scoring_service: ChallengeScoringService) -> None:
+    def __init__(
+        self,
+        scoring_service: ChallengeScoringService,
+        result_writer: ResultWriter | None = None,
+        concurrency: int = 1,
+        result_timeout_seconds: float = 30.0,
+    ) -> None:
         self.scoring_service = scoring_service
-        self._queue: queue.Queue[str | None] = queue.Queue()
+        self.result_writer = result_writer or ResultWriter(SessionLocal)
+        self.concurrency = max(concurrency, 1)
+        # How long a scoring thread waits for its result to commit.
+        self.result_timeout_seconds = result_timeout_seconds
+        # Entries carry their enqueue time so pickup can report queue wait, and
+        # an optional callback for whoever enqueued them.
+        self._queue: queue.Queue[_Entry | None] = queue.Queue()
         self._stop_event = threading.Event()
-        self._thread: Optional[threading.Thread] = None
+        self._threads: list[threading.Thread] = []
+        self._listeners: list[Callable[[str], None]] = []
 
     def start(self) -> None:
-        if self._thread and self._thread.is_alive():
+        if any(thread.is_alive() for thread in self._threads):
             return
         self._stop_event.clear()
-        self._thread = threading.Thread(target=self._run, daemon=True)
-        self._thread.start()
+        self.result_writer.start()
+        self._threads = [
+            threading.Thread(target=self._run, daemon=True, name=f"scoring-worker-{index}")
+            for index in range(self.concurrency)
+        ]
+        for thread in self._threads:
+            thread.start()
 
     def stop(self) -> None:
         self._stop_event.set()
-        self._queue.put(None)
-        if self._thread:
-            self._thread.join(timeout=5)
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+        self.result_writer.stop()
+
+    def enqueue(
+        self, submission_id: str, on_processed: Callable[[], None] | None = None
+    ) -> None:
+        """Queue one submission; `on_processed` runs once this entry is processed."""
+        self._queue.put((submission_id, time.perf_counter(), on_processed))
+        SCORING_ENQUEUED.inc()
+
+    def enqueue_many(self, submission_ids: Iterable[str]) -> None:
+        """Queue several submissions sharing one enqueue timestamp."""
+        ids = list(submission_ids)
+        enqueued_at = time.perf_counter()
+        for submission_id in ids:
+            # The queue is unbounded, so this never raises `queue.Full`.
+            self._queue.put_nowait((submission_id, enqueued_at, None))
+        if ids:
+            SCORING_ENQUEUED.inc(len(ids))
+
+    def add_listener(self, callback: Callable[[str], None]) -> None:
+        """Register a callback invoked with each submission id once it is processed."""
+        self._listeners = [*self._listeners, callback]
 
-    def enqueue(self, submission_id: str) -> None:
-        self._queue.put(submission_id)
+    def remove_listener(self, callback: Callable[[str], None]) -> None:
+        # Rebind rather than mutate: worker threads may be iterating the list.
+        self._listeners = [listener for listener in self._listeners if listener != callback]
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def alive_threads(self) -> int:
+        return sum(thread.is_alive() for thread in self._threads)
 
     def flush(self, timeout: float | None = None) -> None:
-        """Block until all queued tasks are processed."""
+        """Block until all queued tasks are processed and their results committed."""
         self._queue.join()
 
     def _run(self) -> None:
         while not self._stop_event.is_set():
-            submission_id = self._queue.get()
-            if submission_id is None:
+            entry = self._queue.get()
+            if entry is None:
                 self._queue.task_done()
                 break
+            submission_id, enqueued_at, on_processed = entry
+            started = time.perf_counter()
+            SCORING_QUEUE_WAIT.observe(started - enqueued_at)
+            outcome = "error"
             try:
-                self._process_submission(submission_id)
+                outcome = self._process_submission(submission_id, enqueued_at, started)
             except Exception as exc:
                 logger.exception("Failed to score submission %s: %s", submission_id, exc)
             finally:
+                SCORING_DURATION.labels(outcome).observe(time.perf_counter() - started)
+                if on_processed is not None:
+                    try:
+                        on_processed()
+                    except Exception:
+                        logger.exception("Completion callback failed for %s", submission_id)
+                self._notify_listeners(submission_id)
                 self._queue.task_done()
 
-    def _process_submission(self, submission_id: str) -> None:
-        with SessionLocal() as session:
-            submission = session.get(Submission, submission_id)
-            if not submission:
-                logger.warning("Submission %s missing; skipping scoring.", submission_id)
-                return
+    def _notify_listeners(self, submission_id: str) -> None:
+        for listener in self._listeners:
+            try:
+                listener(submission_id)
+            except Exception:
+                logger.exception("Worker listener failed for submission %s", submission_id)
 
-            submission.status = SubmissionStatus.running
-            session.add(submission)
-            session.commit()
-            session.refresh(submission)
+    def _process_submission(
+        self, submission_id: str, enqueued_at: float, picked_up_at: float
+    ) -> str:
+        """Score and persist one submission; return the status label for metrics."""
+        timings = {"queued": round((picked_up_at - enqueued_at) * 1000, 1)}
+        # Loading only needs a reader; all writes go through the result writer.
+        # The session is closed before scoring so no read transaction spans it.
+        with ReadSessionLocal() as session:
+            submission = session.get(
+                Submission, submission_id, options=[joinedload(Submission.challenge)]
+            )
+        if not submission:
+            logger.warning("Submission %s missing; skipping scoring.", submission_id)
+            return "missing"
+        challenge_slug = submission.challenge_slug
+        # Queued, not awaited: the result below is ordered after it.
+        self.result_writer.mark_running(submission_id)
+        timings["started"] = elapsed_ms(picked_up_at)
 
-            try:
-                result = self.scoring_service.score(submission)
-            except Exception as exc:
-                submission.status = SubmissionStatus.error
-                submission.feedback = f"Scoring failure: {exc}"
-                submission.score = None
-                submission.analysis_report = [
-                    {"tool": "scoring", "message": str(exc), "severity": "error"}
-                ]
-                session.add(submission)
-                session.commit()
-                return
-
-            submission.status = result.status
-            submission.score = result.score
-            submission.feedback = result.feedback
-            submission.analysis_report = [
-                {"tool": issue.tool, "message": issue.message, "severity": issue.severity}
-                for issue in result.issues or []
-            ]
-            session.add(submission)
-            session.commit()
+        try:
+            result = self.scoring_service.score(submission)
+        except Exception as exc:
+            status = SubmissionStatus.error
+            written = self.result_writer.write_result(
+                submission_id,
+                challenge_slug,
+                SubmissionStatus.error,
+                score=None,
+                feedback=f"Scoring failure: {exc}",
+                issues=[AnalysisIssue(tool="scoring", message=str(exc), severity="error")],
+                timings=timings,
+            )
+        else:
+            status = result.status
+            timings.update(result.timings)
+            written = self.result_writer.write_result(
+                submission_id,
+                challenge_slug,
+                result.status,
+                score=result.score,
+                feedback=result.feedback,
+                issues=result.issues or [],
+                rule_bundle_version=result.rule_bundle_version,
+                timings=timings,
+                fingerprint=result.fingerprint,
+                fingerprint_hit=result.reused_from is not None,
+                analyzer_runs=result.analyzer_runs,
+            )
+        try:
+            written.result(timeout=self.result_timeout_seconds)
+        except FutureTimeoutError:
+            logger.error(
+                "Result for submission %s not committed within %ss",
+                submission_id,
+                self.result_timeout_seconds,
+            )
+            return "error"
+        return status.value
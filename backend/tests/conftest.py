@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import importlib
+import os
+
 import pytest
+import sqlalchemy as sa
 from fastapi.testclient import TestClient
 import warnings
 
@@ -12,12 +15,33 @@ warnings.filterwarnings(
 )
 
 
+def _reset_database(database_url: str) -> None:
+    """Drop every table (and enum type) so migrations start from scratch."""
+    engine = sa.create_engine(database_url)
+    with engine.begin() as connection:
+        metadata = sa.MetaData()
+        metadata.reflect(bind=connection)
+        metadata.drop_all(bind=connection)
+        if connection.dialect.name == "postgresql":
+            connection.exec_driver_sql("DROP TYPE IF EXISTS submissionstatus")
+    engine.dispose()
+
+
 @pytest.fixture()
 def client(tmp_path, monkeypatch) -> TestClient:
-    db_path = tmp_path / "test.db"
-    monkeypatch.setenv("VULNLABS_DATABASE_URL", f"sqlite:///{db_path}")
+    # Point VULNLABS_TEST_DATABASE_URL at a disposable PostgreSQL database
+    # (e.g. postgresql+psycopg://localhost/vulnlabs_test) to run against it.
+    database_url = os.environ.get("VULNLABS_TEST_DATABASE_URL")
+    if database_url:
+        _reset_database(database_url)
+    else:
+        database_url = f"sqlite:///{tmp_path / 'test.db'}"
+    monkeypatch.setenv("VULNLABS_DATABASE_URL", database_url)
     monkeypatch.setenv("VULNLABS_LOG_LEVEL", "CRITICAL")
     monkeypatch.setenv("VULNLABS_API_KEY", "test-key")
+    monkeypatch.setenv("VULNLABS_ADMIN_API_KEY", "test-admin-key")
+    monkeypatch.setenv("VULNLABS_ARCHIVE_ROOT", str(tmp_path / "archive"))
+    monkeypatch.setenv("VULNLABS_PROFILE_OUTPUT_DIR", str(tmp_path / "profiles"))
 
     from backend import config
 
@@ -34,10 +58,18 @@ def client(tmp_path, monkeypatch) -> TestClient:
 
     # Ensure sandbox/worker modules pick up the reloaded settings.
     sys.modules.pop("backend.services.worker", None)
+    sys.modules.pop("backend.services.result_writer", None)
     sys.modules.pop("backend.services.sandbox", None)
+    sys.modules.pop("backend.services.catalog", None)
+    sys.modules.pop("backend.services.jobs", None)
+    sys.modules.pop("backend.services.archive", None)
+    sys.modules.pop("backend.services.reload", None)
+    sys.modules.pop("backend.services.profiling", None)
+    sys.modules.pop("backend.services.readiness", None)
+    sys.modules.pop("backend.services.fingerprint", None)
+    sys.modules.pop("backend.services.preview", None)
 
     settings = config.get_settings()
-    db_init.init_db(settings)
 
     import backend.app as app_module
     importlib.reload(app_module)
@@ -47,3 +79,5 @@ def client(tmp_path, monkeypatch) -> TestClient:
     with TestClient(app) as test_client:
         test_client.headers.update({"X-API-Key": "test-key"})
         yield test_client
+
+    db_module.dispose_engines()
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+ADMIN_HEADERS = {"X-Admin-Key": "test-admin-key"}
+
+
 def test_create_submission_requires_api_key(client):
     submission_payload = {
         "challenge_slug": "sqli_001",
@@ -14,6 +17,23 @@ def test_create_submission_requires_api_key(client):
     )
     assert response.status_code == 401
 
+
+def test_admin_endpoints_require_the_admin_key(client):
+    import backend.app as app_module
+    from backend.config import get_settings
+    from fastapi.testclient import TestClient
+
+    # The regular API key, which the frontend ships, is not enough.
+    assert client.post("/admin/reload").status_code == 403
+    assert client.post("/admin/reload", headers={"X-Admin-Key": "wrong"}).status_code == 403
+    assert client.post("/admin/reload", headers=ADMIN_HEADERS).status_code == 200
+
+    settings = get_settings().model_copy(update={"admin_api_key": None})
+    unconfigured = TestClient(app_module.create_app(settings))
+    response = unconfigured.post("/admin/reload", headers=ADMIN_HEADERS)
+    assert response.status_code == 404
+
+
 def test_list_challenges(client):
     response = client.get("/challenges")
     assert response.status_code == 200
@@ -22,6 +42,115 @@ def test_list_challenges(client):
     assert any(item["slug"] == "sqli_001" for item in payload)
 
 
+def test_challenge_catalog_conditional_get(client):
+    response = client.get("/challenges/sqli_001")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"]
+    assert response.json()["slug"] == "sqli_001"
+
+    cached = client.get("/challenges/sqli_001", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+    listing = client.get("/challenges")
+    assert listing.headers["etag"] != etag
+    stale = client.get("/challenges", headers={"If-None-Match": etag})
+    assert stale.status_code == 200
+
+    missing = client.get("/challenges/does_not_exist")
+    assert missing.status_code == 404
+
+
+def test_challenge_catalog_refreshes_after_reseed(client, tmp_path):
+    import json
+
+    from backend import db_init
+
+    etag = client.get("/challenges").headers["etag"]
+
+    bank = tmp_path / "bank"
+    bank.mkdir()
+    (bank / "extra.json").write_text(
+        json.dumps(
+            {
+                "id": "extra_001",
+                "title": "Extra",
+                "category": "misc",
+                "language": "python",
+                "description": "Added after startup.",
+                "vulnerable_snippet": "pass",
+            }
+        ),
+        encoding="utf-8",
+    )
+    db_init.seed_challenges(bank)
+
+    response = client.get("/challenges", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert any(item["slug"] == "extra_001" for item in response.json())
+
+
+def test_seed_challenges_only_parses_changed_files(client, tmp_path):
+    import json
+    import os
+
+    from backend import db_init
+
+    bank = tmp_path / "bank"
+    (bank / "python").mkdir(parents=True)
+    path = bank / "python" / "manifest.json"
+    challenge = {
+        "id": "manifest_001",
+        "title": "Manifest",
+        "category": "misc",
+        "language": "python",
+        "description": "Seeded once.",
+        "vulnerable_snippet": "pass",
+    }
+    path.write_text(json.dumps(challenge), encoding="utf-8")
+
+    assert db_init.seed_challenges(bank) == 1
+    generation = db_init.seed_generation()
+    assert db_init.seed_challenges(bank) == 0
+    assert db_init.seed_generation() == generation
+
+    # Touched without a content change: rehashed, not reseeded.
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert db_init.seed_challenges(bank) == 0
+
+    challenge["title"] = "Manifest v2"
+    path.write_text(json.dumps(challenge), encoding="utf-8")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+    assert db_init.seed_challenges(bank) == 1
+    assert db_init.seed_generation() == generation + 1
+    assert client.get("/challenges/manifest_001").json()["title"] == "Manifest v2"
+
+
+def test_catalog_picks_up_reseed_from_another_process(client):
+    from datetime import datetime
+
+    from backend.db import ReadSessionLocal, SessionLocal
+    from backend.models import Challenge
+    from backend.services.catalog import ChallengeCatalog
+
+    catalog = ChallengeCatalog(ReadSessionLocal, refresh_seconds=0)
+    before = catalog.snapshot()
+    assert catalog.snapshot() is before
+
+    # Written directly, as another process's seeder would: no local generation bump.
+    with SessionLocal() as session:
+        challenge = session.get(Challenge, "sqli_001")
+        challenge.title = "Reseeded elsewhere"
+        challenge.updated_at = datetime.utcnow()
+        session.commit()
+
+    after = catalog.snapshot()
+    assert after is not before
+    assert b"Reseeded elsewhere" in after.challenges["sqli_001"].body
+
+
 def test_create_submission(client):
     submission_payload = {
         "challenge_slug": "sqli_001",
@@ -35,6 +164,7 @@ def test_create_submission(client):
     data = response.json()
     assert data["challenge_slug"] == submission_payload["challenge_slug"]
     assert data["status"] == "pending"
+    assert data["issues"] is None
     client.app.state.scoring_worker.flush()
 
     fetched = client.get(f"/submissions/{data['id']}").json()
@@ -131,6 +261,29 @@ def login(session, username, password):
     assert secure_resp["status"] in status_counts
 
 
+
+def test_database_endpoints_do_not_block_the_event_loop(client):
+    import inspect
+
+    from fastapi.routing import APIRoute
+
+    async_routes = {
+        route.path
+        for route in client.app.routes
+        if isinstance(route, APIRoute) and inspect.iscoroutinefunction(route.endpoint)
+    }
+    for path in (
+        "/challenges",
+        "/challenges/{slug}",
+        "/submissions",
+        "/submissions/{submission_id}",
+        "/stats/submissions",
+        "/stats/findings/rules",
+        "/stats/findings/severity",
+        "/stats/fingerprints",
+    ):
+        assert path not in async_routes
+
 def test_submission_pagination(client):
     for idx in range(5):
         payload = {
@@ -176,3 +329,580 @@ def test_sandbox_flags_dangerous_calls(client):
     assert refreshed["status"] == "failed"
     sandbox_issues = [i for i in refreshed["issues"] if i["tool"] == "sandbox"]
     assert sandbox_issues, "Expected sandbox to report an issue"
+
+
+def test_large_responses_are_compressed(client):
+    for idx in range(5):
+        payload = {
+            "challenge_slug": "sqli_001",
+            "code": f"print('entry {idx}')\n" + "# padding\n" * 40,
+            "user_handle": f"gzip{idx}",
+        }
+        assert client.post("/submissions", json=payload).status_code == 201
+    client.app.state.scoring_worker.flush()
+
+    compressed = client.get("/submissions", headers={"Accept-Encoding": "gzip"})
+    assert compressed.status_code == 200
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in compressed.headers["vary"].lower()
+    assert len(compressed.json()) == 5
+
+    plain = client.get("/submissions", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert int(plain.headers["content-length"]) > int(
+        compressed.headers["content-length"]
+    )
+
+    small = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert "accept-encoding" in small.headers["vary"].lower()
+    assert "accept-encoding" in plain.headers["vary"].lower()
+
+
+def test_create_submission_batch(client):
+    payload = {
+        "submissions": [
+            {"challenge_slug": "sqli_001", "code": "print('a')", "user_handle": "class1"},
+            {"challenge_slug": "xss_001", "code": "print('b')", "user_handle": "class2"},
+            {"challenge_slug": "sqli_001", "code": "print('c')"},
+        ]
+    }
+    response = client.post("/submissions/batch", json=payload)
+    assert response.status_code == 201
+    ids = response.json()["ids"]
+    assert len(ids) == 3 and len(set(ids)) == 3
+
+    client.app.state.scoring_worker.flush()
+    for submission_id in ids:
+        fetched = client.get(f"/submissions/{submission_id}").json()
+        assert fetched["status"] in {"pending", "failed", "passed"}
+        assert isinstance(fetched["issues"], list)
+
+    unknown = client.post(
+        "/submissions/batch",
+        json={"submissions": [{"challenge_slug": "nope_001", "code": "print('x')"}]},
+    )
+    assert unknown.status_code == 404
+    assert client.post("/submissions/batch", json={"submissions": []}).status_code == 422
+
+
+def test_export_submissions_ndjson(client):
+    import gzip
+    import json
+
+    for idx, slug in enumerate(["sqli_001", "sqli_001", "xss_001"]):
+        payload = {"challenge_slug": slug, "code": f"print({idx})", "user_handle": "exporter"}
+        assert client.post("/submissions", json=payload).status_code == 201
+    client.app.state.scoring_worker.flush()
+
+    response = client.get("/submissions/export", params={"challenge_slug": "sqli_001"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 2
+    assert all(row["challenge_slug"] == "sqli_001" for row in rows)
+    assert all(isinstance(row["issues"], list) for row in rows)
+    assert all(row["timings"] is None for row in rows)
+
+    timed = client.get(
+        "/submissions/export", params={"challenge_slug": "sqli_001", "include_timings": True}
+    )
+    timed_rows = [json.loads(line) for line in timed.text.splitlines()]
+    assert all({"queued", "started"} <= set(row["timings"]) for row in timed_rows)
+
+    future = client.get("/submissions/export", params={"since": "2999-01-01T00:00:00"})
+    assert future.text == ""
+
+    with client.stream(
+        "GET", "/submissions/export", params={"gzip": "true"}
+    ) as compressed:
+        assert compressed.headers["content-encoding"] == "gzip"
+        raw = b"".join(compressed.iter_raw())
+    assert len(gzip.decompress(raw).splitlines()) == 3
+
+
+def test_rescore_challenge_job_reports_progress(client):
+    import time
+
+    for idx in range(3):
+        payload = {"challenge_slug": "xss_001", "code": f"print({idx})", "user_handle": "bulk"}
+        assert client.post("/submissions", json=payload).status_code == 201
+    client.app.state.scoring_worker.flush()
+
+    response = client.post("/challenges/xss_001/rescore")
+    assert response.status_code == 202
+    job = response.json()
+    assert job["total"] == 3
+    assert job["challenge_slug"] == "xss_001"
+
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job['id']}").json()
+        if job["status"] == "completed":
+            break
+        time.sleep(0.05)
+    assert job["status"] == "completed"
+    assert job["completed"] == job["enqueued"] == 3
+    assert job["throughput_per_second"] is not None
+
+    assert client.post("/challenges/unknown/rescore").status_code == 404
+    assert client.get("/jobs/missing").status_code == 404
+
+
+def test_rescore_challenge_skips_running_submissions(client):
+    from sqlalchemy import update
+
+    from backend.db import SessionLocal
+    from backend.models import Submission
+
+    ids = [
+        client.post(
+            "/submissions", json={"challenge_slug": "xss_001", "code": f"print({idx})"}
+        ).json()["id"]
+        for idx in range(2)
+    ]
+    client.app.state.scoring_worker.flush()
+    with SessionLocal() as session:
+        session.execute(update(Submission).where(Submission.id == ids[0]).values(status="running"))
+        session.commit()
+
+    job = client.post("/challenges/xss_001/rescore").json()
+
+    assert job["total"] == 1
+    assert client.get(f"/submissions/{ids[0]}").json()["status"] == "running"
+
+
+def test_idempotency_key_replays_original_submission(client):
+    payload = {"challenge_slug": "sqli_001", "code": "print('retry')", "user_handle": "flaky"}
+    headers = {"Idempotency-Key": "retry-123"}
+
+    first = client.post("/submissions", json=payload, headers=headers)
+    assert first.status_code == 201
+    client.app.state.scoring_worker.flush()
+
+    replay = client.post("/submissions", json=payload, headers=headers)
+    assert replay.status_code == 200
+    assert replay.headers["idempotent-replayed"] == "true"
+    assert replay.json()["id"] == first.json()["id"]
+
+    conflicting = client.post(
+        "/submissions", json={**payload, "code": "print('other')"}, headers=headers
+    )
+    assert conflicting.status_code == 422
+
+    # Keys are scoped per caller: another user reusing the key gets their own submission.
+    other_user = client.post(
+        "/submissions", json={**payload, "user_handle": "someone"}, headers=headers
+    )
+    assert other_user.status_code == 201
+    assert other_user.json()["id"] != first.json()["id"]
+    client.app.state.scoring_worker.flush()
+
+
+def test_inflight_duplicates_attach_to_running_submission(client):
+    worker = client.app.state.scoring_worker
+    worker.stop()
+    try:
+        payload = {"challenge_slug": "xss_001", "code": "print('dup')", "user_handle": "twice"}
+        first = client.post("/submissions", json=payload)
+        second = client.post("/submissions", json=payload)
+        assert first.status_code == 201
+        assert second.status_code == 200
+        assert second.json()["id"] == first.json()["id"]
+
+        other_user = client.post("/submissions", json={**payload, "user_handle": "someone"})
+        assert other_user.status_code == 201
+        assert other_user.json()["id"] != first.json()["id"]
+    finally:
+        worker.start()
+        worker.flush()
+
+
+def test_create_submission_rate_limited_per_user(client):
+    from backend.ratelimit import RateLimit
+
+    client.app.state.rate_limiter.limits["user"]["create_submission"] = RateLimit.parse(
+        "2/minute"
+    )
+    for idx in range(2):
+        payload = {"challenge_slug": "sqli_001", "code": f"print({idx})", "user_handle": "spammer"}
+        response = client.post("/submissions", json=payload)
+        assert response.status_code == 201
+        assert response.headers["ratelimit-limit"] == "2"
+
+    blocked = client.post(
+        "/submissions",
+        json={"challenge_slug": "sqli_001", "code": "print(3)", "user_handle": "spammer"},
+    )
+    assert blocked.status_code == 429
+    assert int(blocked.headers["retry-after"]) >= 1
+    assert blocked.headers["ratelimit-remaining"] == "0"
+
+    other = client.post(
+        "/submissions",
+        json={"challenge_slug": "sqli_001", "code": "print(3)", "user_handle": "patient"},
+    )
+    assert other.status_code == 201
+    client.app.state.scoring_worker.flush()
+
+
+
+def test_shared_api_key_is_rate_limited_per_client_address(client):
+    from fastapi.testclient import TestClient
+
+    from backend.ratelimit import RateLimit
+
+    client.app.state.rate_limiter.limits["api_key"]["create_submission"] = RateLimit.parse(
+        "1/minute"
+    )
+
+    def from_address(host):
+        async def app(scope, receive, send):
+            if scope["type"] == "http":
+                scope = {**scope, "client": (host, 50000)}
+            await client.app(scope, receive, send)
+
+        return TestClient(app, headers={"X-API-Key": "test-key"})
+
+    payload = {"challenge_slug": "sqli_001", "code": "print(1)"}
+    first, second = from_address("203.0.113.1"), from_address("203.0.113.2")
+    assert first.post("/submissions", json=payload).status_code == 201
+    assert first.post("/submissions", json=payload).status_code == 429
+    assert second.post("/submissions", json=payload).status_code == 201
+    client.app.state.scoring_worker.flush()
+
+def test_batch_larger_than_rate_limit_capacity_is_rejected(client):
+    from backend.ratelimit import RateLimit
+
+    client.app.state.rate_limiter.limits["api_key"]["create_submission_batch"] = RateLimit.parse(
+        "2/minute"
+    )
+    item = {"challenge_slug": "sqli_001", "code": "print(1)"}
+    response = client.post("/submissions/batch", json={"submissions": [item] * 3})
+
+    assert response.status_code == 413
+    assert "retry-after" not in response.headers
+    assert "allows 2" in response.json()["detail"]
+
+
+def test_findings_aggregates(client):
+    payloads = [
+        {"challenge_slug": "command_injection_001", "code": "import os\nos.system('ls')"},
+        {"challenge_slug": "command_injection_001", "code": "import os\nos.system('pwd')"},
+        {"challenge_slug": "xss_001", "code": "print('hi')"},
+    ]
+    ids = [client.post("/submissions", json=payload).json()["id"] for payload in payloads]
+    client.app.state.scoring_worker.flush()
+
+    issues = client.get(f"/submissions/{ids[0]}").json()["issues"]
+    assert any(issue["tool"] == "sandbox" for issue in issues)
+    assert all("rule_id" in issue for issue in issues)
+
+    rules = client.get(
+        "/stats/findings/rules", params={"challenge_slug": "command_injection_001"}
+    )
+    assert rules.status_code == 200
+    sandbox = next(row for row in rules.json() if row["tool"] == "sandbox")
+    assert sandbox["findings"] == 2
+    assert sandbox["submissions"] == 2
+
+    severity = client.get("/stats/findings/severity").json()
+    slugs = {row["challenge_slug"] for row in severity}
+    assert {"command_injection_001", "xss_001"} <= slugs
+
+    rescored = client.post(f"/submissions/{ids[0]}/rescore").json()
+    assert rescored["issues"] is None
+    client.app.state.scoring_worker.flush()
+
+
+def test_submission_code_is_stored_once_per_hash(client):
+    from sqlalchemy import select
+
+    from backend.db import SessionLocal
+    from backend.models import CodeBlob
+
+    large_code = "from markupsafe import escape\n" + "print(escape('x'))\n" * 200
+    first = client.post(
+        "/submissions",
+        json={"challenge_slug": "xss_001", "code": large_code, "user_handle": "a"},
+    ).json()
+    client.post(
+        "/submissions/batch",
+        json={
+            "submissions": [
+                {"challenge_slug": "xss_001", "code": large_code, "user_handle": "b"},
+                {"challenge_slug": "sqli_001", "code": large_code, "user_handle": "c"},
+            ]
+        },
+    )
+    client.app.state.scoring_worker.flush()
+
+    with SessionLocal() as session:
+        blobs = session.scalars(
+            select(CodeBlob).where(CodeBlob.hash == first["code_hash"])
+        ).all()
+    assert len(blobs) == 1
+    assert blobs[0].compression == "zlib"
+    assert blobs[0].size == len(large_code.encode())
+    assert len(blobs[0].data) < blobs[0].size
+
+    fetched = client.get(f"/submissions/{first['id']}").json()
+    assert fetched["code"] == large_code
+
+
+def test_submission_code_is_stored_from_any_session(client):
+    from sqlalchemy.orm import sessionmaker
+
+    from backend.db import engine
+    from backend.models import Submission
+
+    # Not SessionLocal: the blob hook must fire for every session.
+    with sessionmaker(bind=engine)() as session:
+        submission = Submission(challenge_slug="sqli_001", code="print('elsewhere')")
+        session.add(submission)
+        session.commit()
+        submission_id = submission.id
+
+    assert client.get(f"/submissions/{submission_id}").json()["code"] == "print('elsewhere')"
+
+
+def test_archive_compacts_old_submissions(client, tmp_path):
+    from datetime import datetime, timedelta
+
+    from sqlalchemy import select, update
+
+    from backend.db import SessionLocal
+    from backend.models import CodeBlob, Submission
+
+    ids = []
+    for index in range(3):
+        resp = client.post(
+            "/submissions",
+            json={
+                "challenge_slug": "command_injection_001",
+                "code": f"import os\nos.system('ls {index}')",
+                "user_handle": f"archiver{index}",
+            },
+        )
+        ids.append(resp.json()["id"])
+    client.app.state.scoring_worker.flush()
+
+    before = {
+        "stats": client.get("/stats/submissions").json(),
+        "rules": client.get("/stats/findings/rules").json(),
+        "severity": client.get("/stats/findings/severity").json(),
+        "detail": [client.get(f"/submissions/{item}").json() for item in ids],
+    }
+
+    old = datetime.utcnow() - timedelta(days=90)
+    with SessionLocal() as session:
+        session.execute(
+            update(Submission).where(Submission.id.in_(ids[:2])).values(created_at=old)
+        )
+        session.commit()
+    # The first run needs an explicit window; none is configured by default.
+    assert client.post("/admin/archive", headers=ADMIN_HEADERS).status_code == 400
+
+    first = client.post("/admin/archive", params={"older_than_days": 30}, headers=ADMIN_HEADERS).json()
+    assert first["archived"] == 2
+    assert first["segments"] == [f"{old:%Y-%m}.ndjson.gz"]
+
+    with SessionLocal() as session:
+        session.execute(
+            update(Submission).where(Submission.id == ids[2]).values(created_at=old)
+        )
+        session.commit()
+    second = client.post("/admin/archive", params={"older_than_days": 30}, headers=ADMIN_HEADERS).json()
+    assert second["archived"] == 1
+    assert (tmp_path / "archive" / first["segments"][0]).is_file()
+
+    listed = {row["id"] for row in client.get("/submissions").json()}
+    assert not listed & set(ids)
+    for submission_id, detail in zip(ids, before["detail"]):
+        archived = client.get(f"/submissions/{submission_id}").json()
+        assert archived["code"] == detail["code"]
+        assert archived["issues"] == detail["issues"]
+        assert archived["status"] == detail["status"]
+    assert client.get("/submissions/missing").status_code == 404
+
+    assert client.get("/stats/submissions").json() == before["stats"]
+    assert client.get("/stats/findings/rules").json() == before["rules"]
+    assert client.get("/stats/findings/severity").json() == before["severity"]
+
+    with SessionLocal() as session:
+        assert session.get(Submission, ids[0]) is None
+        hashes = {detail["code_hash"] for detail in before["detail"]}
+        assert not session.scalars(select(CodeBlob).where(CodeBlob.hash.in_(hashes))).all()
+
+
+def test_archive_runs_on_a_schedule(client, tmp_path):
+    import time
+    from datetime import datetime, timedelta
+
+    from sqlalchemy import update
+
+    from backend.db import SessionLocal
+    from backend.models import Submission
+    from backend.services.archive import SubmissionArchive
+
+    created = client.post(
+        "/submissions", json={"challenge_slug": "xss_001", "code": "print('old')"}
+    ).json()
+    client.app.state.scoring_worker.flush()
+    with SessionLocal() as session:
+        session.execute(
+            update(Submission)
+            .where(Submission.id == created["id"])
+            .values(created_at=datetime.utcnow() - timedelta(days=90))
+        )
+        session.commit()
+
+    archive = SubmissionArchive(
+        tmp_path / "scheduled", SessionLocal, retention_days=30, interval_seconds=0.05
+    )
+    archive.start()
+    try:
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            with SessionLocal() as session:
+                if session.get(Submission, created["id"]) is None:
+                    break
+            time.sleep(0.05)
+    finally:
+        archive.stop()
+
+    with SessionLocal() as session:
+        assert session.get(Submission, created["id"]) is None
+
+
+def test_hot_reload_swaps_rules_and_challenges(client, tmp_path):
+    import json
+    import time
+
+    from backend.services.reload import HotReloader
+
+    service = client.app.state.scoring_service
+    version = service.rule_bundle.version
+    assert version
+    reloaded = client.post("/admin/reload", headers=ADMIN_HEADERS).json()
+    assert reloaded == {"challenges": 0, "rule_bundle_version": version, "rules_changed": False}
+
+    rules = tmp_path / "semgrep" / "python"
+    rules.mkdir(parents=True)
+    bank = tmp_path / "bank"
+    bank.mkdir()
+    settings = client.app.state.reloader.settings.model_copy(
+        update={"semgrep_rules_root": tmp_path / "semgrep", "challenge_root": bank}
+    )
+    reloader = HotReloader(settings, service, poll_interval_seconds=0.05)
+    reloader.start()
+    try:
+        (rules / "extra.yaml").write_text("rules: []\n", encoding="utf-8")
+        (bank / "hot.json").write_text(
+            json.dumps(
+                {
+                    "id": "hot_001",
+                    "title": "Hot",
+                    "category": "misc",
+                    "language": "python",
+                    "description": "Picked up without a restart.",
+                    "vulnerable_snippet": "pass",
+                }
+            ),
+            encoding="utf-8",
+        )
+        deadline = time.monotonic() + 5
+        while service.rule_bundle.version == version and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        reloader.stop()
+
+    new_version = service.rule_bundle.version
+    assert new_version != version
+    assert client.get("/challenges/hot_001").status_code == 200
+
+    created = client.post(
+        "/submissions", json={"challenge_slug": "sqli_001", "code": "print('reloaded')"}
+    ).json()
+    client.app.state.scoring_worker.flush()
+    scored = client.get(f"/submissions/{created['id']}").json()
+    assert scored["rule_bundle_version"] == new_version
+
+
+def test_submission_timings_returned_on_request(client):
+    created = client.post(
+        "/submissions",
+        json={"challenge_slug": "sqli_001", "code": "print('fixed')", "user_handle": "timer"},
+    ).json()
+    client.app.state.scoring_worker.flush()
+
+    assert client.get(f"/submissions/{created['id']}").json()["timings"] is None
+
+    timings = client.get(
+        f"/submissions/{created['id']}", params={"include_timings": True}
+    ).json()["timings"]
+    assert list(timings)[:2] == ["queued", "started"]
+    assert {"heuristic", "sandbox", "persisted"} <= set(timings)
+    assert all(value >= 0 for value in timings.values())
+
+    listed = client.get("/submissions", params={"include_timings": True}).json()
+    assert next(item for item in listed if item["id"] == created["id"])["timings"] == timings
+
+    client.post(f"/submissions/{created['id']}/rescore")
+    client.app.state.scoring_worker.flush()
+    rescored = client.get(
+        f"/submissions/{created['id']}", params={"include_timings": True}
+    ).json()["timings"]
+    assert rescored is not None
+
+
+def test_profile_worker_for_n_jobs(client):
+    headers = {"X-API-Key": "test-key", **ADMIN_HEADERS}
+    started = client.post(
+        "/admin/profiles",
+        json={"target": "worker", "max_jobs": 2, "duration_seconds": 30, "format": "collapsed"},
+        headers=headers,
+    )
+    assert started.status_code == 201
+    profile_id = started.json()["id"]
+    busy = client.post("/admin/profiles", json={"target": "worker"}, headers=headers)
+    assert busy.status_code == 409
+
+    for index in range(2):
+        client.post(
+            "/submissions",
+            json={"challenge_slug": "sqli_001", "code": f"x = {index}", "user_handle": "prof"},
+            headers=headers,
+        )
+    client.app.state.scoring_worker.flush()
+    client.app.state.profiler.stop(profile_id)
+
+    profile = client.get(f"/admin/profiles/{profile_id}", headers=headers).json()
+    assert profile["status"] == "completed"
+    assert profile["jobs"] == 2
+    assert profile["path"].endswith(".collapsed.txt")
+
+    unknown = client.post(
+        "/admin/profiles",
+        json={"target": "routes", "routes": ["/nope"]},
+        headers=headers,
+    )
+    assert unknown.status_code == 400
+
+
+def test_ready_reports_cached_checks(client):
+    response = client.get("/ready")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ready"] is True
+    checks = {check["name"]: check for check in body["checks"]}
+    assert checks["worker"]["ok"] and checks["database"]["ok"]
+    assert checks["analyzer:sandbox"]["ok"]
+    # Analyzers are optional unless listed in VULNLABS_READY_REQUIRED_ANALYZERS.
+    assert checks["analyzer:bandit"]["required"] is False
+
+    client.app.state.scoring_worker.stop()
+    client.app.state.readiness.refresh()
+    stopped = client.get("/ready")
+    assert stopped.status_code == 503
+    assert stopped.json()["ready"] is False
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import pytest
+import sqlalchemy as sa
+
+
+def test_sqlite_profile_uses_wal_and_read_only_readers(client):
+    from backend import db
+
+    if not db.use_sqlite_profile:
+        pytest.skip("tuned SQLite profile not active for this database")
+
+    with db.engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+
+    with db.read_engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA query_only").scalar() == 1
+        with pytest.raises(sa.exc.OperationalError):
+            connection.exec_driver_sql("DELETE FROM challenges")
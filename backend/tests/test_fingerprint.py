@@ -0,0 +1,148 @@
+from backend.services.fingerprint import code_fingerprint, toolchain_version
+
+FIX = (
+    "import html\n"
+    'nickname = html.escape(request.args.get("nickname", ""))\n'
+    'return HTMLResponse(f"<h2>Welcome, {nickname}</h2>")\n'
+)
+
+
+def test_fingerprint_ignores_formatting_comments_and_local_names():
+    reformatted = (
+        "import html\n\n"
+        "# escape before rendering\n"
+        "name   =   html.escape( request.args.get('nickname', '') )\n"
+        "return HTMLResponse(f'<h2>Welcome, {name}</h2>')  # done\n"
+    )
+
+    assert code_fingerprint(FIX) == code_fingerprint(reformatted)
+
+
+def test_fingerprint_keeps_imports_free_names_and_structure():
+    assert code_fingerprint(FIX) != code_fingerprint(FIX.replace("html.escape", "html.unescape"))
+    assert code_fingerprint(FIX) != code_fingerprint(FIX.replace("request.args", "request.form"))
+    assert code_fingerprint(FIX) != code_fingerprint(
+        FIX.replace("import html", "import html as markup").replace("html.escape", "markup.escape")
+    )
+    assert code_fingerprint("def broken(:\n    pass") is None
+
+
+def test_fingerprint_renames_global_and_nonlocal_declarations():
+    declared = (
+        "counter = 0\n"
+        "def bump():\n"
+        "    global counter\n"
+        "    counter += 1\n"
+        "def outer():\n"
+        "    seen = []\n"
+        "    def inner():\n"
+        "        nonlocal seen\n"
+        "        seen = seen + [1]\n"
+        "    return inner\n"
+    )
+    renamed = declared.replace("counter", "total").replace("seen", "visited")
+
+    assert code_fingerprint(declared) == code_fingerprint(renamed)
+
+
+def test_toolchain_version_tracks_analyzer_availability_and_sandbox_driver(
+    monkeypatch, tmp_path
+):
+    from backend.services.analyzers import BanditAnalyzer
+    from backend.services.sandbox import DockerSandboxExecutor, LocalSandboxExecutor
+
+    bandit = BanditAnalyzer(binary="bandit")
+    local = LocalSandboxExecutor().toolchain()
+    monkeypatch.setattr("shutil.which", lambda binary: None)
+    missing = toolchain_version("rules-v1", [], [bandit.toolchain(), local])
+
+    installed_path = tmp_path / "bandit"
+    installed_path.write_text("")
+    monkeypatch.setattr("shutil.which", lambda binary: str(installed_path))
+    installed = toolchain_version("rules-v1", [], [bandit.toolchain(), local])
+    docker = toolchain_version(
+        "rules-v1", [], [bandit.toolchain(), DockerSandboxExecutor().toolchain()]
+    )
+
+    assert missing != installed
+    assert docker != installed
+
+
+def test_equivalent_resubmission_reuses_verdict(client):
+    first = client.post(
+        "/submissions", json={"challenge_slug": "xss_001", "code": FIX, "user_handle": "fp"}
+    ).json()
+    client.app.state.scoring_worker.flush()
+    renamed = FIX.replace("nickname =", "# escaped\nshown =").replace("{nickname}", "{shown}")
+    second = client.post(
+        "/submissions", json={"challenge_slug": "xss_001", "code": renamed, "user_handle": "fp"}
+    ).json()
+    client.app.state.scoring_worker.flush()
+
+    original = client.get(f"/submissions/{first['id']}").json()
+    reused = client.get(f"/submissions/{second['id']}", params={"include_timings": True}).json()
+    assert reused["status"] == original["status"] == "passed"
+    assert reused["feedback"] == original["feedback"]
+    assert reused["issues"] == original["issues"]
+    assert "fingerprint" in reused["timings"]
+    assert "sandbox" not in reused["timings"]
+
+    stats = client.get("/stats/fingerprints", params={"challenge_slug": "xss_001"}).json()
+    runs = len(client.app.state.scoring_service.analyzers) + 1
+    assert stats["enabled"] is True
+    assert stats["entries"] == 1
+    assert stats["hits"] == 1
+    assert stats["analyzer_runs_saved"] == runs
+
+
+def test_heuristic_disagreement_is_not_reused(client):
+    vulnerable = 'return HTMLResponse(request.args.get("nickname", ""))\n'
+    # A comment the text heuristic reads changes the verdict, so no reuse.
+    commented = "# sanitize\n" + vulnerable
+    for code in (vulnerable, commented):
+        client.post("/submissions", json={"challenge_slug": "xss_001", "code": code})
+        client.app.state.scoring_worker.flush()
+
+    stats = client.get("/stats/fingerprints", params={"challenge_slug": "xss_001"}).json()
+    assert stats["hits"] == 0
+
+
+def test_reuse_caches_tool_identities_and_drops_locations():
+    from types import SimpleNamespace
+
+    from backend.services.scoring import ChallengeScoringService, RuleBundle
+
+    class CountingAnalyzer:
+        name = "counting"
+        calls = 0
+
+        def toolchain(self):
+            CountingAnalyzer.calls += 1
+            return "counting:v1"
+
+        def analyze(self, submission):
+            return []
+
+    cached = SimpleNamespace(
+        status="failed",
+        score=40,
+        feedback="Sandbox: compilation failed: 'await' outside function (line 3)",
+        issues=[{"tool": "sandbox", "message": "bad (line 3)", "severity": "error"}],
+        source_submission_id="earlier",
+    )
+    service = ChallengeScoringService(
+        rule_bundle=RuleBundle(version="v1", analyzers=(CountingAnalyzer(),)),
+        fingerprints=SimpleNamespace(lookup=lambda key: cached),
+    )
+    submission = SimpleNamespace(code=FIX, challenge_slug="xss_001", challenge=None)
+
+    for _ in range(3):
+        result = service.score(submission)
+    assert CountingAnalyzer.calls == 1
+    assert result.reused_from == "earlier"
+    assert result.feedback == "Sandbox: compilation failed: 'await' outside function"
+    assert [issue.message for issue in result.issues] == ["bad"]
+
+    service.swap_rule_bundle(RuleBundle(version="v2", analyzers=(CountingAnalyzer(),)))
+    service.score(submission)
+    assert CountingAnalyzer.calls == 2
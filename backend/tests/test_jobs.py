@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from backend.services.jobs import JobManager
+from backend.types import JobStatus
+
+
+class _Worker:
+    """Records enqueued entries instead of scoring them."""
+
+    def __init__(self) -> None:
+        self.entries: list[tuple[str, object]] = []
+
+    def queue_depth(self) -> int:
+        return 0
+
+    def enqueue(self, submission_id, on_processed=None) -> None:
+        self.entries.append((submission_id, on_processed))
+
+
+def test_job_counts_only_entries_it_enqueued():
+    worker = _Worker()
+    manager = JobManager(worker, rate_per_second=0)
+    job = manager.submit_rescore("xss_001", ["a", "b"])
+    manager._feed(job)
+
+    # A plain rescore of "a" goes through the worker without the job's callback.
+    worker.enqueue("a")
+    first = worker.entries[0][1]
+    first()
+    first()
+    assert job.completed == 1
+    assert job.status is JobStatus.running
+
+    worker.entries[1][1]()
+    assert job.completed == job.total == 2
+    assert job.status is JobStatus.completed
+
+
+def test_stale_running_jobs_are_cancelled_when_pruned():
+    worker = _Worker()
+    manager = JobManager(worker, rate_per_second=0, history_size=1, stale_after_seconds=0)
+    stuck = manager.submit_rescore("xss_001", ["a"])
+    manager._feed(stuck)
+
+    manager.submit_rescore("xss_001", ["b"])
+
+    assert stuck.status is JobStatus.cancelled
+    assert manager.get(stuck.id) is None
+    worker.entries[0][1]()
+    assert stuck.completed == 0
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import threading
+
+from backend.metrics import MetricsRegistry
+
+
+def test_histogram_merges_per_thread_shards():
+    registry = MetricsRegistry()
+    latency = registry.histogram("demo_seconds", "Demo latency.", ("stage",), buckets=(0.1, 1.0))
+    runs = registry.counter("demo_total", "Demo runs.", ("stage",))
+
+    def record() -> None:
+        for _ in range(1000):
+            latency.labels("scan").observe(0.05)
+            runs.labels("scan").inc()
+        latency.labels("scan").observe(5.0)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    rendered = registry.render()
+    assert "# TYPE demo_seconds histogram" in rendered
+    assert 'demo_seconds_bucket{stage="scan",le="0.1"} 4000' in rendered
+    assert 'demo_seconds_bucket{stage="scan",le="1"} 4000' in rendered
+    assert 'demo_seconds_bucket{stage="scan",le="+Inf"} 4004' in rendered
+    assert 'demo_seconds_count{stage="scan"} 4004' in rendered
+    assert 'demo_total{stage="scan"} 4000' in rendered
+
+
+def test_metrics_endpoint_reports_scoring_pipeline(client):
+    response = client.post(
+        "/submissions",
+        json={"challenge_slug": "sqli_001", "code": "print('fixed')", "user_handle": "metrics"},
+    )
+    assert response.status_code == 201
+    client.app.state.scoring_worker.flush()
+    client.get(f"/submissions/{response.json()['id']}")
+
+    metrics = client.get("/metrics")
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = metrics.text
+    assert "vulnlabs_scoring_queue_wait_seconds_count" in body
+    assert 'vulnlabs_scoring_duration_seconds_count{status="failed"}' in body
+    assert 'vulnlabs_analyzer_duration_seconds_count{analyzer="sandbox"}' in body
+    assert "vulnlabs_db_commit_duration_seconds_count" in body
+    assert "vulnlabs_scoring_queue_depth 0" in body
+    assert (
+        'vulnlabs_http_requests_total{method="GET",route="/submissions/{submission_id}",status="200"}'
+        in body
+    )
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+
+import sqlalchemy as sa
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+
+LEGACY_SCHEMA = [
+    """
+    CREATE TABLE challenges (
+        slug VARCHAR(64) NOT NULL PRIMARY KEY,
+        title VARCHAR(255) NOT NULL,
+        category VARCHAR(64) NOT NULL,
+        language VARCHAR(32) NOT NULL,
+        description TEXT NOT NULL,
+        vulnerable_snippet TEXT NOT NULL,
+        acceptance_criteria JSON NOT NULL,
+        hints JSON,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE submissions (
+        id VARCHAR(36) NOT NULL PRIMARY KEY,
+        challenge_slug VARCHAR(64) NOT NULL REFERENCES challenges (slug) ON DELETE CASCADE,
+        user_handle VARCHAR(64),
+        code TEXT NOT NULL,
+        status VARCHAR(7) NOT NULL,
+        score INTEGER,
+        feedback TEXT,
+        analysis_report JSON,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL
+    )
+    """,
+]
+
+
+def test_migrations_match_models(client):
+    from backend.db import Base, engine
+
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection)
+        assert context.get_current_revision() is not None
+        diff = compare_metadata(context, Base.metadata)
+    assert diff == []
+
+
+def test_migrations_adopt_legacy_create_all_database(client, tmp_path):
+    from backend import db_init
+
+    legacy = sa.create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    report = [{"tool": "semgrep", "message": "Concatenated SQL", "severity": "WARNING"}]
+    with legacy.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql(
+            "INSERT INTO challenges VALUES ('sqli_001', 't', 'c', 'python', 'd', 's', '[]', '[]', "
+            "'2024-01-01', '2024-01-01')"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO submissions VALUES ('legacy', 'sqli_001', NULL, 'print(1)', 'passed', "
+            "100, NULL, ?, '2024-01-01', '2024-01-01')",
+            (json.dumps(report),),
+        )
+
+    db_init.run_migrations(bind=legacy)
+
+    columns = {column["name"] for column in sa.inspect(legacy).get_columns("submissions")}
+    assert {"code_hash", "idempotency_key"} <= columns
+    assert not {"analysis_report", "code"} & columns
+    with legacy.connect() as connection:
+        code_hash = connection.exec_driver_sql(
+            "SELECT code_hash FROM submissions WHERE id = 'legacy'"
+        ).scalar_one()
+        findings = connection.exec_driver_sql(
+            "SELECT tool, severity, message FROM findings WHERE submission_id = 'legacy'"
+        ).all()
+        blob = connection.exec_driver_sql(
+            "SELECT data FROM code_blobs WHERE hash = ?", (code_hash,)
+        ).scalar_one()
+    assert blob == b"print(1)"
+    assert [tuple(row) for row in findings] == [("semgrep", "WARNING", "Concatenated SQL")]
+    legacy.dispose()
@@ -0,0 +1,81 @@
+from backend.config import get_settings
+from backend.services.sandbox import syntax_error
+
+FIX = (
+    "import html\n"
+    'nickname = html.escape(request.args.get("nickname", ""))\n'
+    'return HTMLResponse(f"<h2>Welcome, {nickname}</h2>")\n'
+)
+
+
+def test_syntax_error_reports_snippet_lines():
+    assert syntax_error("return 1") is None
+    assert syntax_error("x = 1\ndef broken(:\n    pass").endswith("(line 2)")
+
+
+def test_preview_runs_cheap_checks_without_persisting(client):
+    response = client.post("/submissions/preview", json={"challenge_slug": "xss_001", "code": FIX})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "passed"
+    assert body["complete"] is True
+    assert body["cached"] is False
+    assert [check["name"] for check in body["checks"]] == [
+        "prohibited_patterns",
+        "syntax",
+        "heuristic",
+    ]
+    assert client.get("/submissions").json() == []
+    assert client.app.state.scoring_worker.queue_depth() == 0
+
+    again = client.post("/submissions/preview", json={"challenge_slug": "xss_001", "code": FIX})
+    assert again.json()["cached"] is True
+    assert again.json()["checks"] == body["checks"]
+
+
+def test_preview_flags_syntax_errors_and_prohibited_calls(client):
+    broken = client.post(
+        "/submissions/preview", json={"challenge_slug": "xss_001", "code": FIX + "return (\n"}
+    ).json()
+    assert broken["status"] == "failed"
+    assert broken["score"] <= 40
+    syntax = next(check for check in broken["checks"] if check["name"] == "syntax")
+    assert syntax["outcome"] == "failed"
+
+    shell = client.post(
+        "/submissions/preview",
+        json={"challenge_slug": "command_injection_001", "code": 'os.system("tar x")'},
+    ).json()
+    assert shell["status"] == "failed"
+    assert shell["checks"][0] == {
+        "name": "prohibited_patterns",
+        "outcome": "failed",
+        "detail": "Sandbox rejected code containing potentially dangerous system calls.",
+    }
+
+
+def test_preview_rejects_unknown_challenges_and_oversized_code(client):
+    missing = client.post("/submissions/preview", json={"challenge_slug": "nope", "code": "x = 1"})
+    assert missing.status_code == 404
+
+    limit = get_settings().preview_max_code_bytes
+    oversized = client.post(
+        "/submissions/preview", json={"challenge_slug": "xss_001", "code": "x" * (limit + 1)}
+    )
+    assert oversized.status_code == 413
+
+
+def test_preview_without_a_heuristic_is_not_a_failure():
+    from backend.services.preview import PreviewService
+    from backend.services.scoring import ChallengeScoringService
+
+    result = PreviewService(ChallengeScoringService(), deadline_ms=1000).preview(
+        "misc_001", "return 1"
+    )
+
+    assert result.status == "pending"
+    assert result.complete is True
+    heuristic = next(check for check in result.checks if check.name == "heuristic")
+    assert heuristic.outcome == "not_applicable"
+    assert all(check.outcome != "failed" for check in result.checks)
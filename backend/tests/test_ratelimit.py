@@ -0,0 +1,85 @@
+import pytest
+
+from backend.ratelimit import InMemoryRateLimitStore, RateLimit, RateLimiter
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_rate_limit_parse():
+    assert RateLimit.parse("30/minute") == RateLimit(capacity=30, period_seconds=60.0)
+    assert RateLimit.parse("5/seconds").period_seconds == 1.0
+    with pytest.raises(ValueError):
+        RateLimit.parse("5/fortnight")
+
+
+def test_token_bucket_refills_over_time():
+    clock = _Clock()
+    limiter = RateLimiter({"user": {"submit": "2/second"}}, clock=clock)
+
+    assert limiter.check("submit", [("user", "alice")]).allowed
+    assert limiter.check("submit", [("user", "alice")]).allowed
+    denied = limiter.check("submit", [("user", "alice")])
+    assert not denied.allowed
+    assert denied.headers()["Retry-After"] == "1"
+
+    # Other identities and unconfigured routes are unaffected.
+    assert limiter.check("submit", [("user", "bob")]).allowed
+    assert limiter.check("other", [("user", "alice")]) is None
+
+    clock.now = 0.5
+    assert limiter.check("submit", [("user", "alice")]).allowed
+
+
+def test_most_restrictive_identity_wins():
+    limiter = RateLimiter(
+        {"api_key": {"submit": "100/minute"}, "user": {"submit": "1/minute"}},
+        clock=_Clock(),
+    )
+    identities = [("api_key", "k"), ("user", "alice")]
+    first = limiter.check("submit", identities)
+    assert first.allowed and first.remaining == 0
+    assert not limiter.check("submit", identities).allowed
+
+
+def test_rejection_by_one_identity_consumes_nothing():
+    limiter = RateLimiter(
+        {"api_key": {"submit": "3/minute"}, "user": {"submit": "1/minute"}},
+        clock=_Clock(),
+    )
+    assert limiter.check("submit", [("api_key", "k"), ("user", "alice")]).allowed
+    for _ in range(5):
+        assert not limiter.check("submit", [("api_key", "k"), ("user", "alice")]).allowed
+
+    # The API key bucket only paid for the one accepted request.
+    assert limiter.check("submit", [("api_key", "k")]).remaining == 1
+
+
+def test_capacity_is_the_smallest_applicable_limit():
+    limiter = RateLimiter({"api_key": {"batch": "50/minute"}, "user": {"batch": "10/minute"}})
+
+    assert limiter.capacity("batch", [("api_key", "k"), ("user", "alice")]) == 10
+    assert limiter.capacity("batch", [("api_key", "k")]) == 50
+    assert limiter.capacity("other", [("api_key", "k")]) is None
+
+
+def test_in_memory_store_evicts_least_recently_used_buckets():
+    store = InMemoryRateLimitStore(max_keys=3)
+    limiter = RateLimiter({"user": {"submit": "2/minute"}}, store=store, clock=_Clock())
+
+    limiter.check("submit", [("user", "alice")])
+    for handle in ("bob", "carol"):
+        limiter.check("submit", [("user", handle)])
+        # Alice stays active, so new handles evict others instead of her.
+        limiter.check("submit", [("user", "alice")])
+    for handle in ("dave", "erin"):
+        limiter.check("submit", [("user", handle)])
+
+    assert "submit:user:alice" in store._buckets
+    assert len(store._buckets) == 3
+    assert not limiter.check("submit", [("user", "alice")]).allowed
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import threading
+
+from sqlalchemy import event
+
+
+def test_result_writer_group_commits_in_order(client):
+    from backend.db import SessionLocal, engine
+    from backend.models import Submission
+    from backend.services.result_writer import ResultWriter
+    from backend.services.scoring import AnalysisIssue
+    from backend.types import SubmissionStatus
+
+    with SessionLocal() as session:
+        submissions = [
+            Submission(challenge_slug="sqli_001", code=f"print({index})")
+            for index in range(20)
+        ]
+        session.add_all(submissions)
+        session.commit()
+        ids = [submission.id for submission in submissions]
+
+    commits: list[int] = []
+    listener = lambda _connection: commits.append(1)  # noqa: E731
+    event.listen(engine, "commit", listener)
+    writer = ResultWriter(SessionLocal, max_delay_seconds=0.2)
+    writer.start()
+    try:
+        futures = []
+        for submission_id in ids:
+            writer.mark_running(submission_id)
+            futures.append(
+                writer.write_result(
+                    submission_id,
+                    "sqli_001",
+                    SubmissionStatus.failed,
+                    score=10,
+                    feedback="grouped",
+                    issues=[AnalysisIssue("semgrep", "concat", "WARNING", "sqli")],
+                )
+            )
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        writer.stop()
+        event.remove(engine, "commit", listener)
+
+    # 40 writes, far fewer transactions.
+    assert 1 <= len(commits) <= 4
+    for submission_id in ids:
+        body = client.get(f"/submissions/{submission_id}").json()
+        assert body["status"] == "failed"
+        assert body["feedback"] == "grouped"
+        assert [issue["rule_id"] for issue in body["issues"]] == ["sqli"]
+
+
+def test_result_writer_isolates_failing_writes(client):
+    from backend.db import SessionLocal
+    from backend.services.result_writer import ResultWriter
+    from backend.services.scoring import AnalysisIssue
+    from backend.types import SubmissionStatus
+
+    created = client.post(
+        "/submissions", json={"challenge_slug": "sqli_001", "code": "print('ok')"}
+    ).json()
+    client.app.state.scoring_worker.flush()
+
+    writer = ResultWriter(SessionLocal, max_delay_seconds=0.2)
+    writer.start()
+    try:
+        good = writer.write_result(
+            created["id"], "sqli_001", SubmissionStatus.passed, 100, "ok", []
+        )
+        # Same batch, so the bad write wins and fails; the retry keeps the good one.
+        bad = writer.write_result(
+            created["id"],
+            None,  # type: ignore[arg-type]
+            SubmissionStatus.passed,
+            100,
+            "bad",
+            [AnalysisIssue("semgrep", "bad row", "WARNING")],
+        )
+        assert good.exception(timeout=5) is None
+        assert bad.exception(timeout=5) is not None
+    finally:
+        writer.stop()
+
+    assert client.get(f"/submissions/{created['id']}").json()["feedback"] == "ok"
+
+
+def test_result_writer_resolves_writes_racing_with_stop(client):
+    from backend.db import SessionLocal
+    from backend.services.result_writer import ResultWriter
+
+    created = client.post(
+        "/submissions", json={"challenge_slug": "sqli_001", "code": "print('ok')"}
+    ).json()
+    client.app.state.scoring_worker.flush()
+
+    writer = ResultWriter(SessionLocal, max_delay_seconds=0.01)
+    writer.start()
+    futures = []
+
+    def write_many():
+        for _ in range(50):
+            futures.append(writer.mark_running(created["id"]))
+
+    threads = [threading.Thread(target=write_many) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    writer.stop()
+    for thread in threads:
+        thread.join()
+
+    # Queued before the sentinel, drained after it, or committed inline once stopped.
+    for future in futures:
+        assert future.exception(timeout=5) is None
+    assert writer.queue_depth() == 0
@@ -1,4 +1,13 @@
-from backend.services.sandbox import LocalSandboxExecutor
+import secrets
+import subprocess
+import sys
+
+from backend.services.sandbox import (
+    LocalSandboxExecutor,
+    _interpret_harness,
+    _wrap_submission_for_sandbox,
+    _write_workspace,
+)
 
 
 class _Submission:
@@ -26,3 +35,156 @@ def test_local_sandbox_handles_empty_snippet():
 
     assert ok, message
     assert "succeeded" in message.lower()
+
+
+class _Challenge:
+    def __init__(self, test_cases: list[dict]) -> None:
+        self.test_cases = test_cases
+
+
+class _ChallengeSubmission(_Submission):
+    def __init__(self, code: str, test_cases: list[dict]) -> None:
+        super().__init__(code)
+        self.challenge = _Challenge(test_cases)
+
+
+_XSS_CASES = [
+    {
+        "name": "plain nickname",
+        "kind": "benign",
+        "request": {"args": {"nickname": "alice"}},
+        "expect": {"output_contains": "alice"},
+    },
+    {
+        "name": "script tag",
+        "kind": "exploit",
+        "request": {"args": {"nickname": "<script>alert(1)</script>"}},
+        "expect": {"output_excludes": "<script>", "allow_rejection": True},
+    },
+]
+
+
+def _run_harness(tmp_path, code: str, cases: list[dict]):
+    # Trusted test snippets only: this runs the harness directly on the host.
+    _write_workspace(tmp_path, _wrap_submission_for_sandbox(code), cases)
+    nonce = secrets.token_hex(16)
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-I",
+            str(tmp_path / "harness.py"),
+            str(tmp_path / "submission.py"),
+            str(tmp_path / "cases.json"),
+        ],
+        input=nonce + "\n",
+        capture_output=True,
+        text=True,
+        timeout=10,
+    )
+    return _interpret_harness(proc, "Sandbox", nonce, len(cases))
+
+
+def test_local_sandbox_never_runs_the_submission(tmp_path):
+    marker = tmp_path / "ran"
+    code = f"open({str(marker)!r}, 'w').close()\nreturn 'ok'\n"
+
+    ok, message = LocalSandboxExecutor().run_tests(_ChallengeSubmission(code, _XSS_CASES))
+
+    assert ok, message
+    assert "only run with the docker sandbox driver" in message
+    assert not marker.exists()
+
+
+def test_harness_runs_challenge_cases(tmp_path):
+    vulnerable = (
+        'nickname = request.args.get("nickname", "")\n'
+        'return HTMLResponse(f"<h2>{nickname}</h2>")\n'
+    )
+    fixed = (
+        "import html\n"
+        'nickname = html.escape(request.args.get("nickname", ""))\n'
+        'return HTMLResponse(f"<h2>{nickname}</h2>")\n'
+    )
+
+    ok, message = _run_harness(tmp_path, vulnerable, _XSS_CASES)
+    assert not ok
+    assert "1/2 challenge test cases failed" in message
+    assert "script tag" in message
+
+    ok, message = _run_harness(tmp_path, fixed, _XSS_CASES)
+    assert ok, message
+    assert "2/2" in message
+
+
+def test_harness_result_cannot_be_forged_by_the_submission(tmp_path):
+    forged = (
+        "import os\n"
+        "os.write(1, b'\\n{\"cases\": []}\\n')\n"
+        "os._exit(0)\n"
+    )
+
+    ok, message = _run_harness(tmp_path, forged, _XSS_CASES)
+
+    assert not ok
+    assert "harness failed" in message
+
+
+
+_SQLI_CASES = [
+    {
+        "name": "valid login",
+        "kind": "benign",
+        "request": {"json": {"username": "alice"}},
+        "rows": [[1]],
+        "expect": {"db_executed": True, "output_contains": "1"},
+    },
+    {
+        "name": "tautology",
+        "kind": "exploit",
+        "request": {"json": {"username": "' OR '1'='1"}},
+        "rows": [[1]],
+        "expect": {"sql_excludes": "' OR '1'='1", "allow_rejection": True},
+    },
+]
+
+
+def test_submission_writing_to_every_fd_still_fails(tmp_path):
+    forge = (
+        "import json, os, sys\n"
+        "safe = {'output': '1', 'queries': ['SELECT id FROM users WHERE username = ?'],"
+        " 'commands': [], 'raised': None}\n"
+        "harness = sys.modules['__main__']\n"
+        "token = getattr(getattr(harness, '_Channel', None), 'token', None)\n"
+        "lines = [json.dumps({'observations': [safe] * 2}),"
+        " json.dumps({'token': token, 'event': 'done', **safe})]\n"
+        "for fd in range(256):\n"
+        "    for line in lines:\n"
+        "        try:\n"
+        "            os.write(fd, (line + '\\n').encode())\n"
+        "        except OSError:\n"
+        "            pass\n"
+    )
+    vulnerable = (
+        'username = request.json["username"]\n'
+        "return db.execute(f\"SELECT id FROM users WHERE username = '{username}'\").fetchone()\n"
+    )
+
+    for code in (forge + vulnerable, forge + "os._exit(0)\n" + vulnerable):
+        ok, message = _run_harness(tmp_path, code, _SQLI_CASES)
+        assert not ok, message
+
+    ok, message = _run_harness(tmp_path, vulnerable, _SQLI_CASES)
+    assert not ok
+    assert "1/2 challenge test cases failed" in message
+
+def test_harness_requires_exactly_one_result_line():
+    nonce = "f" * 32
+    line = nonce + '{"cases": []}'
+
+    def interpret(stdout):
+        proc = subprocess.CompletedProcess([], 0, stdout=stdout, stderr="")
+        return _interpret_harness(proc, "Sandbox", nonce, 0)
+
+    assert interpret(line + "\n") == (True, "Sandbox compilation succeeded.")
+    assert interpret('{"cases": []}\n') == (False, "Sandbox returned no result.")
+    assert interpret(f"{line}\n{line}\n") == (False, "Sandbox returned more than one result.")
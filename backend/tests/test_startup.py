@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROBE = """
+import json, sys
+import backend.app as app_module
+app_module.create_app()
+import backend.db as db
+print(json.dumps({"engines": len(db._engines), "alembic": "alembic" in sys.modules}))
+"""
+
+
+def test_import_and_create_app_do_not_touch_the_database(tmp_path):
+    database = tmp_path / "lazy.db"
+    env = {
+        **os.environ,
+        "VULNLABS_DATABASE_URL": f"sqlite:///{database}",
+        "VULNLABS_LOG_LEVEL": "WARNING",
+    }
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+        cwd=Path(__file__).resolve().parents[2],
+    )
+    probe = json.loads(completed.stdout.strip().splitlines()[-1])
+    assert probe == {"engines": 0, "alembic": False}
+    assert not database.exists()
@@ -9,3 +9,26 @@ class SubmissionStatus(str, Enum):
     passed = "passed"
     failed = "failed"
     error = "error"
+
+
+class JobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    completed = "completed"
+    cancelled = "cancelled"
+
+
+class ProfileTarget(str, Enum):
+    worker = "worker"
+    routes = "routes"
+
+
+class ProfileFormat(str, Enum):
+    collapsed = "collapsed"
+    speedscope = "speedscope"
+
+
+class ProfileStatus(str, Enum):
+    running = "running"
+    completed = "completed"
+    failed = "failed"